@@ -0,0 +1,149 @@
+"""
+Atlas (sprite) com os logos de todos os times no tamanho do seletor do Quick Match.
+
+O comando build_logo_atlas grava em MEDIA_ROOT/atlas/:
+  team-logos-<hash>.webp   uma imagem com todos os logos numa grade
+  team-logos.json          {"image", "css", "key", "cell", "display", "teams": {id: [x, y]}, "logos": {id: nome}}
+  team-logos-<hash>.css    .team-logo-<id> { background-position } para o tamanho de exibição
+
+A chave é o hash dos pares (time, hash do conteúdo do logo): o atlas só é
+refeito quando algum logo muda, entra ou sai. Até lá, um time cujo logo mudou
+não bate com "logos" e o seletor usa o <img> normal (ver sprite_teams()).
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+
+from django.conf import settings
+
+from .storage import file_digest, write_atomic
+
+ATLAS_DIR = 'atlas'
+MANIFEST_NAME = 'team-logos.json'
+CELL_SIZE = 40     # 2x o tamanho de exibição, para telas de alta densidade
+DISPLAY_SIZE = 20  # w-[20px] h-[20px] no seletor
+PADDING = 2        # Evita que o filtro de escala misture logos vizinhos
+
+
+def manifest_path(root=None):
+    return Path(root or settings.MEDIA_ROOT) / ATLAS_DIR / MANIFEST_NAME
+
+
+def load_manifest(root=None):
+    """Manifesto do atlas atual, ou None se ainda não foi gerado."""
+    try:
+        with open(manifest_path(root), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def sprite_teams(manifest, teams):
+    """Ids (str) dos times cujo logo atual é o que está no atlas."""
+    if not manifest:
+        return set()
+    logos = manifest.get('logos', {})
+    return {str(team.id) for team in teams if team.logo and logos.get(str(team.id)) == team.logo.name}
+
+
+def atlas_key(logos):
+    """Hash de [(team_id, digest do logo)]: muda sempre que algum logo muda."""
+    digest = hashlib.sha256(f'{CELL_SIZE}:{DISPLAY_SIZE}:{PADDING}'.encode())
+    for team_id, logo_digest in sorted(logos):
+        digest.update(f'{team_id}:{logo_digest};'.encode())
+    return digest.hexdigest()
+
+
+def _px(value):
+    return '0' if value == 0 else f'{value:g}px'
+
+
+def _cell(image):
+    """Logo centralizado numa célula CELL_SIZE x CELL_SIZE (sem distorcer)."""
+    from PIL import Image
+    image = image.convert('RGBA')
+    inner = CELL_SIZE - 2 * PADDING
+    image.thumbnail((inner, inner), Image.Resampling.LANCZOS)
+    cell = Image.new('RGBA', (CELL_SIZE, CELL_SIZE), (0, 0, 0, 0))
+    cell.paste(image, ((CELL_SIZE - image.width) // 2, (CELL_SIZE - image.height) // 2))
+    return cell
+
+
+def build_atlas(logos, root=None, force=False):
+    """
+    logos: [(team_id, nome do arquivo em MEDIA_ROOT)]. Retorna (manifesto, gerado?).
+    Logos ilegíveis ficam de fora (o seletor usa o <img> normal para eles).
+    """
+    root = Path(root or settings.MEDIA_ROOT)
+    digests = []
+    for team_id, name in logos:
+        try:
+            with open(root / name, 'rb') as f:
+                digests.append((team_id, name, file_digest(f)))
+        except OSError:
+            continue
+
+    key = atlas_key([(team_id, digest) for team_id, _, digest in digests])
+    current = load_manifest(root)
+    if not force and current and current.get('key') == key and (root / current['file']).exists():
+        return current, False
+
+    from PIL import Image  # A página só lê o manifesto; o Pillow fica para o build
+
+    cells = []
+    names = {}
+    for team_id, name, _ in digests:
+        try:
+            with Image.open(root / name) as image:
+                cells.append((team_id, _cell(image)))
+                names[str(team_id)] = name
+        except (OSError, ValueError):
+            continue
+
+    columns = max(1, math.ceil(math.sqrt(len(cells))))
+    rows = max(1, math.ceil(len(cells) / columns))
+    atlas = Image.new('RGBA', (columns * CELL_SIZE, rows * CELL_SIZE), (0, 0, 0, 0))
+    positions = {}
+    for index, (team_id, cell) in enumerate(cells):
+        x, y = (index % columns) * CELL_SIZE, (index // columns) * CELL_SIZE
+        atlas.paste(cell, (x, y))
+        positions[str(team_id)] = [x, y]
+
+    directory = root / ATLAS_DIR
+    image_file = f'{ATLAS_DIR}/team-logos-{key[:12]}.webp'
+    css_file = f'{ATLAS_DIR}/team-logos-{key[:12]}.css'
+    write_atomic(root / image_file, lambda f: atlas.save(f, 'WEBP', lossless=True))
+
+    scale = DISPLAY_SIZE / CELL_SIZE
+    css = [
+        f".team-logo-sprite {{ display: inline-block; width: {DISPLAY_SIZE}px; height: {DISPLAY_SIZE}px; "
+        f"background-image: url('{settings.MEDIA_URL}{image_file}'); "
+        f"background-size: {atlas.width * scale:g}px {atlas.height * scale:g}px; background-repeat: no-repeat; }}"
+    ]
+    css += [
+        f'.team-logo-{team_id} {{ background-position: {_px(-x * scale)} {_px(-y * scale)}; }}'
+        for team_id, (x, y) in positions.items()
+    ]
+    write_atomic(root / css_file, lambda f: f.write(('\n'.join(css) + '\n').encode()))
+
+    manifest = {
+        'key': key,
+        'file': image_file,
+        'image': settings.MEDIA_URL + image_file,
+        'css': settings.MEDIA_URL + css_file,
+        'cell': CELL_SIZE,
+        'display': DISPLAY_SIZE,
+        'width': atlas.width,
+        'height': atlas.height,
+        'teams': positions,
+        'logos': names,
+    }
+    write_atomic(manifest_path(root), lambda f: f.write(json.dumps(manifest).encode()))
+
+    # Remove as versões anteriores (o manifesto já aponta para a nova)
+    for old in directory.glob('team-logos-*'):
+        if old.name not in (Path(image_file).name, Path(css_file).name):
+            old.unlink()
+    return manifest, True
@@ -0,0 +1,156 @@
+"""
+Varredura dos parâmetros de balanceamento (GameConfig.BALANCE, ver engine/balance.py).
+
+Cada ponto é uma config completa; todos os pontos simulam os mesmos confrontos
+com o mesmo seed (números aleatórios comuns), então a diferença entre dois
+pontos vem dos parâmetros e não do sorteio. Métricas de cada ponto:
+    upset_rate        fração dos mapas vencidos pelo time com menor chance de
+                      round base (confrontos empatados ficam de fora)
+    avg_round_diff    |placar A - placar B| médio por mapa
+    avg_rounds        rounds por mapa
+    kills_per_round   kills por jogador por round, por role (constants.ROLES)
+
+Cada ponto fica em cache em <cache_dir>/<hash>.json, com o hash da config, dos
+confrontos, de n, do seed, de ENGINE_VERSION e de ECONOMY_VERSION: repetir uma varredura (ou
+ampliar a grade) só simula os pontos novos.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+from .engine import ENGINE_VERSION, ROLES, round_win_probability, simulate_maps_economy
+from .engine.balance import DEFAULT_BALANCE, Balance, balance_params, with_params
+from .engine.economy import ECONOMY_VERSION
+
+
+def cache_dir():
+    return getattr(settings, 'BALANCE_SWEEP_CACHE', settings.BASE_DIR / 'data' / 'balance_sweep')
+
+
+def grid_points(values):
+    """Produto cartesiano de {caminho: [valores]} em uma lista de {caminho: valor}."""
+    paths = list(values)
+    return [dict(zip(paths, combo)) for combo in itertools.product(*(values[path] for path in paths))]
+
+
+def random_points(ranges, count, seed=None):
+    """
+    count pontos sorteados: (lo, hi) uniforme no intervalo (inteiro se o padrão
+    do parâmetro é inteiro), lista = um dos valores.
+    """
+    rng = np.random.default_rng(seed)
+    defaults = balance_params()
+    points = []
+    for _ in range(count):
+        point = {}
+        for path, spec in ranges.items():
+            if isinstance(spec, tuple):
+                lo, hi = spec
+                if isinstance(defaults.get(path), int):
+                    point[path] = int(rng.integers(int(lo), int(hi), endpoint=True))
+                else:
+                    point[path] = round(float(rng.uniform(lo, hi)), 4)
+            else:
+                point[path] = spec[int(rng.integers(len(spec)))]
+        points.append(point)
+    return points
+
+
+def point_key(config, pairings, n, seed):
+    digest = hashlib.sha1(json.dumps(
+        {'config': config, 'n': n, 'seed': seed, 'engine': ENGINE_VERSION, 'economy': ECONOMY_VERSION},
+        sort_keys=True,
+    ).encode())
+    for array in pairings:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def load_point(key):
+    try:
+        with open(os.path.join(cache_dir(), f'{key}.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_point(key, entry):
+    path = os.path.join(cache_dir(), f'{key}.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def simulate_point(config, attributes_a, attributes_b, roles_a, roles_b, n, seed):
+    """
+    Simula n mapas de cada confronto ((P, 5, 4) atributos, (P, 5) roles) com a
+    config e retorna as métricas. Função de topo para rodar no ProcessPoolExecutor.
+    """
+    pairs = len(attributes_a)
+    results = simulate_maps_economy(
+        *(np.repeat(array, n, axis=0) for array in (attributes_a, attributes_b, roles_a, roles_b)),
+        rng=seed, balance=Balance(config),
+    )
+    rounds = results.rounds.astype(np.int64)
+
+    # Zebra: o time com menor chance de round base vence o mapa
+    p = np.repeat(round_win_probability(attributes_a, attributes_b), n)
+    decided = p != 0.5
+    upsets = results.winner_a[decided] != (p[decided] > 0.5)
+
+    roles = np.repeat(np.stack([roles_a, roles_b], axis=1), n, axis=0).astype(np.intp).ravel()
+    kills = np.bincount(roles, weights=results.kills.ravel(), minlength=len(ROLES))
+    player_rounds = np.bincount(roles, weights=np.repeat(rounds, 2 * roles_a.shape[-1]), minlength=len(ROLES))
+    kills_per_round = kills / np.maximum(player_rounds, 1)
+
+    return {
+        'maps': pairs * n,
+        'upset_rate': float(upsets.mean()) if upsets.size else 0.0,
+        'avg_round_diff': float(np.abs(results.score_a.astype(np.int64) - results.score_b).mean()),
+        'avg_rounds': float(rounds.mean()),
+        'kills_per_round': {role: float(value) for role, value in zip(ROLES, kills_per_round)},
+    }
+
+
+def run_sweep(points, pairings, n=200, seed=0, workers=None, log=None):
+    """
+    Avalia cada ponto ({caminho: valor} sobre DEFAULT_BALANCE) nos confrontos
+    (attributes_a, attributes_b, roles_a, roles_b). Retorna, na ordem dos pontos,
+    entradas {'params', 'config', 'metrics', 'cached'}.
+    """
+    pairings = tuple(np.asarray(array) for array in pairings)
+    entries, pending = [], {}
+    for params in points:
+        config = with_params(params, DEFAULT_BALANCE)
+        key = point_key(config, pairings, n, seed)
+        cached = load_point(key)
+        entry = {'params': params, 'config': config, 'metrics': None, 'cached': cached is not None}
+        if cached is None:
+            # Pontos repetidos (ex.: o padrão dentro da grade) simulam uma vez só
+            pending.setdefault(key, []).append(entry)
+        else:
+            entry['metrics'] = cached['metrics']
+        entries.append(entry)
+    if log:
+        log(f'{len(points)} points, {len(pending)} to simulate')
+
+    if pending:
+        tasks = [(same[0]['config'], *pairings, n, seed) for same in pending.values()]
+        if workers == 1:
+            metrics = [simulate_point(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                metrics = list(pool.map(simulate_point, *zip(*tasks)))
+        for (key, same), point_metrics in zip(pending.items(), metrics):
+            for entry in same:
+                entry['metrics'] = point_metrics
+            save_point(key, {'params': same[0]['params'], 'config': same[0]['config'], 'metrics': point_metrics})
+    return entries
@@ -0,0 +1,157 @@
+"""
+Transmissão compartilhada de partidas ao vivo (watch party).
+
+Um Channel por partida simula a série uma vez (live.series_events) e entrega os
+mesmos bytes de cada evento a todos os inscritos: o custo por round não cresce
+com o número de espectadores, só a cópia da referência para cada fila.
+
+Cada inscrito tem uma fila limitada; quem não consome a tempo (fila cheia) é
+derrubado e, ao reconectar, recebe o snapshot do momento. Quem entra no meio da
+partida também começa pelo snapshot (placar, rounds e kills/mortes do mapa atual).
+
+Tudo vive no event loop do processo ASGI: não é compartilhado entre processos.
+Sob WSGI não há fan-out (cada request tem um event loop), por isso a view
+watch_party_stream só responde sob ASGI.
+"""
+
+import asyncio
+
+from .engine.constants import LINEUP_SIZE
+from .live import ROUND_INTERVAL, encode_event, position_event
+
+BUFFER_SIZE = 32        # Eventos pendentes por espectador antes de ser derrubado
+MAP_BREAK = 3.0         # Pausa entre mapas (o modal de fim de mapa fica na tela)
+LINGER = 60.0           # Canal encerrado ainda responde (snapshot + fim) por esse tempo
+
+CHANNELS = {}
+
+
+def _empty_stats():
+    return [[0] * LINEUP_SIZE for _ in range(2)]
+
+
+class Subscriber:
+    __slots__ = ('queue',)
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(size)
+
+    def finish(self):
+        """Enfileira o fim do stream; se a fila está cheia, descarta o que faltava."""
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Channel:
+    """Uma série simulada uma vez e distribuída a todos os inscritos."""
+
+    def __init__(self, key, events, interval=ROUND_INTERVAL, buffer_size=BUFFER_SIZE):
+        self.key = key
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.loop = asyncio.get_running_loop()
+        self.subscribers = set()
+        self.finished = False
+        self.dropped = 0
+
+        events = iter(events)
+        _, _, start = next(events)  # lineups já entram no primeiro snapshot
+        self.state = {
+            **start, 'm': 1, 'r': 0, 's': [0, 0], 'series': [0, 0],
+            'k': _empty_stats(), 'd': _empty_stats(), 'rounds': [], 'done': False,
+        }
+        self._snapshot = None
+        self._task = self.loop.create_task(self._run(events))
+
+    def snapshot(self):
+        """Estado atual como evento, codificado uma vez por round."""
+        if self._snapshot is None:
+            self._snapshot = encode_event('snapshot', self.state)
+        return self._snapshot
+
+    def subscribe(self):
+        subscriber = Subscriber(self.buffer_size)
+        subscriber.queue.put_nowait(self.snapshot())
+        if self.finished:
+            subscriber.finish()
+        else:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, payload):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Consumidor lento: derruba em vez de acumular memória ou segurar o canal
+                self.subscribers.discard(subscriber)
+                subscriber.finish()
+                self.dropped += 1
+
+    def stream(self):
+        """
+        Inscreve agora e retorna o iterador assíncrono de bytes do espectador
+        (snapshot primeiro).
+        """
+        return self._drain(self.subscribe())
+
+    async def _drain(self, subscriber):
+        try:
+            while (payload := await subscriber.queue.get()) is not None:
+                yield payload
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _apply(self, name, data):
+        state = self.state
+        if name == 'round':
+            if data['m'] != state['m']:
+                state.update(m=data['m'], k=_empty_stats(), d=_empty_stats(), rounds=[])
+            state['r'], state['s'] = data['r'], data['s']
+            for totals, delta in ((state['k'], data['k']), (state['d'], data['d'])):
+                for side in (0, 1):
+                    totals[side] = [a + b for a, b in zip(totals[side], delta[side])]
+            state['rounds'].append([data['w'], data['c']])
+        elif name == 'map':
+            state['series'] = data['series']
+        elif name == 'end':
+            state['done'] = True
+        self._snapshot = None
+
+    async def _run(self, events):
+        try:
+            for position, name, data in events:
+                self._apply(name, data)
+                self.publish(position_event(position, name, data))
+                if name == 'round':
+                    await asyncio.sleep(self.interval)
+                elif name == 'map':
+                    await asyncio.sleep(MAP_BREAK)
+        finally:
+            self.finished = True
+            for subscriber in self.subscribers:
+                subscriber.finish()
+            self.subscribers.clear()
+        await asyncio.sleep(LINGER)
+        if CHANNELS.get(self.key) is self:
+            del CHANNELS[self.key]
+
+
+def get_channel(key, events, **kwargs):
+    """
+    Canal da chave (criado na primeira inscrição). `events` é chamado só quando
+    o canal é criado. Num event loop diferente (ex.: WSGI, um loop por request)
+    o canal antigo não serve e um novo é criado.
+    """
+    loop = asyncio.get_running_loop()
+    channel = CHANNELS.get(key)
+    if channel is None or channel.loop is not loop:
+        channel = CHANNELS[key] = Channel(key, events(), **kwargs)
+    return channel
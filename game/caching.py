@@ -0,0 +1,50 @@
+"""
+Cache em memória do processo com limite de tamanho (LRU).
+"""
+
+import threading
+from collections import OrderedDict
+
+# Distingue "não está no cache" de um valor None guardado
+_MISSING = object()
+
+
+class LRUCache:
+    """Dicionário limitado a max_entries; o item usado há mais tempo é descartado primeiro."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, compute):
+        """Retorna o valor em cache ou calcula com compute() e guarda."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
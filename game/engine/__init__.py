@@ -0,0 +1,32 @@
+"""
+Motor de simulação server-side (porta NumPy de static/js/simulation.js).
+"""
+
+from .constants import ENGINE_VERSION, ROLES, WIN_CONDITIONS, WINS_NEEDED
+from .economy import BUY_STATES, simulate_maps_economy
+from .match import MapResults, simulate_maps
+from .roster import (
+    lineup_attributes, lineup_fingerprint, lineup_roles, round_win_probability, team_power,
+)
+from .series import SeriesResults, simulate_series
+from .tournament import TournamentResults, simulate_tournament
+
+__all__ = [
+    'BUY_STATES',
+    'ENGINE_VERSION',
+    'ROLES',
+    'WIN_CONDITIONS',
+    'WINS_NEEDED',
+    'MapResults',
+    'SeriesResults',
+    'TournamentResults',
+    'lineup_attributes',
+    'lineup_fingerprint',
+    'lineup_roles',
+    'round_win_probability',
+    'simulate_maps',
+    'simulate_maps_economy',
+    'simulate_series',
+    'simulate_tournament',
+    'team_power',
+]
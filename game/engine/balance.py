@@ -0,0 +1,153 @@
+"""
+Parâmetros de balanceamento (GameConfig.BALANCE em game_config.js) para o motor com economia.
+
+simulation.js não usa mais esses knobs; aqui eles voltam como mecânicas opcionais
+de simulate_maps_economy(balance=Balance(...)), para medir o efeito de cada um:
+
+    firstKillPenalty       quem perde o duelo de abertura do round (sorteado com a
+                           chance do round) perde essa fração do poder, pela média
+                           de gamesense do time (15+ alto, 10+ médio)
+    ecoVariance            ECO/FORCE contra FULL: a chance do round se aproxima de
+                           50% nessa fração (mais caos)
+    killDistribution       sobreviventes do vencedor pela faixa da chance dele
+                           (getKillDistribution: min em %, survivorsMin..survivorsMax)
+    utilityRoleModifiers   a sobra de créditos compra utilitário (decideUtilityTier);
+                           o multiplicador é 1 + bônus do tier + modificador da role
+    tacticalFatigue*       quem venceu Threshold+ rounds seguidos fica previsível:
+                           poder x Penalty
+
+O overtime segue o motor base (só o utilitário do full buy entra na chance).
+"""
+
+import copy
+
+import numpy as np
+
+from .constants import LINEUP_SIZE, ROLES
+from .economy import ECO, FORCE, FULL
+
+DEFAULT_BALANCE = {
+    'firstKillPenalty': {'highGS': 0.10, 'mediumGS': 0.15, 'lowGS': 0.25},
+    'ecoVariance': {'ecoVsFull': 0.30, 'forceVsFull': 0.15},
+    'killDistribution': {
+        'stomp': {'min': 80, 'survivorsMin': 5, 'survivorsMax': 6},
+        'dominate': {'min': 65, 'survivorsMin': 4, 'survivorsMax': 5},
+        'win': {'min': 55, 'survivorsMin': 3, 'survivorsMax': 4},
+        'close': {'min': 50, 'survivorsMin': 2, 'survivorsMax': 3},
+    },
+    'utilityRoleModifiers': {
+        'Controller': {'noPenalty': -0.15, 'lowPenalty': -0.05, 'highBonus': 0.05},
+        'Sentinel': {'noPenalty': -0.15, 'lowPenalty': -0.05, 'highBonus': 0.05},
+        'Initiator': {'noPenalty': -0.10, 'lowPenalty': -0.03, 'highBonus': 0.05},
+        'Duelist': {'noPenalty': 0.0, 'lowPenalty': 0.0, 'highBonus': 0.10},
+        'Flex': {'noPenalty': -0.05, 'lowPenalty': -0.02, 'highBonus': 0.03},
+    },
+    'tacticalFatiguePenalty': 0.85,
+    'tacticalFatigueThreshold': 3,
+}
+
+# UTILITY_TIERS: (custo, bônus) de NONE, LOW, MED, HIGH
+UTILITY_TIERS = ((0, 0.0), (200, 0.05), (400, 0.10), (500, 0.18))
+# Modificador de utilityRoleModifiers aplicado a cada tier (MED não tem)
+TIER_MODIFIERS = ('noPenalty', 'lowPenalty', None, 'highBonus')
+KILL_TIERS = ('close', 'win', 'dominate', 'stomp')
+
+
+def balance_params(config=DEFAULT_BALANCE, prefix=''):
+    """Achata a config em {'firstKillPenalty.highGS': 0.1, ...}."""
+    params = {}
+    for key, value in config.items():
+        if isinstance(value, dict):
+            params.update(balance_params(value, f'{prefix}{key}.'))
+        else:
+            params[f'{prefix}{key}'] = value
+    return params
+
+
+def with_params(params, config=DEFAULT_BALANCE):
+    """Cópia da config com os parâmetros ({caminho: valor}) trocados."""
+    known = balance_params(config)
+    config = copy.deepcopy(config)
+    for path, value in params.items():
+        if path not in known:
+            raise ValueError(f'Unknown balance parameter: {path}')
+        *parents, leaf = path.split('.')
+        node = config
+        for key in parents:
+            node = node[key]
+        node[leaf] = type(known[path])(value)
+    return config
+
+
+class Balance:
+    """GameConfig.BALANCE convertido nas tabelas usadas por simulate_maps_economy."""
+
+    def __init__(self, config=DEFAULT_BALANCE):
+        penalty = config['firstKillPenalty']
+        self.first_kill_penalty = np.array([penalty['lowGS'], penalty['mediumGS'], penalty['highGS']])
+
+        # Variância do time da linha contra o da coluna, por buy state (PISTOL, ECO, FORCE, FULL)
+        self.eco_variance = np.zeros((4, 4))
+        self.eco_variance[ECO, FULL] = config['ecoVariance']['ecoVsFull']
+        self.eco_variance[FORCE, FULL] = config['ecoVariance']['forceVsFull']
+        self.eco_variance = self.eco_variance.ravel()
+
+        tiers = [config['killDistribution'][name] for name in KILL_TIERS]
+        self.kill_thresholds = [tier['min'] / 100 for tier in tiers[1:]]
+        self.survivors_min = np.array([tier['survivorsMin'] for tier in tiers])
+        self.survivors_span = np.array([tier['survivorsMax'] - tier['survivorsMin'] + 1 for tier in tiers])
+
+        modifiers = config['utilityRoleModifiers']
+        self.utility = np.array([
+            [1 + bonus + (modifiers[role.capitalize()][name] if name else 0)
+             for (_, bonus), name in zip(UTILITY_TIERS, TIER_MODIFIERS)]
+            for role in ROLES
+        ], dtype=np.float32).ravel()
+
+        self.fatigue_penalty = config['tacticalFatiguePenalty']
+        self.fatigue_threshold = config['tacticalFatigueThreshold']
+
+    def first_kill_penalties(self, gamesense):
+        """Penalidade de cada time pela média de gamesense (getFirstKillPenalty)."""
+        return self.first_kill_penalty[(gamesense >= 10).astype(np.intp) + (gamesense >= 15)]
+
+    def utility_offsets(self, roles):
+        """Deslocamento de cada role em self.utility (argumento role_offset de buy_utility)."""
+        return np.asarray(roles).astype(np.intp) * len(UTILITY_TIERS)
+
+    def buy_utility(self, levels, states, role_offset, eco, step):
+        """
+        Compra de utilitário com a sobra (decideUtilityTier): no eco só LOW, com
+        mais de 1500; nos outros estados o maior tier que cabe. Desconta de
+        levels (créditos / step) e retorna o multiplicador de cada jogador.
+        role_offset: utility_offsets das roles, (5, 2, lote).
+        """
+        credits = levels * step
+        affordable = sum((credits >= cost).astype(np.intp) for cost, _ in UTILITY_TIERS[1:])
+        tier = np.where(states == eco, (credits > 1500).astype(np.intp), affordable)
+        levels -= np.array([cost // step for cost, _ in UTILITY_TIERS], dtype=levels.dtype).take(tier)
+        return self.utility.take(role_offset + tier)
+
+    def fatigue(self, win_streak):
+        """Multiplicador de poder por tacticalFatigue."""
+        return 1 - (1 - self.fatigue_penalty) * (win_streak >= self.fatigue_threshold)
+
+    def round_chance(self, p, states):
+        """ecoVariance: aproxima a chance de 50% quando um time faz eco/force contra full."""
+        variance = self.eco_variance.take(states[0] * 4 + states[1])
+        variance += self.eco_variance.take(states[1] * 4 + states[0])
+        return p + (0.5 - p) * variance
+
+    def round_deaths(self, p, a_won, survivors):
+        """
+        Mortes de (A, B) com killDistribution: sobreviventes do vencedor na faixa
+        da chance dele (survivors[0]); o perdedor salva 1 com 30% no stomp, 20% fora.
+        """
+        winner_chance = np.where(a_won, p, 1 - p)
+        tier = sum((winner_chance >= threshold).astype(np.intp) for threshold in self.kill_thresholds)
+        saved = self.survivors_min.take(tier) + (survivors[0] * self.survivors_span.take(tier)).astype(np.intp)
+        winner_deaths = (LINEUP_SIZE - np.clip(saved, 0, LINEUP_SIZE)).astype(np.uint8)
+        stomp = tier == len(KILL_TIERS) - 1
+        loser_saves = (survivors[1] > np.float64(0.8)) | (stomp & (survivors[1] > np.float64(0.7)))
+        loser_deaths = LINEUP_SIZE - loser_saves.astype(np.uint8)
+        return np.where(a_won, winner_deaths, loser_deaths), np.where(a_won, loser_deaths, winner_deaths)
@@ -0,0 +1,78 @@
+"""
+Constantes do motor de simulação (espelho de static/js/game_config.js e simulation.js).
+"""
+
+import itertools
+
+import numpy as np
+
+# Versão do motor gravada em Match.engine_version. Incrementar sempre que a ordem ou a
+# forma dos sorteios mudar: partidas de versões antigas deixam de ser reproduzíveis.
+ENGINE_VERSION = '1'
+
+# Jogadores por lado (o motor sempre simula a lineup titular de 5)
+LINEUP_SIZE = 5
+
+# Regras de round (simulation.js)
+ROUNDS_TO_WIN = 13          # Primeiro a 13 fora do overtime
+HALFTIME_ROUND = 13         # Troca de lado no início do round 13
+REGULATION_ROUNDS = 24      # 12-12 após o round 24 leva ao overtime
+OVERTIME_MARGIN = 2         # No overtime vence quem abrir 2 rounds
+
+WINS_NEEDED = {'BO1': 1, 'BO3': 2, 'BO5': 3}
+
+# Atributos usados em calculateTeamPower, na ordem das colunas do motor
+ATTRIBUTES = ('aim', 'gamesense', 'support', 'clutch')
+POWER_WEIGHTS = np.array([2.0, 1.5, 1.0, 0.5])
+DEFAULT_WEAPON_POWER = 3.0  # Vandal/Phantom fixo enquanto a economia está desligada
+
+ROLES = ('DUELIST', 'CONTROLLER', 'INITIATOR', 'SENTINEL', 'FLEX')
+ROLE_INDEX = {role: i for i, role in enumerate(ROLES)}
+
+# Distribuição de sobreviventes (simulateNextRound)
+STOMP_THRESHOLD = 0.25      # |winChanceA - 0.5| acima disso é "stomp"
+
+# Condições de vitória do round (roundHistory.condition)
+WIN_CONDITIONS = ('elimination', 'boom', 'defuse', 'time')
+ELIMINATION, BOOM, DEFUSE, TIME = range(4)
+
+
+def _packed_counts(choices, lane_bits):
+    """Conta quantas vezes cada jogador aparece em cada linha e empacota em lanes de bits."""
+    packed = np.zeros(len(choices), dtype=np.uint64)
+    for player in range(LINEUP_SIZE):
+        count = (choices == player).sum(axis=1).astype(np.uint64)
+        packed |= count << np.uint64(lane_bits * player)
+    return packed
+
+
+def _round_event_table():
+    """
+    Tabela de eventos de morte de um round, indexada por [mortes, evento].
+
+    Para d mortes de um time, cada evento combina um conjunto de vítimas
+    (sem reposição, como em distributeRoundStats) com a sequência de matadores
+    do adversário (sorteio uniforme com reposição, como getWeightedPlayer).
+    Cada entrada guarda as contagens empacotadas: lanes 0-4 são mortes da
+    vítima, lanes 5-9 são kills do adversário, EVENT_LANE_BITS bits por lane.
+    """
+    size = LINEUP_SIZE ** LINEUP_SIZE
+    table = np.zeros((LINEUP_SIZE + 1, size), dtype=np.uint64)
+    counts = np.zeros(LINEUP_SIZE + 1, dtype=np.uint64)
+    for deaths in range(LINEUP_SIZE + 1):
+        subsets = list(itertools.combinations(range(LINEUP_SIZE), deaths))
+        victims = _packed_counts(np.array(subsets, dtype=np.int64).reshape(len(subsets), deaths), EVENT_LANE_BITS)
+        sequences = (np.arange(LINEUP_SIZE ** deaths)[:, None] // LINEUP_SIZE ** np.arange(deaths)) % LINEUP_SIZE
+        killers = _packed_counts(sequences, EVENT_LANE_BITS) << np.uint64(EVENT_LANE_BITS * LINEUP_SIZE)
+        events = (victims[:, None] | killers[None, :]).ravel()
+        table[deaths, :len(events)] = events
+        counts[deaths] = len(events)
+    return table, counts
+
+
+# 6 bits por lane comportam 12 rounds de kills (no máximo 60) sem transbordar
+EVENT_LANE_BITS = 6
+EVENT_CHUNK_ROUNDS = 12
+EVENT_TABLE, EVENT_COUNTS = _round_event_table()
+EVENT_SHIFTS = (EVENT_LANE_BITS * np.arange(2 * LINEUP_SIZE)).astype(np.uint64)
+EVENT_LANE_MASK = np.uint64((1 << EVENT_LANE_BITS) - 1)
@@ -0,0 +1,364 @@
+"""
+Motor de mapas com economia: porta de EconomyManager/LoadoutDecider (economy.js).
+
+Créditos, loss streak e última vitória ficam em matrizes (5 x 2 x lote); só os
+24 rounds regulamentares são um laço em Python, cada um com operações sobre o
+lote inteiro. A compra de cada jogador (getLoadout/getPistolLoadout) vem de uma
+tabela montada uma vez por (round, buy state, role, sorteio, créditos): créditos
+são sempre múltiplos de 50, então a tabela é exata.
+
+No overtime todos recebem OVERTIME_CREDITS a cada round e fazem full buy
+(Vandal/Phantom + colete pesado para qualquer role), então a chance de round é
+a do motor sem economia e o overtime é o mesmo de match.complete_maps.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .constants import (
+    EVENT_LANE_MASK, EVENT_SHIFTS, EVENT_TABLE, HALFTIME_ROUND, LINEUP_SIZE, POWER_WEIGHTS, REGULATION_ROUNDS, ROLES,
+    STOMP_THRESHOLD,
+)
+from .match import complete_maps, event_index, round_deaths_of
+
+# Versão dos resultados deste motor (cache de balance_sweep); incrementar quando mudarem
+ECONOMY_VERSION = '2'
+
+# Regras de crédito (ECONOMY em economy.js)
+MAX_CREDITS = 9000
+INITIAL_CREDITS = 800
+OVERTIME_CREDITS = 5000
+MIN_NEXT_ROUND_BUY = 3300
+WIN_BONUS = 3000
+LOSS_BONUS = (0, 1900, 2400, 2900)     # por loss streak (3+ fica em 2900; 0 = venceu o round)
+KILL_BONUS = 200
+SPIKE_PLANT_BONUS = 300
+
+FULL_BUY_THRESHOLD = 3700
+FORCE_BUY_THRESHOLD = 2000
+
+WEAPON_PRICES = {
+    'classic': 0, 'shorty': 300, 'ghost': 500, 'sheriff': 800,
+    'stinger': 1100, 'spectre': 1600, 'judge': 1850,
+    'bulldog': 2050, 'guardian': 2250, 'outlaw': 2400, 'vandal': 2900, 'phantom': 2900,
+    'odin': 3200, 'operator': 4700,
+}
+
+# WEAPON_POWER de game_config.js
+WEAPON_POWER = {
+    'operator': 3.5, 'odin': 3.0, 'vandal': 3.0, 'phantom': 3.0,
+    'guardian': 2.2, 'bulldog': 2.2, 'outlaw': 2.2,
+    'spectre': 1.8, 'ares': 1.8, 'judge': 1.8, 'sheriff': 1.6, 'marshall': 1.6,
+    'ghost': 1.3, 'frenzy': 1.3, 'classic': 1.0, 'shorty': 1.0, 'stinger': 1.1,
+}
+
+# ROLE_LOADOUT_CONFIG: (arma eco, arma force, arma full, mult. eco, force, full, utilityDependency)
+ROLE_LOADOUTS = {
+    'DUELIST': ('sheriff', 'spectre', 'vandal', 0.6, 0.8, 1.0, 0.2),
+    'CONTROLLER': ('sheriff', 'stinger', 'phantom', 0.4, 0.65, 1.0, 0.4),
+    'INITIATOR': ('ghost', 'spectre', 'phantom', 0.4, 0.7, 1.0, 0.5),
+    'SENTINEL': ('sheriff', 'stinger', 'vandal', 0.5, 0.75, 1.0, 0.3),
+    'FLEX': ('sheriff', 'spectre', 'vandal', 0.5, 0.75, 1.0, 0.3),
+}
+
+# Buy states (BUY_STATE; HERO_BUY nunca é escolhido por decideBuyState)
+PISTOL, ECO, FORCE, FULL = range(4)
+BUY_STATES = ('PISTOL', 'ECO', 'FORCE_BUY', 'FULL_BUY')
+
+CREDIT_STEP = 50
+CREDIT_LEVELS = MAX_CREDITS // CREDIT_STEP + 1
+# Os Math.random() da compra só são comparados com múltiplos de 0.05
+ROLL_BUCKETS = 20
+
+
+def pistol_loadout(role, random):
+    """Porta de getPistolLoadout: (arma, multiplicador, custo)."""
+    if role in ('DUELIST', 'FLEX') and random < 0.5:
+        return 'classic', 0.85, 400
+    if random < 0.35:
+        return 'ghost', 0.9, 500
+    if role in ('CONTROLLER', 'INITIATOR', 'SENTINEL') and random < 0.7:
+        return 'classic', 0.75, 0
+    if role == 'DUELIST' and random > 0.8:
+        return 'sheriff', 1.1, 800
+    return 'classic', 0.8, 400
+
+
+def loadout(role, buy_state, credits, round_number=0, random=0.0):
+    """
+    Porta de getLoadout: (arma, multiplicador, custo). `random` é o Math.random()
+    do pistol ou da escolha Guardian/Bulldog do force. No round 2 o eco é sempre
+    de quem perdeu o pistol (loss streak 1).
+    """
+    eco_weapon, force_weapon, full_weapon, eco_mult, force_mult, full_mult, utility = ROLE_LOADOUTS[role]
+    if buy_state == PISTOL:
+        return pistol_loadout(role, random)
+
+    # Reserva de orçamento para utilitário
+    budget = credits
+    rich_force = buy_state == FORCE and credits > 2800
+    if not rich_force and buy_state in (FULL, FORCE):
+        if utility >= 0.4:
+            budget = max(0, credits - 600)
+        elif utility >= 0.3:
+            budget = max(0, credits - 400)
+
+    if buy_state == ECO:
+        if round_number == 2:
+            can_buy_sheriff = credits - WEAPON_PRICES['sheriff'] + LOSS_BONUS[2] >= MIN_NEXT_ROUND_BUY
+        else:
+            can_buy_sheriff = credits > 1400
+        if can_buy_sheriff:
+            return 'sheriff', eco_mult + 0.1, 800
+        if eco_weapon == 'sheriff':
+            return 'classic', 0.8, 0
+        return eco_weapon, eco_mult, WEAPON_PRICES[eco_weapon]
+
+    if buy_state == FORCE:
+        full_price = WEAPON_PRICES[full_weapon]
+        if round_number in (2, 14):
+            if budget >= full_price + 400:
+                return full_weapon, full_mult * 0.95, full_price + 400
+            if budget >= 2050 + 1000:
+                return 'bulldog', force_mult + 0.25, 3050
+
+        if budget >= 2050 + 400:
+            if budget >= 2250 + 400 and random > 0.7:
+                weapon, multiplier = 'guardian', force_mult + 0.2
+            else:
+                weapon, multiplier = 'bulldog', force_mult + 0.15
+        else:
+            weapon, multiplier = force_weapon, force_mult
+        cost = WEAPON_PRICES[weapon]
+        if rich_force and budget - cost >= 1000:
+            cost += 1000
+        elif budget - cost >= 400:
+            cost += 400
+        return weapon, multiplier, cost
+
+    meta_price = WEAPON_PRICES[full_weapon]
+    if budget >= meta_price + 1000:
+        return full_weapon, full_mult, meta_price + 1000
+    if budget >= 2050 + 1000:
+        return 'bulldog', full_mult * 0.9, 3050
+    if budget >= meta_price + 400:
+        return full_weapon, full_mult * 0.95, meta_price + 400
+    return 'spectre', force_mult, 2600
+
+
+@lru_cache(maxsize=None)
+def loadout_table():
+    """
+    (compras, pistols): arrays planos com uma entrada por compra (ver buys).
+
+    compras: fora do pistol, indexado por
+        (((tipo de round * 4 + buy state) * 5 + role) * 2 + guardian) * CREDIT_LEVELS + nível,
+        com guardian = sorteio > 0.7 do force (o único que sobra fora do pistol).
+    pistols: role * ROLL_BUCKETS + sorteio; no pistol todos têm INITIAL_CREDITS.
+
+    Nível é créditos / CREDIT_STEP; o custo também é em níveis e nunca passa dos créditos.
+    Poder é WEAPON_POWER da arma x multiplicador. Poder e custo dividem a entrada para
+    sair numa busca só, e a tabela (~170 KB) cabe no cache.
+    """
+    purchases = []
+    for round_number in (0, 2, 14):
+        for state in range(len(BUY_STATES)):
+            for role in ROLES:
+                for bucket in (0, ROLL_BUCKETS - 1):
+                    random = (bucket + 0.5) / ROLL_BUCKETS
+                    for level in range(CREDIT_LEVELS):
+                        weapon, multiplier, price = loadout(role, state, level * CREDIT_STEP, round_number, random)
+                        purchases.append((weapon, multiplier, min(price // CREDIT_STEP, level)))
+    pistols = []
+    for role in ROLES:
+        for bucket in range(ROLL_BUCKETS):
+            weapon, multiplier, price = pistol_loadout(role, (bucket + 0.5) / ROLL_BUCKETS)
+            pistols.append((weapon, multiplier, min(price, INITIAL_CREDITS) // CREDIT_STEP))
+    return _buy_entries(purchases), _buy_entries(pistols)
+
+
+def _buy_entries(purchases):
+    """(arma, multiplicador, custo) -> entradas uint64 com o poder em float32 e o custo em int16."""
+    table = np.zeros((len(purchases), 2), dtype=np.float32)
+    table[:, 0] = [WEAPON_POWER[weapon] * multiplier for weapon, multiplier, _ in purchases]
+    table.view(np.int16)[:, 2] = [cost for _, _, cost in purchases]
+    return table.view(np.uint64).ravel()
+
+
+def buys(entries):
+    """Entradas de loadout_table -> (poder, custo), views sem cópia."""
+    entries = entries[..., None]
+    return entries.view(np.float32)[..., 0], entries.view(np.int16)[..., 2]
+
+
+@lru_cache(maxsize=None)
+def kill_levels():
+    """
+    Bônus de kill em níveis por evento de EVENT_TABLE.ravel(): um byte por jogador
+    (kills x KILL_BONUS / CREDIT_STEP) numa entrada uint64, para somar direto aos créditos.
+    """
+    lanes = (EVENT_TABLE.ravel()[:, None] >> EVENT_SHIFTS[LINEUP_SIZE:]) & EVENT_LANE_MASK
+    table = np.zeros((lanes.shape[0], 8), dtype=np.uint8)
+    table[:, :LINEUP_SIZE] = lanes * np.uint64(KILL_BONUS // CREDIT_STEP)
+    return table.view(np.uint64).ravel()
+
+
+def buy_states(round_number, average, loss_streak, won_last):
+    """
+    Porta vetorizada de decideBuyState para (2, lote) times, em int8. Como
+    ECO < FORCE < FULL, o estado é o maior que o time pode pagar.
+    """
+    if round_number in (1, HALFTIME_ROUND):
+        return np.full(average.shape, PISTOL, dtype=np.int8)
+    if round_number in (2, HALFTIME_ROUND + 1):
+        return np.maximum(won_last * np.int8(FORCE), np.int8(ECO))
+    # Perdendo, só força com 3+ derrotas seguidas; full buy a partir de 3700 em qualquer caso
+    force = (average >= FORCE_BUY_THRESHOLD) & (won_last | (loss_streak >= 3))
+    full = average >= FULL_BUY_THRESHOLD
+    return np.maximum(np.maximum(force * np.int8(FORCE), full * np.int8(FULL)), np.int8(ECO))
+
+
+def simulate_maps_economy(attributes_a, attributes_b, roles_a, roles_b, n=None, rng=None,
+                          player_stats=True, history=False, balance=None):
+    """
+    Simula um lote de mapas com economia; mesmo retorno de simulate_maps.
+
+    attributes_a/b: (5, 4) ou (lote, 5, 4), como lineup_attributes.
+    roles_a/b: (5,) ou (lote, 5), como lineup_roles.
+    n: tamanho do lote quando nada acima tem eixo de lote.
+
+    A força de cada jogador no round é (aim*2 + gs*1.5 + support + clutch*0.5)
+    x poder da arma comprada; o dinheiro gasto sai dos créditos e o round paga
+    vitória (+300 se plantou), bônus de derrota pela streak e 200 por kill.
+
+    balance: balance.Balance liga as mecânicas de GameConfig.BALANCE (utilitário,
+        first kill, ecoVariance, killDistribution, tactical fatigue); sem ele, o
+        resultado é o da porta direta de economy.js.
+    """
+    rng = np.random.default_rng(rng)
+    attributes = np.stack(np.broadcast_arrays(
+        np.asarray(attributes_a, dtype=np.float64), np.asarray(attributes_b, dtype=np.float64),
+    ), axis=-3)
+    roles = np.stack(np.broadcast_arrays(np.asarray(roles_a), np.asarray(roles_b)), axis=-2)
+    skill, roles = np.broadcast_arrays(attributes @ POWER_WEIGHTS, roles)
+    if skill.ndim == 2:
+        skill, roles = (np.broadcast_to(array, (n or 1, 2, LINEUP_SIZE)) for array in (skill, roles))
+    batch = len(skill)
+
+    # Jogador no primeiro eixo, (5, 2, lote): somar o time vira somar 5 linhas contíguas
+    skill = np.ascontiguousarray(skill.transpose(2, 1, 0), dtype=np.float32)
+    roles = roles.transpose(2, 1, 0).astype(np.int16)
+    state_stride = len(ROLES) * 2 * CREDIT_LEVELS
+    role_index = roles * np.int16(2 * CREDIT_LEVELS)
+    pistol_index = roles * np.int16(ROLL_BUCKETS)
+    buy_table, pistol_table = loadout_table()
+    kill_table = kill_levels()
+
+    # Sorteios do tempo regulamentar; os da compra saem dentro do laço
+    a_roll = rng.random((REGULATION_ROUNDS, batch))
+    survivors = rng.random((REGULATION_ROUNDS, 2, batch), dtype=np.float32)
+    picks = rng.integers(0, 1 << 32, (REGULATION_ROUNDS, 2, batch), dtype=np.uint32)
+    planted = rng.random((batch, REGULATION_ROUNDS)) > 0.5
+    if balance is not None:
+        first_kill = rng.random((REGULATION_ROUNDS, batch))
+        gamesense = np.broadcast_to(attributes[..., 1].mean(axis=-1), (batch, 2)).T
+        first_kill_penalty = balance.first_kill_penalties(gamesense)
+        utility_offset = balance.utility_offsets(roles)
+        win_streak = np.zeros((2, batch), dtype=np.int16)
+
+    # Créditos em níveis de CREDIT_STEP (todos os valores da economia são múltiplos de 50)
+    levels = np.full((LINEUP_SIZE, 2, batch), INITIAL_CREDITS // CREDIT_STEP, dtype=np.int16)
+    loss_streak = np.zeros((2, batch), dtype=np.intp)
+    won_last = np.zeros((2, batch), dtype=bool)
+    a_wins = np.empty((batch, REGULATION_ROUNDS), dtype=bool)
+    events = np.empty((REGULATION_ROUNDS, 2, batch), dtype=np.uint64)
+    # Buffers reaproveitados a cada round: arrays novos desse tamanho custam mais que a conta
+    index = np.empty((LINEUP_SIZE, 2, batch), dtype=np.int16)
+    flat_index = index.reshape(-1)
+    player_offset = np.arange(LINEUP_SIZE)[:, None] * index[0].size
+    entries = np.empty((LINEUP_SIZE, 2, batch), dtype=np.uint64)
+    weapon_power, cost = buys(entries)
+    contribution = np.empty((LINEUP_SIZE, 2, batch), dtype=np.float32)
+    team_bonus = np.empty((2, batch), dtype=np.int16)
+    kills = np.empty((2, batch), dtype=np.uint64)
+    kill_bonus = kills[..., None].view(np.uint8)[..., :LINEUP_SIZE].transpose(2, 0, 1)
+    loss_bonus = np.array(LOSS_BONUS, dtype=np.int16) // CREDIT_STEP
+    win_bonus = np.ascontiguousarray(planted.T * np.int16(SPIKE_PLANT_BONUS // CREDIT_STEP))
+    win_bonus += WIN_BONUS // CREDIT_STEP
+
+    for i in range(REGULATION_ROUNDS):
+        round_number = i + 1
+        if round_number == HALFTIME_ROUND:
+            levels.fill(INITIAL_CREDITS // CREDIT_STEP)
+            loss_streak.fill(0)
+            if balance is not None:
+                win_streak.fill(0)
+
+        # LoadoutDecider: buy state do time, compra de cada jogador pela tabela
+        # Rounds com compra especial: 1 = round 2, 2 = round 14, 0 = os demais
+        kind = {2: 1, HALFTIME_ROUND + 1: 2}.get(round_number, 0)
+        average = levels.sum(axis=0, dtype=np.int16) * np.int16(CREDIT_STEP // LINEUP_SIZE)
+        states = buy_states(round_number, average, loss_streak, won_last)
+        if round_number in (1, HALFTIME_ROUND):
+            pistol_table.take(pistol_index + rng.integers(0, ROLL_BUCKETS, pistol_index.shape), out=entries, mode='clip')
+        else:
+            base = states.astype(np.int16)
+            base += kind * len(BUY_STATES)
+            base *= state_stride
+            np.add(role_index, base, out=index)
+            index += levels
+            # Fora do pistol o sorteio só decide Guardian x Bulldog no force (random > 0.7)
+            forcing = np.flatnonzero(states == FORCE)
+            guardian = rng.random((LINEUP_SIZE, forcing.size)) > 0.7
+            forced = (player_offset + forcing).ravel()
+            flat_index[forced] = flat_index.take(forced) + guardian.ravel() * np.int16(CREDIT_LEVELS)
+            buy_table.take(index, out=entries, mode='clip')
+        levels -= cost
+        if balance is not None:
+            weapon_power *= balance.buy_utility(levels, states, utility_offset, ECO, CREDIT_STEP)
+        np.multiply(skill, weapon_power, out=contribution)
+        power = contribution.sum(axis=0).astype(np.float64)
+
+        if balance is None:
+            p = power[0] / (power[0] + power[1])
+            a_won = a_roll[i] < p
+            round_deaths = np.stack(round_deaths_of(np.abs(p - 0.5) > STOMP_THRESHOLD, a_won, survivors[i]))
+        else:
+            # Duelo de abertura com a chance do round; quem perde leva a penalidade
+            a_first = first_kill[i] < power[0] / (power[0] + power[1])
+            power[0] *= 1 - first_kill_penalty[0] * ~a_first
+            power[1] *= 1 - first_kill_penalty[1] * a_first
+            power *= balance.fatigue(win_streak)
+            p = balance.round_chance(power[0] / (power[0] + power[1]), states)
+            a_won = a_roll[i] < p
+            round_deaths = np.stack(balance.round_deaths(p, a_won, survivors[i]))
+        a_wins[:, i] = a_won
+        event = event_index(picks[i], round_deaths).view(np.intp)
+        EVENT_TABLE.ravel().take(event, out=events[i], mode='clip')
+
+        # updateAfterRound: as kills de cada time estão no evento do adversário
+        won = np.stack([a_won, ~a_won])
+        loss_streak += 1
+        loss_streak *= ~won
+        if balance is not None:
+            win_streak += 1
+            win_streak *= won
+        # clip: streak 3+ fica em LOSS_BONUS[3]
+        loss_bonus.take(loss_streak, out=team_bonus, mode='clip')
+        team_bonus += won * win_bonus[i]
+        levels += team_bonus
+        kill_table.take(event[::-1], out=kills, mode='clip')
+        levels += kill_bonus
+        np.minimum(levels, MAX_CREDITS // CREDIT_STEP, out=levels)
+        won_last = won
+
+    # Overtime: OVERTIME_CREDITS a cada round, todos em full buy
+    overtime = FULL * state_stride + role_index + OVERTIME_CREDITS // CREDIT_STEP
+    overtime_power, overtime_cost = buys(buy_table.take(overtime))
+    if balance is not None:
+        leftover = OVERTIME_CREDITS // CREDIT_STEP - overtime_cost.astype(np.int16)
+        overtime_power *= balance.buy_utility(leftover, np.full((2, batch), FULL), utility_offset, ECO, CREDIT_STEP)
+    overtime_power = (skill * overtime_power).sum(axis=0, dtype=np.float64)
+    p_overtime = overtime_power[0] / (overtime_power[0] + overtime_power[1])
+    return complete_maps(rng, p_overtime, a_wins, player_stats, history, regulation=(events, planted))
@@ -0,0 +1,256 @@
+"""
+Motor vetorizado de mapas: porta de simulateNextRound/distributeRoundStats (simulation.js).
+
+Cada chamada simula um lote de mapas independentes como arrays NumPy
+(mapa x round x jogador) em vez de um objeto por jogador.
+"""
+
+import numpy as np
+
+from .constants import (
+    BOOM, DEFUSE, ELIMINATION, EVENT_CHUNK_ROUNDS, EVENT_COUNTS, EVENT_LANE_MASK, EVENT_SHIFTS,
+    EVENT_TABLE, HALFTIME_ROUND, LINEUP_SIZE, REGULATION_ROUNDS, ROUNDS_TO_WIN, STOMP_THRESHOLD, TIME,
+)
+
+# Índice do time vencedor em round_winners
+TEAM_A, TEAM_B, NOT_PLAYED = 0, 1, -1
+
+# Início da linha de cada contagem de mortes em EVENT_TABLE.ravel()
+_EVENT_OFFSETS = np.arange(LINEUP_SIZE + 1, dtype=np.uint64) * np.uint64(EVENT_TABLE.shape[1])
+
+
+class MapResults:
+    """
+    Resultado de um lote de mapas. O primeiro eixo de todos os arrays é o lote.
+
+    score_a, score_b: placar final de cada mapa.
+    kills, deaths: (lote, 2, 5) por jogador; eixo 1 é [time A, time B].
+    round_winners: (lote, rounds) com TEAM_A/TEAM_B e NOT_PLAYED depois do fim.
+    conditions: (lote, rounds) com índices de WIN_CONDITIONS (só com history=True).
+    round_events: (lote, 2, rounds) com o evento de mortes empacotado de cada round
+        (só com history=True e player_stats=True; desempacotar com round_stats).
+    """
+
+    def __init__(self, score_a, score_b, kills=None, deaths=None, round_winners=None, conditions=None,
+                 round_events=None):
+        self.score_a = score_a
+        self.score_b = score_b
+        self.kills = kills
+        self.deaths = deaths
+        self.round_winners = round_winners
+        self.conditions = conditions
+        self.round_events = round_events
+
+    def __len__(self):
+        return len(self.score_a)
+
+    @property
+    def rounds(self):
+        return self.score_a + self.score_b
+
+    @property
+    def winner_a(self):
+        return self.score_a > self.score_b
+
+
+def simulate_maps(win_prob, n=None, rng=None, player_stats=True, history=False):
+    """
+    Simula um lote de mapas.
+
+    win_prob: chance do time A vencer cada round (escalar ou array por mapa),
+        normalmente vinda de roster.round_win_probability.
+    n: tamanho do lote quando win_prob é escalar.
+    rng: np.random.Generator ou seed; o mesmo seed sempre gera o mesmo lote.
+    player_stats: calcula kills/deaths por jogador.
+    history: guarda vencedor e condição de cada round.
+    """
+    rng = np.random.default_rng(rng)
+    p = np.asarray(win_prob, dtype=np.float64)
+    if p.ndim == 0:
+        p = np.full(n or 1, float(p))
+
+    # Tempo regulamentar: primeiro a 13 dentro de 24 rounds
+    a_wins = rng.random((p.size, REGULATION_ROUNDS)) < p[:, None]
+    return complete_maps(rng, p, a_wins, player_stats, history)
+
+
+def complete_maps(rng, p, a_wins, player_stats=True, history=False, regulation=None):
+    """
+    Fecha um lote a partir dos 24 rounds regulamentares já sorteados (a_wins,
+    inclusive os que ficam depois do fim do mapa): placar, overtime com chance
+    de round p, stats e histórico.
+
+    regulation: (eventos, plantou) já sorteados para os rounds regulamentares:
+    eventos por round (rounds, 2, lote), zerados aqui mesmo nos rounds não jogados,
+    e plantou com o shape de conditions; sem ele, são sorteados aqui (motor sem
+    economia, ver economy.py).
+    """
+    batch = len(p)
+    rows = np.arange(batch)
+    cum_a = np.cumsum(a_wins, axis=1, dtype=np.int16)
+    cum_b = np.arange(1, REGULATION_ROUNDS + 1, dtype=np.int16) - cum_a
+    done = (cum_a >= ROUNDS_TO_WIN) | (cum_b >= ROUNDS_TO_WIN)
+    finished = done[:, -1]
+    played = np.where(finished, done.argmax(axis=1) + 1, REGULATION_ROUNDS).astype(np.int16)
+    score_a = cum_a[rows, played - 1]
+    score_b = played - score_a
+
+    # Overtime (checkOvertimeStatus): pares de rounds até alguém abrir 2
+    overtime = []
+    pending = np.flatnonzero(~finished)
+    while pending.size:
+        pair = rng.random((pending.size, 2)) < p[pending, None]
+        overtime.append((pending, pair))
+        won_a = pair.sum(axis=1, dtype=np.int16)
+        score_a[pending] += won_a
+        score_b[pending] += 2 - won_a
+        pending = pending[pair[:, 0] != pair[:, 1]]
+
+    results = MapResults(score_a, score_b)
+    if not (player_stats or history):
+        return results
+
+    # Rounds do overtime só existem para os mapas que chegaram a 12-12
+    regulation_played = np.arange(REGULATION_ROUNDS) < played[:, None]
+    overtime_rows = np.flatnonzero(~finished)
+    overtime_winners = np.full((overtime_rows.size, 2 * len(overtime)), NOT_PLAYED, dtype=np.int8)
+    for i, (idx, pair) in enumerate(overtime):
+        overtime_winners[np.searchsorted(overtime_rows, idx), 2 * i:2 * i + 2] = np.where(pair, TEAM_A, TEAM_B)
+
+    if player_stats:
+        if regulation is None:
+            results.kills, results.deaths, events = _distribute_stats(rng, p, a_wins, regulation_played)
+        else:
+            events = regulation[0]
+            events *= regulation_played.T[:, None]
+            results.kills, results.deaths = _sum_round_events(events)
+            events = events.transpose(2, 1, 0)
+        if overtime_rows.size:
+            kills, deaths, overtime_events = _distribute_stats(
+                rng, p[overtime_rows], overtime_winners == TEAM_A, overtime_winners != NOT_PLAYED,
+            )
+            results.kills[overtime_rows] += kills
+            results.deaths[overtime_rows] += deaths
+
+    if history:
+        winners = np.full((batch, REGULATION_ROUNDS + overtime_winners.shape[1]), NOT_PLAYED, dtype=np.int8)
+        winners[:, :REGULATION_ROUNDS] = np.where(regulation_played, np.where(a_wins, TEAM_A, TEAM_B), NOT_PLAYED)
+        winners[overtime_rows, REGULATION_ROUNDS:] = overtime_winners
+        results.round_winners = winners
+        if regulation is None:
+            planted = rng.random(winners.shape) > 0.5
+        else:
+            planted = np.concatenate([regulation[1], rng.random((batch, overtime_winners.shape[1])) > 0.5], axis=1)
+        roll = rng.random(winners.shape)
+        results.conditions = _win_conditions(winners == TEAM_A, winners != NOT_PLAYED, planted, roll)
+        if player_stats:
+            # Rounds não jogados têm 0 mortes, cujo único evento é 0
+            results.round_events = np.zeros((batch, 2, winners.shape[1]), dtype=np.uint64)
+            results.round_events[..., :REGULATION_ROUNDS] = events
+            if overtime_rows.size:
+                results.round_events[overtime_rows, :, REGULATION_ROUNDS:] = overtime_events
+    return results
+
+
+def round_stats(round_events):
+    """
+    Desempacota MapResults.round_events em (kills, deaths), ambos
+    (lote, rounds, 2, 5): kills e mortes de cada jogador em cada round.
+    """
+    lanes = ((np.swapaxes(round_events, -1, -2)[..., None] >> EVENT_SHIFTS) & EVENT_LANE_MASK).astype(np.int8)
+    return lanes[..., ::-1, LINEUP_SIZE:], lanes[..., :LINEUP_SIZE]
+
+
+def _distribute_stats(rng, p, a_won, is_played):
+    """
+    Porta de distributeRoundStats agregada por mapa.
+
+    Cada round sorteia os sobreviventes de cada lado e, para cada time, um
+    evento de EVENT_TABLE (vítimas + matadores do adversário). As contagens
+    empacotadas são somadas em blocos de EVENT_CHUNK_ROUNDS e desempacotadas
+    no fim, evitando arrays por jogador por round. Retorna (kills, deaths, eventos);
+    os eventos (lote, 2, rounds) viram o histórico por round (round_stats).
+    """
+    batch, rounds = a_won.shape
+    stomp = (np.abs(p - 0.5) > STOMP_THRESHOLD)[:, None]
+    survivors = rng.random((2, batch, rounds), dtype=np.float32)
+    round_deaths = np.empty((batch, 2, rounds), dtype=np.uint8)
+    deaths_a, deaths_b = round_deaths_of(stomp, a_won, survivors)
+    np.copyto(round_deaths[:, 0], deaths_a)
+    np.copyto(round_deaths[:, 1], deaths_b)
+    round_deaths *= is_played[:, None]
+
+    events = pick_events(rng.integers(0, 1 << 32, round_deaths.shape, dtype=np.uint32), round_deaths)
+    return (*_sum_events(events), events)
+
+
+def round_deaths_of(stomp, a_won, survivors):
+    """
+    Mortes de (A, B) no round a partir dos sorteios de sobreviventes
+    (survivors[0] para o vencedor, survivors[1] para o perdedor); qualquer shape.
+    Só contas em uint8: np.where com máscaras aleatórias custa várias vezes mais.
+    """
+    close = ~stomp
+    # stomp: vencedor fica com 4 ou 5 vivos; equilibrado: 2 ou 3 vivos
+    winner_deaths = (stomp & (survivors[0] > 0.5)) + close * (2 + (survivors[0] < 0.5)).astype(np.uint8)
+    # Perdedor salva 1 com chance de 30% (stomp) ou 20%
+    loser_saves = (survivors[1] > np.float64(0.8)) | (stomp & (survivors[1] > np.float64(0.7)))
+    loser_deaths = LINEUP_SIZE - loser_saves.astype(np.uint8)
+    swap = (winner_deaths ^ loser_deaths) * a_won
+    return loser_deaths ^ swap, winner_deaths ^ swap
+
+
+def pick_events(picks, round_deaths):
+    """Evento empacotado de EVENT_TABLE para cada contagem de mortes (picks: uint32 uniformes)."""
+    return EVENT_TABLE.ravel()[event_index(picks, round_deaths)]
+
+
+def event_index(picks, round_deaths):
+    """Índice em EVENT_TABLE.ravel() do evento sorteado para cada contagem de mortes."""
+    index = picks * EVENT_COUNTS.take(round_deaths)
+    index >>= np.uint64(32)
+    index += _EVENT_OFFSETS.take(round_deaths)
+    return index
+
+
+def _sum_events(events):
+    """Soma os eventos (lote, 2, rounds) em kills e mortes (lote, 2, 5)."""
+    batch, _, rounds = events.shape
+    kills = np.zeros((batch, 2, LINEUP_SIZE), dtype=np.int16)
+    deaths = np.zeros((batch, 2, LINEUP_SIZE), dtype=np.int16)
+    for start in range(0, rounds, EVENT_CHUNK_ROUNDS):
+        packed = events[..., start:start + EVENT_CHUNK_ROUNDS].sum(axis=-1, dtype=np.uint64)
+        lanes = ((packed[..., None] >> EVENT_SHIFTS) & EVENT_LANE_MASK).astype(np.int16)
+        deaths += lanes[..., :LINEUP_SIZE]
+        kills += lanes[:, ::-1, LINEUP_SIZE:]
+    return kills, deaths
+
+
+def _sum_round_events(events):
+    """Como _sum_events, para eventos (rounds, 2, lote): cada bloco soma linhas contíguas."""
+    kills = np.zeros((2, LINEUP_SIZE, events.shape[-1]), dtype=np.int16)
+    deaths = np.zeros((2, LINEUP_SIZE, events.shape[-1]), dtype=np.int16)
+    for start in range(0, len(events), EVENT_CHUNK_ROUNDS):
+        packed = events[start:start + EVENT_CHUNK_ROUNDS].sum(axis=0, dtype=np.uint64)
+        lanes = ((packed[:, None] >> EVENT_SHIFTS[:, None]) & EVENT_LANE_MASK).astype(np.int16)
+        deaths += lanes[:, :LINEUP_SIZE]
+        kills += lanes[::-1, LINEUP_SIZE:]
+    return kills.transpose(2, 0, 1), deaths.transpose(2, 0, 1)
+
+
+def _win_conditions(a_won, is_played, planted, roll):
+    """
+    Porta de determineWinCondition (A defende no 1º tempo e nos rounds ímpares do OT).
+    planted/roll: sorteios de spikePlanted e da condição, (lote, rounds).
+    """
+    batch, rounds = a_won.shape
+    round_number = np.arange(1, rounds + 1)
+    a_defends = (round_number < HALFTIME_ROUND) | ((round_number > REGULATION_ROUNDS) & (round_number % 2 == 1))
+    winner_defends = np.where(a_won, a_defends, ~a_defends)
+    conditions = np.where(
+        winner_defends,
+        np.where(planted, DEFUSE, np.where(roll > 0.7, TIME, ELIMINATION)),
+        np.where(planted & (roll > 0.4), BOOM, ELIMINATION),
+    ).astype(np.int8)
+    conditions[~is_played] = -1
+    return conditions
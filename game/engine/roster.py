@@ -0,0 +1,67 @@
+"""
+Conversão de lineups (objetos Player ou dicts) para os arrays usados pelo motor.
+"""
+
+import hashlib
+
+import numpy as np
+
+from .constants import ATTRIBUTES, DEFAULT_WEAPON_POWER, LINEUP_SIZE, POWER_WEIGHTS, ROLE_INDEX
+
+
+def _value(player, name, default=None):
+    if isinstance(player, dict):
+        return player.get(name, default)
+    return getattr(player, name, default)
+
+
+def lineup_attributes(players):
+    """
+    Retorna um array (5, 4) com aim/gamesense/support/clutch dos 5 titulares.
+    Assim como Team.calculate_team_overall, só os 5 primeiros jogadores contam.
+    """
+    players = list(players)[:LINEUP_SIZE]
+    if len(players) < LINEUP_SIZE:
+        raise ValueError(f"Lineup needs {LINEUP_SIZE} players, got {len(players)}")
+    return np.array(
+        [[_value(p, attr) or 10 for attr in ATTRIBUTES] for p in players],
+        dtype=np.float64,
+    )
+
+
+def lineup_roles(players):
+    """Índices de role (ver constants.ROLES) dos 5 titulares; desconhecidas viram FLEX."""
+    players = list(players)[:LINEUP_SIZE]
+    return np.array(
+        [ROLE_INDEX.get(str(_value(p, 'role', 'FLEX')).upper(), ROLE_INDEX['FLEX']) for p in players],
+        dtype=np.int8,
+    )
+
+
+def team_power(attributes, weapon_power=DEFAULT_WEAPON_POWER):
+    """
+    Porta de calculateTeamPower: soma de (aim*2 + gs*1.5 + support + clutch*0.5) * arma.
+    Aceita (5, 4) ou (batch, 5, 4).
+    """
+    attributes = np.asarray(attributes, dtype=np.float64)
+    return (attributes @ POWER_WEIGHTS * weapon_power).sum(axis=-1)
+
+
+def round_win_probability(attributes_a, attributes_b):
+    """Chance do time A vencer cada round (winChanceA em simulateNextRound)."""
+    power_a = team_power(attributes_a)
+    power_b = team_power(attributes_b)
+    return power_a / (power_a + power_b)
+
+
+def lineup_fingerprint(players):
+    """
+    Hash estável dos dados da lineup que afetam a simulação (atributos e role dos titulares).
+    Serve de chave de cache: muda sempre que um titular muda de atributo, role ou é trocado.
+    """
+    players = list(players)[:LINEUP_SIZE]
+    payload = '|'.join(
+        ','.join(str(_value(p, field)) for field in ('id', 'role') + ATTRIBUTES)
+        for p in players
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
@@ -0,0 +1,77 @@
+"""
+Séries BO1/BO3/BO5 em lote, usando o motor de mapas.
+"""
+
+import numpy as np
+
+from .constants import LINEUP_SIZE, WINS_NEEDED
+from .match import simulate_maps
+
+
+class SeriesResults:
+    """
+    Resultado de um lote de séries.
+
+    maps_a, maps_b: mapas vencidos por cada time.
+    map_scores: (lote, mapas, 2) com o placar de cada mapa; -1 nos mapas não jogados.
+    kills, deaths: (lote, 2, 5) somados em todos os mapas jogados.
+    rounds: total de rounds jogados na série.
+    """
+
+    def __init__(self, maps_a, maps_b, map_scores, rounds, kills=None, deaths=None):
+        self.maps_a = maps_a
+        self.maps_b = maps_b
+        self.map_scores = map_scores
+        self.rounds = rounds
+        self.kills = kills
+        self.deaths = deaths
+
+    def __len__(self):
+        return len(self.maps_a)
+
+    @property
+    def winner_a(self):
+        return self.maps_a > self.maps_b
+
+
+def simulate_series(win_prob, series_format='BO1', n=None, rng=None, player_stats=True):
+    """
+    Simula um lote de séries no formato BO1/BO3/BO5 (winsNeeded em simulation.js).
+    Cada mapa seguinte só é simulado para as séries ainda em aberto.
+    """
+    if series_format not in WINS_NEEDED:
+        raise ValueError(f"Unknown series format: {series_format}")
+    wins_needed = WINS_NEEDED[series_format]
+    max_maps = 2 * wins_needed - 1
+
+    rng = np.random.default_rng(rng)
+    p = np.asarray(win_prob, dtype=np.float64)
+    if p.ndim == 0:
+        p = np.full(n or 1, float(p))
+    batch = len(p)
+
+    maps_a = np.zeros(batch, dtype=np.int8)
+    maps_b = np.zeros(batch, dtype=np.int8)
+    map_scores = np.full((batch, max_maps, 2), -1, dtype=np.int16)
+    rounds = np.zeros(batch, dtype=np.int16)
+    kills = deaths = None
+    if player_stats:
+        kills = np.zeros((batch, 2, LINEUP_SIZE), dtype=np.int32)
+        deaths = np.zeros((batch, 2, LINEUP_SIZE), dtype=np.int32)
+
+    pending = np.arange(batch)
+    for map_index in range(max_maps):
+        result = simulate_maps(p[pending], rng=rng, player_stats=player_stats)
+        map_scores[pending, map_index, 0] = result.score_a
+        map_scores[pending, map_index, 1] = result.score_b
+        rounds[pending] += result.rounds
+        maps_a[pending] += result.winner_a
+        maps_b[pending] += ~result.winner_a
+        if player_stats:
+            kills[pending] += result.kills
+            deaths[pending] += result.deaths
+        pending = pending[(maps_a[pending] < wins_needed) & (maps_b[pending] < wins_needed)]
+        if not pending.size:
+            break
+
+    return SeriesResults(maps_a, maps_b, map_scores, rounds, kills, deaths)
@@ -0,0 +1,236 @@
+"""
+Simulação Monte Carlo de campeonatos (eliminação simples, dupla e Swiss + playoffs).
+
+Cada iteração é um campeonato completo; todas as iterações de um bloco andam juntas,
+rodada por rodada, como um único lote de séries no motor. Os blocos têm tamanho fixo
+e cada um recebe seu próprio stream de RNG (SeedSequence.spawn), então o resultado
+para um seed é o mesmo independente do número de processos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .roster import team_power
+from .series import simulate_series
+
+FORMATS = ('single_elimination', 'double_elimination', 'swiss')
+BLOCK_SIZE = 10_000
+BYE = -1
+
+
+class TournamentResults:
+    """
+    stages: nomes das fases, em ordem de progressão (a última é 'Champion').
+    probabilities: (times, fases) com a chance de cada time chegar a cada fase.
+    """
+
+    def __init__(self, stages, probabilities, iterations):
+        self.stages = stages
+        self.probabilities = probabilities
+        self.iterations = iterations
+
+    def as_dict(self, team_names):
+        return {
+            name: dict(zip(self.stages, map(float, row)))
+            for name, row in zip(team_names, self.probabilities)
+        }
+
+
+def win_prob_matrix(attributes):
+    """(T, T) com a chance do time da linha vencer um round contra o da coluna."""
+    power = team_power(attributes)
+    return power[:, None] / (power[:, None] + power[None, :])
+
+
+def bracket_order(size):
+    """Posições do chaveamento padrão: 1º enfrenta o último, 2º o penúltimo, etc."""
+    order = [0]
+    while len(order) < size:
+        mirror = 2 * len(order) - 1
+        order = [slot for seed in order for slot in (seed, mirror - seed)]
+    return order
+
+
+def stage_name(teams_left):
+    return {2: 'Final', 4: 'Semifinals', 8: 'Quarterfinals'}.get(teams_left, f'Round of {teams_left}')
+
+
+def simulate_tournament(attributes, tournament_format='single_elimination', series='BO3', final_series=None,
+                        iterations=100_000, seed=None, workers=None, swiss_wins=3, swiss_losses=3):
+    """
+    Simula o campeonato `iterations` vezes.
+
+    attributes: (T, 5, 4) com as lineups na ordem de seed (o 1º é o cabeça de chave).
+    series / final_series: formato das séries (BO1/BO3/BO5) e da final.
+    swiss_wins / swiss_losses: vitórias para classificar e derrotas para cair no Swiss;
+        os classificados seguem para playoffs de eliminação simples.
+    workers: processos do pool (1 roda no processo atual).
+    """
+    if tournament_format not in FORMATS:
+        raise ValueError(f"Unknown tournament format: {tournament_format}")
+    teams = len(attributes)
+    if teams < 2:
+        raise ValueError("A tournament needs at least 2 teams")
+
+    win_prob = win_prob_matrix(np.asarray(attributes, dtype=np.float64))
+    options = {
+        'tournament_format': tournament_format,
+        'series': series,
+        'final_series': final_series or series,
+        'swiss_wins': swiss_wins,
+        'swiss_losses': swiss_losses,
+    }
+    sizes = [min(BLOCK_SIZE, iterations - start) for start in range(0, iterations, BLOCK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(win_prob, options, size, block_seed) for size, block_seed in zip(sizes, seeds)]
+
+    if workers == 1:
+        blocks = [simulate_block(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(simulate_block, *zip(*tasks)))
+
+    stages = list(blocks[0])
+    counts = np.stack([sum(block[stage] for block in blocks) for stage in stages], axis=1)
+    return TournamentResults(stages, counts / iterations, iterations)
+
+
+def simulate_block(win_prob, options, iterations, seed):
+    """Simula um bloco de iterações; retorna {fase: contagem por time}."""
+    rng = np.random.default_rng(seed)
+    teams = len(win_prob)
+    stages = _StageCounter(teams)
+    seeds = np.broadcast_to(np.arange(teams), (iterations, teams))
+
+    if options['tournament_format'] == 'swiss':
+        seeds = _swiss(win_prob, seeds, options, rng, stages)
+
+    slots = _seed_bracket(seeds)
+    if options['tournament_format'] == 'double_elimination':
+        champion = _double_elimination(win_prob, slots, options, rng, stages)
+    else:
+        champion = _single_elimination(win_prob, slots, options, rng, stages)
+    stages.record('Champion', champion)
+    return stages.counts
+
+
+class _StageCounter:
+    def __init__(self, teams):
+        self.teams = teams
+        self.counts = {}
+
+    def record(self, stage, slots):
+        present = slots[slots != BYE]
+        counts = np.bincount(present, minlength=self.teams)
+        self.counts[stage] = self.counts.get(stage, 0) + counts
+
+
+def _play(win_prob, team_a, team_b, series_format, rng):
+    """Joga as séries a x b (arrays de mesmo shape); BYE perde automaticamente."""
+    win_a = team_b == BYE
+    real = (team_a != BYE) & (team_b != BYE)
+    if real.any():
+        result = simulate_series(win_prob[team_a[real], team_b[real]], series_format, rng=rng, player_stats=False)
+        win_a = win_a.copy()
+        win_a[real] = result.winner_a
+    return np.where(win_a, team_a, team_b), np.where(win_a, team_b, team_a)
+
+
+def _seed_bracket(seeds):
+    """Completa com BYE até a próxima potência de 2 e distribui no chaveamento padrão."""
+    iterations, teams = seeds.shape
+    size = 1 << (teams - 1).bit_length()
+    padded = np.full((iterations, size), BYE, dtype=np.int64)
+    padded[:, :teams] = seeds
+    return padded[:, bracket_order(size)]
+
+
+def _round_series(options, teams_left):
+    return options['final_series'] if teams_left == 2 else options['series']
+
+
+def _single_elimination(win_prob, slots, options, rng, stages):
+    while slots.shape[1] > 1:
+        teams_left = slots.shape[1]
+        stages.record(stage_name(teams_left), slots)
+        slots, _ = _play(win_prob, slots[:, 0::2], slots[:, 1::2], _round_series(options, teams_left), rng)
+    return slots[:, 0]
+
+
+def _double_elimination(win_prob, slots, options, rng, stages):
+    """
+    Upper bracket em eliminação simples; os perdedores de cada rodada caem para o lower,
+    que alterna rodadas internas e rodadas contra quem caiu do upper. Grande final sem reset.
+    """
+    series = options['series']
+    lower = None
+    lower_round = 0
+    while slots.shape[1] > 1:
+        stages.record(f'Upper {stage_name(slots.shape[1])}', slots)
+        slots, dropped = _play(win_prob, slots[:, 0::2], slots[:, 1::2], series, rng)
+        if lower is None:
+            lower = dropped
+        else:
+            # Quem cai do upper enfrenta o lower em ordem invertida para evitar revanche imediata
+            lower_round += 1
+            final = slots.shape[1] == 1 and lower.shape[1] == 1
+            stages.record('Lower Final' if final else f'Lower Round {lower_round}', lower)
+            lower, _ = _play(win_prob, lower, dropped[:, ::-1], series, rng)
+        if lower.shape[1] > 1:
+            lower_round += 1
+            stages.record(f'Lower Round {lower_round}', lower)
+            lower, _ = _play(win_prob, lower[:, 0::2], lower[:, 1::2], series, rng)
+
+    stages.record('Grand Final', np.concatenate([slots, lower], axis=1))
+    champion, _ = _play(win_prob, slots[:, 0], lower[:, 0], options['final_series'], rng)
+    return champion
+
+
+def _swiss(win_prob, seeds, options, rng, stages):
+    """
+    Fase Swiss: a cada rodada os times ativos são pareados dentro do mesmo placar
+    (ordem aleatória no empate, sem evitar revanches). Com um número ímpar de
+    ativos (inclusive um número ímpar de times já na primeira rodada), o que
+    sobra ganha um bye (conta como vitória; fase 'Swiss Bye').
+    Retorna os classificados em ordem de seed para os playoffs (menos derrotas
+    primeiro), completando com BYE.
+    """
+    iterations, teams = seeds.shape
+    need_wins, max_losses = options['swiss_wins'], options['swiss_losses']
+    # Número ímpar de times: uma coluna fantasma já eliminada completa os pares
+    columns = teams + teams % 2
+    seeds = np.pad(seeds, ((0, 0), (0, columns - teams)), constant_values=BYE)
+    wins = np.zeros((iterations, columns), dtype=np.int8)
+    losses = np.zeros((iterations, columns), dtype=np.int8)
+    losses[:, teams:] = max_losses
+    byes = np.zeros((iterations, columns), dtype=bool)
+    rows = np.arange(iterations)[:, None]
+
+    for _ in range(need_wins + max_losses - 1):
+        active = (wins < need_wins) & (losses < max_losses)
+        if not active.any():
+            break
+        key = np.where(active, -wins, need_wins) + rng.random((iterations, columns)) * 0.5
+        order = np.argsort(key, axis=1)
+        col_a, col_b = order[:, 0::2], order[:, 1::2]
+        playing = active[rows, col_a] & active[rows, col_b]
+        # Os ativos vêm primeiro na ordem: só o último ativo pode ficar sem par
+        bye = active[rows, col_a] & ~active[rows, col_b]
+
+        team_a = np.where(playing, seeds[rows, col_a], BYE)
+        team_b = np.where(playing, seeds[rows, col_b], BYE)
+        winner, _ = _play(win_prob, team_a, team_b, options['series'], rng)
+        a_won = winner == team_a
+        wins[rows, col_a] += (playing & a_won) | bye
+        losses[rows, col_a] += playing & ~a_won
+        wins[rows, col_b] += playing & ~a_won
+        losses[rows, col_b] += playing & a_won
+        byes[rows, col_a] |= bye
+
+    stages.record('Swiss Bye', np.where(byes, seeds, BYE))
+    qualified = wins >= need_wins
+    stages.record('Qualified', np.where(qualified, seeds, BYE))
+    size = int(qualified.sum(axis=1).max())
+    order = np.argsort(np.where(qualified, losses, max_losses + 1), axis=1, kind='stable')[:, :size]
+    return np.where(qualified[rows, order], seeds[rows, order], BYE)
@@ -0,0 +1,152 @@
+"""
+Matriz pré-computada de confrontos (todos os pares ordenados de times).
+
+O artefato é um .npz com:
+    team_ids      (T,)    ids dos times, na ordem das linhas/colunas
+    fingerprints  (T,)    lineup_fingerprint de cada time no momento do build
+    win_prob      (T, T)  chance do time da linha vencer o da coluna
+    round_diff    (T, T)  saldo de rounds esperado (linha - coluna) na série
+    series_format, simulations
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+
+from .engine import lineup_attributes, lineup_fingerprint, round_win_probability, simulate_series
+from .engine.constants import ATTRIBUTES, LINEUP_SIZE
+
+# Pares simulados por tarefa enviada ao pool
+PAIRS_PER_TASK = 64
+
+_loaded = {'key': None, 'matrix': None}
+
+
+def matrix_path():
+    return getattr(settings, 'HEAD_TO_HEAD_PATH', settings.BASE_DIR / 'data' / 'head_to_head.npz')
+
+
+def load_matrix(path=None):
+    """Carrega o artefato (ou None se não existir); recarrega só quando o arquivo muda."""
+    path = path or matrix_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _loaded['key'] != (str(path), mtime):
+        with np.load(path) as data:
+            _loaded['matrix'] = {key: data[key] for key in data.files}
+        _loaded['key'] = (str(path), mtime)
+    return _loaded['matrix']
+
+
+def save_matrix(matrix, path=None):
+    path = path or matrix_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp.npz'
+    np.savez_compressed(tmp_path, **matrix)
+    os.replace(tmp_path, path)
+
+
+def matrix_payload(matrix=None):
+    """Versão JSON das chances de vitória para o front-end (arredondadas)."""
+    matrix = matrix if matrix is not None else load_matrix()
+    if matrix is None:
+        return None
+    return {
+        'format': str(matrix['series_format']),
+        'team_ids': matrix['team_ids'].tolist(),
+        'win_prob': np.round(matrix['win_prob'], 3).tolist(),
+    }
+
+
+def matchup(team_a_id, team_b_id, matrix=None):
+    """(win_prob, round_diff) do time A contra o B, ou None se o par não estiver na matriz."""
+    matrix = matrix if matrix is not None else load_matrix()
+    if matrix is None:
+        return None
+    index = {team_id: i for i, team_id in enumerate(matrix['team_ids'].tolist())}
+    if team_a_id not in index or team_b_id not in index:
+        return None
+    i, j = index[team_a_id], index[team_b_id]
+    return float(matrix['win_prob'][i, j]), float(matrix['round_diff'][i, j])
+
+
+def simulate_pairs(win_probs, series_format, n, seed):
+    """
+    Simula n séries para cada par e retorna (vitórias do A, saldo médio de rounds) por par.
+    Função de topo para poder rodar dentro do ProcessPoolExecutor.
+    """
+    series = simulate_series(np.repeat(win_probs, n), series_format, rng=seed, player_stats=False)
+    scores = series.map_scores.astype(np.int32)
+    played = scores[..., 0] >= 0
+    diff = ((scores[..., 0] - scores[..., 1]) * played).sum(axis=1)
+    return (
+        series.winner_a.reshape(-1, n).mean(axis=1),
+        diff.reshape(-1, n).mean(axis=1),
+    )
+
+
+def build_matrix(lineups, series_format='BO1', n=1000, previous=None, workers=None, seed=None, log=None):
+    """
+    Monta a matriz para lineups ({team_id: jogadores titulares}).
+
+    Com previous (matriz anterior no mesmo formato e n), reaproveita todos os pares
+    cujos dois times mantiveram o fingerprint e só simula linhas/colunas dos times
+    novos ou alterados. Retorna (matriz, número de pares simulados); sem lineups,
+    a matriz é vazia.
+    """
+    team_ids = np.array(sorted(lineups), dtype=np.int64)
+    fingerprints = np.array([lineup_fingerprint(lineups[t]) for t in team_ids], dtype=str)
+    attributes = np.array([lineup_attributes(lineups[t]) for t in team_ids]).reshape(-1, LINEUP_SIZE, len(ATTRIBUTES))
+    size = len(team_ids)
+
+    win_prob = np.full((size, size), 0.5, dtype=np.float32)
+    round_diff = np.zeros((size, size), dtype=np.float32)
+    dirty = np.ones(size, dtype=bool)
+
+    reusable = (
+        previous is not None
+        and str(previous['series_format']) == series_format
+        and int(previous['simulations']) == n
+    )
+    if reusable:
+        old_index = {team_id: i for i, team_id in enumerate(previous['team_ids'].tolist())}
+        rows = np.array([old_index.get(t, -1) for t in team_ids.tolist()])
+        known = rows >= 0
+        unchanged = known.copy()
+        unchanged[known] = previous['fingerprints'][rows[known]] == fingerprints[known]
+        keep = np.flatnonzero(unchanged)
+        win_prob[np.ix_(keep, keep)] = previous['win_prob'][np.ix_(rows[keep], rows[keep])]
+        round_diff[np.ix_(keep, keep)] = previous['round_diff'][np.ix_(rows[keep], rows[keep])]
+        dirty = ~unchanged
+
+    # Pares ordenados (i, j), i != j, em que pelo menos um dos times mudou
+    rows_i, cols_j = np.nonzero((dirty[:, None] | dirty[None, :]) & ~np.eye(size, dtype=bool))
+    if log:
+        log(f'{int(dirty.sum())} of {size} teams changed, {len(rows_i)} pairs to simulate')
+
+    if len(rows_i):
+        probs = round_win_probability(attributes[rows_i], attributes[cols_j])
+        chunks = [slice(start, start + PAIRS_PER_TASK) for start in range(0, len(rows_i), PAIRS_PER_TASK)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        tasks = [(probs[chunk], series_format, n, chunk_seed) for chunk, chunk_seed in zip(chunks, seeds)]
+        if workers == 1:
+            results = [simulate_pairs(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(simulate_pairs, *zip(*tasks)))
+        win_prob[rows_i, cols_j] = np.concatenate([wins for wins, _ in results])
+        round_diff[rows_i, cols_j] = np.concatenate([diff for _, diff in results])
+
+    matrix = {
+        'team_ids': team_ids,
+        'fingerprints': fingerprints,
+        'win_prob': win_prob,
+        'round_diff': round_diff,
+        'series_format': np.array(series_format),
+        'simulations': np.array(n),
+    }
+    return matrix, len(rows_i)
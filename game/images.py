@@ -0,0 +1,118 @@
+"""
+Variantes responsivas das imagens (logos, fotos, minimapas) em WebP.
+
+Cada imagem ganha uma versão por largura de VARIANT_WIDTHS em
+MEDIA_ROOT/variants/<pasta>/<nome>-<largura>.webp. Como o original já é salvo
+com o hash do conteúdo no nome (game/storage.py), o nome da variante herda esse
+fingerprint e pode ser servido com cache longo.
+
+As variantes são geradas depois do commit de um upload (game/signals.py) ou em
+lote pelo comando build_image_variants. Enquanto não existem, srcset() retorna ''
+e a página usa o original.
+"""
+
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+from .caching import LRUCache
+from .storage import write_atomic
+
+VARIANT_WIDTHS = (32, 64, 128, 256)
+VARIANTS_DIR = 'variants'
+IMAGE_DIRS = ('teams', 'players', 'maps', 'championships')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+WEBP_QUALITY = 80
+
+# Nomes cujas variantes já existem (só resultados positivos: o arquivo nunca muda de conteúdo)
+_AVAILABLE = LRUCache(max_entries=4096)
+
+
+def variant_name(name, width):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return f'{VARIANTS_DIR}/{directory}/{stem}-{width}.webp'.replace('//', '/')
+
+
+def media_name(value):
+    """Aceita um nome de arquivo, um FieldFile ou uma URL de mídia; retorna o nome relativo."""
+    if not value:
+        return ''
+    value = getattr(value, 'name', value)
+    if value.startswith(settings.MEDIA_URL):
+        value = value[len(settings.MEDIA_URL):]
+    return value.lstrip('/')
+
+
+def has_variants(name, root=None):
+    if not name:
+        return False
+    if name in _AVAILABLE:
+        return True
+    root = Path(root or settings.MEDIA_ROOT)
+    # A maior largura é gravada por último: se ela existe, todas existem
+    if (root / variant_name(name, VARIANT_WIDTHS[-1])).exists():
+        _AVAILABLE.set(name, True)
+        return True
+    return False
+
+
+def variant_url(value, width):
+    """URL da menor variante com pelo menos width px (ou do original, se não houver variantes)."""
+    name = media_name(value)
+    if not name:
+        return ''
+    if not has_variants(name):
+        return settings.MEDIA_URL + name
+    width = next((w for w in VARIANT_WIDTHS if w >= width), VARIANT_WIDTHS[-1])
+    return settings.MEDIA_URL + variant_name(name, width)
+
+
+def srcset(value):
+    """Valor do atributo srcset ('url 32w, url 64w, ...') ou '' se as variantes não existem."""
+    name = media_name(value)
+    if not has_variants(name):
+        return ''
+    return ', '.join(f'{settings.MEDIA_URL}{variant_name(name, width)} {width}w' for width in VARIANT_WIDTHS)
+
+
+def generate_variants(name, root=None, force=False):
+    """
+    Gera as variantes WebP de MEDIA_ROOT/name. Retorna quantos arquivos foram
+    gravados (0 se já existiam). Função de módulo para rodar em ProcessPoolExecutor.
+    """
+    root = Path(root or settings.MEDIA_ROOT)
+    if not force and has_variants(name, root):
+        return 0
+    from PIL import Image  # Só quem gera variantes paga o import
+
+    with Image.open(root / name) as source:
+        source.load()
+        has_alpha = source.mode in ('RGBA', 'LA', 'PA') or 'transparency' in source.info
+        image = source.convert('RGBA' if has_alpha else 'RGB')
+
+    written = 0
+    for width in VARIANT_WIDTHS:
+        path = root / variant_name(name, width)
+        # Nunca amplia: imagens menores que a largura são só convertidas
+        if image.width > width:
+            size = (width, max(1, round(image.height * width / image.width)))
+            variant = image.resize(size, Image.Resampling.LANCZOS)
+        else:
+            variant = image
+        write_atomic(path, lambda f: variant.save(f, 'WEBP', quality=WEBP_QUALITY))
+        written += 1
+    _AVAILABLE.set(name, True)
+    return written
+
+
+def source_images(root=None):
+    """Nomes relativos de todas as imagens originais sob MEDIA_ROOT (sem as variantes)."""
+    root = Path(root or settings.MEDIA_ROOT)
+    names = []
+    for directory in IMAGE_DIRS:
+        for path in sorted((root / directory).rglob('*')):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                names.append(path.relative_to(root).as_posix())
+    return names
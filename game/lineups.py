@@ -0,0 +1,12 @@
+"""
+Consultas de elenco sem dependência do motor (importável no caminho web sem numpy).
+"""
+
+from django.db.models import Prefetch
+
+from .models import Player
+
+
+def lineup_prefetch():
+    """Prefetch do elenco atual (sem inativos) na ordem usada para escolher os titulares."""
+    return Prefetch('players', queryset=Player.objects.filter(active=True).order_by('id'))
@@ -0,0 +1,119 @@
+"""
+Partida ao vivo simulada no servidor e transmitida como Server-Sent Events.
+
+O navegador só desenha: cada round chega como um evento compacto (vencedor,
+condição, placar e kills/mortes por posição na lineup) e nenhum atributo de
+jogador sai do servidor. Os rounds vêm de replay.series_maps, então a
+transmissão de uma partida com seed é idêntica ao replay dela.
+
+Formato (ids "mapa.round", usados pelo Last-Event-ID na reconexão):
+    event: start  {"format", "lineups": {"a": [ids], "b": [ids]}}
+    event: round  {"m", "r", "w": "A"|"B", "c": condição, "s": [a, b],
+                   "k": [[kills A por slot], [kills B]], "d": [[mortes A], [mortes B]]}
+    event: map    {"m", "s": [a, b], "w", "series": [a, b]}
+    event: end    {"s": [a, b], "w"}
+"""
+
+import asyncio
+import json
+import time
+
+from .engine import WIN_CONDITIONS
+from .engine.match import TEAM_A, round_stats
+from .replay import series_maps
+
+ROUND_INTERVAL = 0.2    # Mesmo ritmo do simulateFullMatch (200 ms por round)
+MAX_INTERVAL = 5.0
+
+
+def encode_event(name, data, event_id=None):
+    """Um evento SSE em bytes (JSON sem espaços)."""
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {name}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode()
+
+
+def parse_event_id(value):
+    """'2.14' -> (2, 14); None se inválido."""
+    try:
+        map_number, round_number = (int(part) for part in value.split('.'))
+    except (AttributeError, ValueError):
+        return None
+    return map_number, round_number
+
+
+def series_events(seed, snapshot, series_format):
+    """
+    Gera (posição, nome, dados) para a série inteira. A posição (mapa, round)
+    ordena os eventos para retomar a transmissão; o evento map fica logo depois
+    do último round. Os mapas são simulados sob demanda.
+    """
+    yield (0, 0), 'start', {
+        'format': series_format,
+        'lineups': {side[-1]: [player['id'] for player in snapshot[side]] for side in ('team_a', 'team_b')},
+    }
+
+    series = [0, 0]
+    number = 0
+    for number, result in enumerate(series_maps(seed, snapshot, series_format), start=1):
+        played = int(result.rounds[0])
+        winners = result.round_winners[0, :played].tolist()
+        conditions = result.conditions[0, :played].tolist()
+        kills, deaths = round_stats(result.round_events[0, :, :played])
+
+        score = [0, 0]
+        for index, (winner, condition) in enumerate(zip(winners, conditions)):
+            score[winner] += 1
+            yield (number, index + 1), 'round', {
+                'm': number,
+                'r': index + 1,
+                'w': 'A' if winner == TEAM_A else 'B',
+                'c': WIN_CONDITIONS[condition],
+                's': list(score),
+                'k': kills[index].tolist(),
+                'd': deaths[index].tolist(),
+            }
+
+        map_winner = 0 if score[0] > score[1] else 1
+        series[map_winner] += 1
+        yield (number, played + 1), 'map', {
+            'm': number, 's': score, 'w': 'AB'[map_winner], 'series': list(series),
+        }
+
+    yield (number + 1, 0), 'end', {'s': series, 'w': 'A' if series[0] > series[1] else 'B'}
+
+
+def position_event(position, name, data):
+    """Codifica um evento de series_events; rounds e mapas levam o id "mapa.round"."""
+    return encode_event(name, data, f'{position[0]}.{position[1]}' if name in ('round', 'map') else None)
+
+
+def _events_from(seed, snapshot, series_format, start):
+    """(nome, bytes) dos eventos a partir da posição start; o evento start sempre vai."""
+    for position, name, data in series_events(seed, snapshot, series_format):
+        if position != (0, 0) and position < start:
+            continue
+        yield name, position_event(position, name, data)
+
+
+async def stream_series(seed, snapshot, series_format, start=(1, 1), interval=ROUND_INTERVAL):
+    """
+    Iterador assíncrono dos eventos a partir da posição start (mapa, round),
+    com `interval` segundos entre rounds. Cada espectador é só uma corrotina
+    dormindo no event loop (não segura thread nem conexão com o banco).
+    """
+    for name, payload in _events_from(seed, snapshot, series_format, start):
+        yield payload
+        if name == 'round' and interval:
+            await asyncio.sleep(interval)
+
+
+def stream_series_sync(seed, snapshot, series_format, start=(1, 1), interval=ROUND_INTERVAL):
+    """
+    O mesmo stream para WSGI: o handler WSGI junta um iterador assíncrono
+    inteiro antes de enviar o primeiro byte, então aqui o ritmo é time.sleep
+    (segura o worker até o fim da série).
+    """
+    for name, payload in _events_from(seed, snapshot, series_format, start):
+        yield payload
+        if name == 'round' and interval:
+            time.sleep(interval)
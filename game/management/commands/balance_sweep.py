@@ -0,0 +1,118 @@
+"""
+Comando Django para varrer parâmetros de GameConfig.BALANCE no motor com economia
+"""
+
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from game.balance_sweep import cache_dir, grid_points, random_points, run_sweep
+from game.engine import ROLES, lineup_attributes, lineup_roles
+from game.engine.balance import balance_params
+from game.engine.constants import LINEUP_SIZE
+from game.models import Team
+from game.odds import lineup_prefetch, starting_lineup
+
+
+def parse_param(spec):
+    """'caminho=v1,v2' -> (caminho, [v1, v2]); 'caminho=lo:hi' -> (caminho, (lo, hi))."""
+    path, sep, values = spec.partition('=')
+    if not sep or not values:
+        raise CommandError(f'Invalid --param {spec!r}: expected PATH=v1,v2 or PATH=lo:hi')
+    if path not in balance_params():
+        raise CommandError(f'Unknown balance parameter: {path} (see --list)')
+    try:
+        if ':' in values:
+            lo, hi = (float(value) for value in values.split(':'))
+            return path, (lo, hi)
+        return path, [float(value) for value in values.split(',')]
+    except ValueError:
+        raise CommandError(f'Invalid --param {spec!r}: values must be numbers')
+
+
+class Command(BaseCommand):
+    help = 'Varre parâmetros de balanceamento (grade ou aleatório) e mede zebras, saldo de rounds e kills por role'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--param', action='append', default=[],
+            help='Parâmetro (caminho em GameConfig.BALANCE) e valores: PATH=v1,v2 (grade) ou PATH=lo:hi (--random)',
+        )
+        parser.add_argument('--random', type=int, default=0, help='Pontos sorteados em vez da grade')
+        parser.add_argument('--pairings', type=int, default=20, help='Confrontos (pares de times) por ponto')
+        parser.add_argument('-n', '--maps', type=int, default=200, help='Mapas simulados por confronto')
+        parser.add_argument('--seed', type=int, default=0, help='Seed dos confrontos e da simulação')
+        parser.add_argument('--workers', type=int, default=None, help='Processos no pool (padrão: CPUs)')
+        parser.add_argument('--json', action='store_true', help='Imprime os resultados em JSON')
+        parser.add_argument('--list', action='store_true', help='Lista os parâmetros e os valores padrão')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for path, value in balance_params().items():
+                self.stdout.write(f'{path} = {value}')
+            return
+        if options['maps'] < 1 or options['pairings'] < 1:
+            raise CommandError('--maps and --pairings must be positive')
+
+        params = dict(parse_param(spec) for spec in options['param'])
+        if options['random']:
+            points = random_points(params, options['random'], seed=options['seed'])
+        else:
+            ranges = [path for path, values in params.items() if isinstance(values, tuple)]
+            if ranges:
+                raise CommandError(f'Ranges need --random: {", ".join(ranges)}')
+            points = grid_points(params)
+        # O padrão entra sempre, como referência
+        points = [{}] + [point for point in points if point]
+
+        pairings = self.pairings(options['pairings'], options['seed'])
+        start = time.perf_counter()
+        entries = run_sweep(
+            points, pairings, n=options['maps'], seed=options['seed'], workers=options['workers'],
+            log=None if options['json'] else self.stdout.write,
+        )
+        elapsed = time.perf_counter() - start
+
+        if options['json']:
+            self.stdout.write(json.dumps(
+                [{'params': entry['params'], 'metrics': entry['metrics']} for entry in entries], indent=2,
+            ))
+            return
+        self.print_table(entries)
+        cached = sum(entry['cached'] for entry in entries)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(entries)} pontos ({cached} do cache) em {elapsed:.1f}s -> {cache_dir()}'
+        ))
+
+    def pairings(self, count, seed):
+        """Pares ordenados de times sorteados com o seed: (attributes_a, attributes_b, roles_a, roles_b)."""
+        lineups = []
+        for team in Team.objects.order_by('id').prefetch_related(lineup_prefetch()):
+            lineup = starting_lineup(team)
+            if len(lineup) < LINEUP_SIZE:
+                self.stdout.write(self.style.WARNING(f'  ⚠️  {team.name}: só {len(lineup)} jogadores, ignorado'))
+                continue
+            lineups.append(lineup)
+        if len(lineups) < 2:
+            raise CommandError('Need at least two teams with a full lineup')
+
+        rows_i, cols_j = np.nonzero(~np.eye(len(lineups), dtype=bool))
+        chosen = np.random.default_rng(seed).permutation(len(rows_i))[:count]
+        attributes = np.stack([lineup_attributes(lineup) for lineup in lineups])
+        roles = np.stack([lineup_roles(lineup) for lineup in lineups])
+        return attributes[rows_i[chosen]], attributes[cols_j[chosen]], roles[rows_i[chosen]], roles[cols_j[chosen]]
+
+    def print_table(self, entries):
+        roles = [role[:3] for role in ROLES]
+        self.stdout.write(f'{"upset":>6} {"diff":>6} {"rounds":>6} ' + ' '.join(f'{role:>5}' for role in roles)
+                          + '  parâmetros')
+        for entry in entries:
+            metrics = entry['metrics']
+            kills = ' '.join(f'{metrics["kills_per_round"][role]:5.3f}' for role in ROLES)
+            params = ', '.join(f'{path}={value:g}' for path, value in entry['params'].items()) or '(padrão)'
+            self.stdout.write(
+                f'{metrics["upset_rate"]:6.3f} {metrics["avg_round_diff"]:6.2f} {metrics["avg_rounds"]:6.2f} '
+                f'{kills}  {params}'
+            )
@@ -0,0 +1,74 @@
+"""
+Comando Django para medir o custo de conexão por request (nova conexão x persistente)
+"""
+
+import time
+
+import dj_database_url
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from django.db.utils import ConnectionHandler
+
+QUERY = 'SELECT COUNT(*) FROM game_team'
+
+
+def request_cycle(connection):
+    """O que o Django faz em cada request: fecha conexões vencidas, consulta, fecha de novo."""
+    connection.close_if_unusable_or_obsolete()  # request_started
+    with connection.cursor() as cursor:
+        cursor.execute(QUERY)
+        cursor.fetchone()
+    connection.close_if_unusable_or_obsolete()  # request_finished
+
+
+class Command(BaseCommand):
+    help = 'Compara o tempo por request com CONN_MAX_AGE=0 e com conexões persistentes (+ health check)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', default=[],
+                            help='DATABASE_URL a medir (repetível; padrão: o banco configurado)')
+        parser.add_argument('-n', '--requests', type=int, default=500, help='Requests simulados por modo')
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE do modo persistente')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+
+        targets = [dj_database_url.parse(url) for url in options['url']]
+        if not targets:
+            targets = [dict(settings.DATABASES['default'])]
+
+        for config in targets:
+            self.stdout.write(f"\n{config['ENGINE'].rsplit('.', 1)[-1]} ({config.get('HOST') or config['NAME']})")
+            for mode, max_age, health_checks in (
+                ('por request', 0, False),
+                ('persistente', options['max_age'], True),
+            ):
+                timings = self.measure(
+                    {**config, 'CONN_MAX_AGE': max_age, 'CONN_HEALTH_CHECKS': health_checks},
+                    options['requests'],
+                )
+                self.stdout.write(
+                    f'  {mode:<12} p50 {np.percentile(timings, 50):7.3f} ms   '
+                    f'p95 {np.percentile(timings, 95):7.3f} ms   média {timings.mean():7.3f} ms'
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark concluído'))
+
+    def measure(self, config, n):
+        # Handler próprio: não mexe nas conexões do processo
+        connection = ConnectionHandler({'default': config})['default']
+        try:
+            request_cycle(connection)  # Aquece imports/caches do driver
+            timings = np.empty(n)
+            for i in range(n):
+                start = time.perf_counter()
+                request_cycle(connection)
+                timings[i] = (time.perf_counter() - start) * 1000
+        except DatabaseError as exc:
+            raise CommandError(f'Could not connect: {exc}')
+        finally:
+            connection.close()
+        return timings
@@ -0,0 +1,259 @@
+"""
+Comando Django para medir as views e o motor num banco sintético, com orçamento de queries
+"""
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+# Tempos dependem da máquina: o baseline é local (--save-baseline) e fica fora do
+# git; o que vale em qualquer máquina é o QUERY_BUDGETS abaixo
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+ENGINE_BATCHES = (1, 100, 1000, 10000)
+
+# Máximo de queries por request com os caches vazios (o pior caso). Estourar o
+# orçamento falha o comando: é aqui que um N+1 novo aparece.
+QUERY_BUDGETS = {
+    'home': 0,
+    'quick_match_setup': 3,     # mapas + times + jogadores (prefetch)
+    'simulate_match': 7,        # sessão (leitura + gravação em transação) + times/jogadores + insert do Match
+    'match_result': 3,          # partida com joins + elencos (prefetch)
+    'match_result_stored': 3,
+}
+
+# Cache só do benchmark: o padrão é compartilhado com o servidor, e os ids do
+# banco sintético colidiriam com as páginas em cache das partidas reais
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}}
+
+ROLES = ('DUELIST', 'INITIATOR', 'CONTROLLER', 'SENTINEL', 'FLEX')
+REGIONS = ('AMERICAS', 'EMEA', 'PACIFIC', 'CHINA')
+
+
+def seed_dataset(teams, players_per_team, matches, rng):
+    """Cria times, jogadores, mapas e partidas (metade com rounds/stats gravados, metade só com seed)."""
+    from game.models import Map, Player, Team
+    from game.odds import lineup_prefetch, starting_lineup
+    from game.results import simulate_and_store
+
+    maps = Map.objects.bulk_create([Map(name=f'Bench Map {i}') for i in range(7)])
+    team_objs = Team.objects.bulk_create([
+        Team(name=f'Bench Team {i}', short_name=f'B{i}', region=REGIONS[i % len(REGIONS)])
+        for i in range(teams)
+    ])
+    attributes = rng.integers(5, 21, size=(teams * players_per_team, 5)).tolist()
+    Player.objects.bulk_create([
+        Player(
+            name=f'Bench Player {t}-{p}', team=team, role=ROLES[p % len(ROLES)],
+            **dict(zip(('aim', 'gamesense', 'support', 'clutch', 'mental'), attributes[t * players_per_team + p])),
+        )
+        for t, team in enumerate(team_objs)
+        for p in range(players_per_team)
+    ])
+
+    team_objs = list(Team.objects.prefetch_related(lineup_prefetch()))
+    stored, replayed = [], []
+    for i in range(matches):
+        a, b = rng.choice(len(team_objs), size=2, replace=False).tolist()
+        team_a, team_b = team_objs[a], team_objs[b]
+        ids = simulate_and_store(
+            team_a, team_b, starting_lineup(team_a), starting_lineup(team_b),
+            series_format=('BO1', 'BO3')[i % 2], n=1, seed=int(rng.integers(2**31)),
+            selected_map=maps[i % len(maps)], replay_only=i % 2 == 1,
+        )
+        (replayed if i % 2 else stored).extend(ids)
+    return team_objs, stored, replayed
+
+
+def reset_caches():
+    from game.odds import ODDS_CACHE
+    from game.replay import REPLAY_CACHE
+
+    cache.clear()
+    REPLAY_CACHE.clear()
+    ODDS_CACHE.clear()
+
+
+def summarize(timings_ms, queries, peak_bytes):
+    return {
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings_ms, 95)), 3),
+        'queries': int(max(queries)),
+        'peak_kb': round(peak_bytes / 1024, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de views (test client) e do motor num banco sintético, com orçamento de queries e baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=48, help='Times no banco sintético')
+        parser.add_argument('--players', type=int, default=5, help='Jogadores por time')
+        parser.add_argument('--matches', type=int, default=200, help='Partidas no banco sintético')
+        parser.add_argument('-n', '--iterations', type=int, default=30, help='Requests medidos por view')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='JSON de referência (local, gerado com --save-baseline)')
+        parser.add_argument('--save-baseline', action='store_true', help='Grava os resultados como baseline')
+        parser.add_argument('--max-regression', type=float, default=None,
+                            help='Falha se o p50 de algum cenário piorar mais que N%% sobre o baseline')
+
+    def handle(self, *args, **options):
+        if options['teams'] < 2 or options['players'] < 5:
+            raise CommandError('Need at least 2 teams with 5 players each')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+
+        rng = np.random.default_rng(options['seed'])
+        setup_test_environment()
+        # Banco descartável (o mesmo mecanismo do test runner): não toca no banco real
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        private_cache = override_settings(CACHES=BENCH_CACHES)
+        private_cache.enable()
+        try:
+            start = time.perf_counter()
+            teams, stored, replayed = seed_dataset(options['teams'], options['players'], options['matches'], rng)
+            self.stdout.write(
+                f"Banco sintético: {len(teams)} times x {options['players']} jogadores, "
+                f"{len(stored) + len(replayed)} partidas em {time.perf_counter() - start:.1f}s"
+            )
+            results = self.bench_views(teams, stored, replayed, options['iterations'], rng)
+            results.update(self.bench_engine())
+        finally:
+            private_cache.disable()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        failures = self.report(results, options)
+        if options['save_baseline']:
+            path = Path(options['baseline'])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f'Baseline gravado em {path}')
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('✅ Dentro do orçamento de queries'))
+
+    def measure(self, request, iterations, setup=None):
+        """
+        Roda request() com os caches vazios (setup() antes, fora da medição); retorna
+        o resumo (tempo, queries, pico de memória).
+        """
+        timings, queries = [], []
+        for _ in range(iterations):
+            if setup:
+                setup()
+            reset_caches()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{response.status_code} from {response.request["PATH_INFO"]}')
+            queries.append(len(captured))
+
+        # Memória numa rodada à parte (o tracemalloc distorce o tempo)
+        if setup:
+            setup()
+        reset_caches()
+        tracemalloc.start()
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return summarize(timings, queries, peak)
+
+    def bench_views(self, teams, stored, replayed, iterations, rng):
+        client = Client()
+        pairs = [rng.choice(len(teams), size=2, replace=False).tolist() for _ in range(iterations + 1)]
+        pair_iter = iter(pairs * 2)
+
+        def choose_teams():
+            a, b = next(pair_iter)
+            session = client.session
+            session['match_setup'] = {
+                'team_a_id': str(teams[a].id), 'team_b_id': str(teams[b].id),
+                'format': 'BO3', 'map_ids': '', 'simulation_type': 'instant',
+            }
+            session.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        replayed_iter = iter(rng.choice(replayed, size=2 * iterations + 2).tolist())
+        stored_iter = iter(rng.choice(stored, size=2 * iterations + 2).tolist())
+        return {
+            'home': self.measure(lambda: client.get(reverse('home')), iterations),
+            'quick_match_setup': self.measure(lambda: client.get(reverse('quick_match_setup')), iterations),
+            'simulate_match': self.measure(lambda: client.get(reverse('simulate_match')), iterations, choose_teams),
+            'match_result': self.measure(
+                lambda: client.get(reverse('match_result', args=[next(replayed_iter)])), iterations),
+            'match_result_stored': self.measure(
+                lambda: client.get(reverse('match_result', args=[next(stored_iter)])), iterations),
+        }
+
+    def bench_engine(self):
+        from game.engine import simulate_maps, simulate_maps_economy
+
+        attributes = np.full((5, 4), 14.0)
+        roles = np.arange(5)
+        engines = {
+            'engine_maps': lambda batch, rng: simulate_maps(0.55, n=batch, rng=rng),
+            'engine_economy': lambda batch, rng: simulate_maps_economy(
+                attributes, attributes + 1, roles, roles, n=batch, rng=rng),
+        }
+        results = {}
+        rng = np.random.default_rng(0)
+        for name, engine in engines.items():
+            for batch in ENGINE_BATCHES:
+                repeats = max(3, 20000 // batch)
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    engine(batch, rng)
+                    timings.append((time.perf_counter() - start) * 1000)
+                tracemalloc.start()
+                engine(batch, rng)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results[f'{name}_{batch}'] = dict(summarize(timings, [0], peak), queries=None)
+        return results
+
+    def report(self, results, options):
+        baseline = {}
+        path = Path(options['baseline'])
+        if path.exists():
+            baseline = json.loads(path.read_text())
+        elif options['max_regression'] is not None:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {path} não existe (rode com --save-baseline nesta máquina): --max-regression ignorado'
+            ))
+
+        failures = []
+        self.stdout.write(f"\n{'cenário':<22}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'pico KB':>10}{'vs baseline':>14}")
+        for name, result in results.items():
+            delta = ''
+            reference = baseline.get(name)
+            if reference and reference['p50_ms']:
+                change = 100 * (result['p50_ms'] / reference['p50_ms'] - 1)
+                delta = f'{change:+.0f}%'
+                if options['max_regression'] is not None and change > options['max_regression']:
+                    failures.append(f"{name}: p50 {result['p50_ms']} ms vs baseline {reference['p50_ms']} ms ({delta})")
+            queries = '-' if result['queries'] is None else str(result['queries'])
+            line = (f"{name:<22}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                    f"{queries:>9}{result['peak_kb']:>10.0f}{delta:>14}")
+
+            budget = QUERY_BUDGETS.get(name)
+            if budget is not None and result['queries'] > budget:
+                failures.append(f"{name}: {result['queries']} queries (budget {budget})")
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return failures
@@ -0,0 +1,58 @@
+"""
+Comando Django para montar a matriz de confrontos entre todos os times
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.engine import WINS_NEEDED
+from game.engine.constants import LINEUP_SIZE
+from game.head_to_head import build_matrix, load_matrix, matrix_path, save_matrix
+from game.models import Team
+from game.odds import lineup_prefetch, starting_lineup
+
+
+class Command(BaseCommand):
+    help = 'Simula todos os pares de times e salva a matriz de chances de vitória (só recalcula times alterados)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', default='BO1', choices=sorted(WINS_NEEDED), help='Formato das séries')
+        parser.add_argument('-n', '--simulations', type=int, default=1000, help='Séries simuladas por par')
+        parser.add_argument('--workers', type=int, default=None, help='Processos no pool (padrão: CPUs)')
+        parser.add_argument('--seed', type=int, default=None, help='Seed para resultados reproduzíveis')
+        parser.add_argument('--output', default=None, help='Caminho do .npz (padrão: settings.HEAD_TO_HEAD_PATH)')
+        parser.add_argument('--full', action='store_true', help='Ignora a matriz anterior e recalcula tudo')
+
+    def handle(self, *args, **options):
+        if options['simulations'] < 1:
+            raise CommandError('--simulations must be positive')
+        output = options['output'] or matrix_path()
+
+        lineups = {}
+        for team in Team.objects.prefetch_related(lineup_prefetch()):
+            lineup = starting_lineup(team)
+            if len(lineup) < LINEUP_SIZE:
+                self.stdout.write(self.style.WARNING(f'  ⚠️  {team.name}: só {len(lineup)} jogadores, ignorado'))
+                continue
+            lineups[team.id] = lineup
+        if not lineups:
+            self.stdout.write(self.style.WARNING('⚠️  Nenhum time com lineup completa: a matriz fica vazia'))
+
+        previous = None if options['full'] else load_matrix(output)
+        start = time.perf_counter()
+        matrix, simulated = build_matrix(
+            lineups,
+            series_format=options['format'],
+            n=options['simulations'],
+            previous=previous,
+            workers=options['workers'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        save_matrix(matrix, output)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(lineups)} times, {simulated} pares simulados em {elapsed:.1f}s -> {output}'
+        ))
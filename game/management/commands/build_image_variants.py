@@ -0,0 +1,70 @@
+"""
+Comando Django para gerar as variantes WebP (32/64/128/256 px) de toda a mídia
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game import teams_payload
+from game.images import VARIANT_WIDTHS, generate_variants, source_images
+
+
+def _generate(name, root, force):
+    """Roda no processo filho; erros voltam como texto para o relatório."""
+    try:
+        return name, generate_variants(name, root=root, force=force), None
+    except (OSError, ValueError) as exc:
+        return name, 0, str(exc)
+
+
+class Command(BaseCommand):
+    help = f'Gera variantes WebP ({"/".join(map(str, VARIANT_WIDTHS))} px) de logos, fotos e minimapas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processos em paralelo')
+        parser.add_argument('--force', action='store_true', help='Regera mesmo as variantes que já existem')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be positive')
+        root = str(settings.MEDIA_ROOT)
+        names = source_images(root)
+        start = time.perf_counter()
+
+        work = partial(_generate, root=root, force=options['force'])
+        if options['workers'] == 1:
+            results = map(work, names)
+        else:
+            executor = ProcessPoolExecutor(max_workers=options['workers'])
+            results = executor.map(work, names, chunksize=max(1, len(names) // (options['workers'] * 8)))
+
+        generated = written = 0
+        errors = []
+        try:
+            for name, count, error in results:
+                if error:
+                    errors.append((name, error))
+                elif count:
+                    generated += 1
+                    written += count
+        finally:
+            if options['workers'] > 1:
+                executor.shutdown()
+
+        for name, error in errors[:20]:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  {name}: {error}'))
+
+        if generated:
+            # As páginas em cache ainda apontam só para os originais (payload e partidas)
+            teams_payload.invalidate()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(names)} imagens, {generated} processadas ({written} variantes), '
+            f'{len(errors)} erros em {elapsed:.1f}s'
+        ))
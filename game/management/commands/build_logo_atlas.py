@@ -0,0 +1,38 @@
+"""
+Comando Django para montar o atlas (sprite) de logos do seletor de times
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from game import teams_payload
+from game.atlas import build_atlas
+from game.models import Team
+
+
+class Command(BaseCommand):
+    help = 'Gera o atlas de logos dos times + mapa de posições (JSON/CSS); só refaz se algum logo mudou'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Refaz o atlas mesmo sem mudanças')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        logos = list(Team.objects.exclude(logo='').exclude(logo__isnull=True).values_list('id', 'logo'))
+        manifest, built = build_atlas(logos, force=options['force'])
+        elapsed = time.perf_counter() - start
+
+        if not built:
+            self.stdout.write(self.style.SUCCESS(f"✅ Atlas em dia ({len(manifest['teams'])} logos), nada a fazer"))
+            return
+
+        # O payload do Quick Match diz quais times estão no atlas
+        teams_payload.invalidate()
+        missing = len(logos) - len(manifest['teams'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Atlas {manifest['width']}x{manifest['height']} com {len(manifest['teams'])} logos "
+            f"em {elapsed:.1f}s: {manifest['image']}"
+        ))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  {missing} logos ilegíveis ficaram de fora'))
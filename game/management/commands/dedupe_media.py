@@ -0,0 +1,122 @@
+"""
+Comando Django para migrar a mídia existente para nomes endereçados por conteúdo
+"""
+
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from game import teams_payload
+from game.atlas import ATLAS_DIR
+from game.images import VARIANTS_DIR
+from game.models import Championship, Map, Player, Team
+from game.storage import content_name, file_digest
+
+IMAGE_FIELDS = (
+    (Team, 'logo'),
+    (Player, 'photo'),
+    (Championship, 'logo'),
+    (Map, 'minimap'),
+)
+
+
+# Gerados por build_image_variants/build_logo_atlas, com nomes próprios (manifesto e CSS apontam para eles)
+GENERATED_DIRS = (VARIANTS_DIR, ATLAS_DIR)
+
+
+def referenced_names():
+    """Nomes de arquivo usados pelos campos de IMAGE_FIELDS no banco."""
+    names = set()
+    for model, field in IMAGE_FIELDS:
+        names.update(model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                     .values_list(field, flat=True))
+    return names
+
+
+def scan_media(root, names=None):
+    """
+    {nome relativo: sha256} dos arquivos sob MEDIA_ROOT, fora os diretórios
+    gerados (GENERATED_DIRS). Com names, só os arquivos desse conjunto.
+    """
+    digests = {}
+    for directory, subdirs, filenames in os.walk(root):
+        if directory == root:
+            subdirs[:] = [subdir for subdir in subdirs if subdir not in GENERATED_DIRS]
+        for filename in filenames:
+            if filename.startswith('.') or filename.endswith('.part'):
+                continue
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            if names is not None and name not in names:
+                continue
+            with open(path, 'rb') as f:
+                digests[name] = file_digest(f)
+    return digests
+
+
+class Command(BaseCommand):
+    help = 'Renomeia a mídia referenciada no banco pelo hash do conteúdo e atualiza as referências'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra o que seria feito')
+        parser.add_argument('--delete', action='store_true',
+                            help='Apaga os arquivos antigos (outro banco ou o git ainda podem apontar para eles)')
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        # Só arquivos referenciados: o resto da mídia (gerados, órfãos) não é tocado
+        digests = scan_media(root, referenced_names())
+        canonical = {name: content_name(name, digest) for name, digest in digests.items()}
+        blobs = set(canonical.values())
+        obsolete = [name for name, target in canonical.items() if name != target]
+        sizes = {name: os.path.getsize(os.path.join(root, name)) for name in digests}
+        blob_sizes = {target: sizes[name] for name, target in canonical.items()}
+        freed = sum(sizes.values()) - sum(blob_sizes.values())
+
+        # Referências a reescrever, por model/campo
+        updates = defaultdict(list)
+        for model, field in IMAGE_FIELDS:
+            for pk, name in model.objects.exclude(**{field: ''}).values_list('pk', field):
+                if name in canonical and canonical[name] != name:
+                    updates[model, field].append(model(pk=pk, **{field: canonical[name]}))
+        references = sum(len(objs) for objs in updates.values())
+
+        self.stdout.write(
+            f'{len(digests)} arquivos, {len(blobs)} conteúdos distintos, '
+            f'{references} referências a atualizar, {freed / 1024 / 1024:.1f} MB em nomes antigos'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('⚠️  Dry-run: nada foi alterado'))
+            return
+
+        # 1. Cria os blobs canônicos (cópia do primeiro arquivo com aquele conteúdo)
+        created = 0
+        for name, target in canonical.items():
+            target_path = os.path.join(root, target)
+            if not os.path.exists(target_path):
+                tmp_path = target_path + '.part'
+                with open(os.path.join(root, name), 'rb') as src, open(tmp_path, 'wb') as dst:
+                    for chunk in iter(lambda: src.read(64 * 1024), b''):
+                        dst.write(chunk)
+                os.replace(tmp_path, target_path)
+                created += 1
+
+        # 2. Aponta o banco para os blobs
+        with transaction.atomic():
+            for (model, field), objs in updates.items():
+                model.objects.bulk_update(objs, [field], batch_size=500)
+        teams_payload.invalidate()
+
+        # 3. Remove os nomes antigos (opcional)
+        removed = 0
+        if options['delete']:
+            for name in obsolete:
+                os.remove(os.path.join(root, name))
+                removed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {created} blobs criados, {references} referências atualizadas, {removed} arquivos removidos'
+        ))
@@ -0,0 +1,176 @@
+"""
+Comando Django para importar atributos de jogadores de planilhas XLSX ou CSV grandes
+"""
+
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from game.models import Player
+
+ATTRIBUTES = ('aim', 'gamesense', 'support', 'clutch', 'mental')
+MIN_ATTRIBUTE, MAX_ATTRIBUTE = 1, 20
+
+
+def read_chunks(path, chunk_size, sheet=None):
+    """
+    Lê a planilha em DataFrames de até chunk_size linhas (tudo como texto), sem
+    carregar o arquivo inteiro: CSV via pandas chunksize, XLSX via openpyxl read_only.
+    Cada DataFrame tem a coluna _row com o número da linha no arquivo.
+    """
+    if path.suffix.lower() in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            if sheet and sheet not in workbook.sheetnames:
+                raise CommandError(f'Worksheet not found: {sheet}')
+            worksheet = workbook[sheet] if sheet else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = [str(cell).strip().lower() if cell is not None else '' for cell in next(rows, ())]
+            width = len(header)
+            line = 2
+            while chunk := list(islice(rows, chunk_size)):
+                chunk = [tuple(row[:width]) + (None,) * (width - len(row)) for row in chunk]
+                frame = pd.DataFrame(chunk, columns=header, dtype=object)
+                frame['_row'] = np.arange(line, line + len(frame))
+                line += len(frame)
+                yield frame
+        finally:
+            workbook.close()
+    else:
+        line = 2
+        for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            frame.columns = [str(column).strip().lower() for column in frame.columns]
+            frame['_row'] = np.arange(line, line + len(frame))
+            line += len(frame)
+            yield frame
+
+
+def validate_attributes(frame, columns):
+    """
+    Converte e valida as colunas de atributos do bloco de uma vez.
+    Retorna (valores (linhas, colunas) float com NaN = manter, máscara de linhas
+    inválidas, mensagens por linha inválida).
+    """
+    raw = frame[list(columns)].astype(object).where(frame[list(columns)].notna(), '')
+    text = raw.astype(str).apply(lambda column: column.str.strip())
+    blank = (text == '').to_numpy()
+    values = text.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+    not_number = np.isnan(values) & ~blank
+    not_integer = ~np.isnan(values) & (values != np.round(values))
+    out_of_range = ~np.isnan(values) & ((values < MIN_ATTRIBUTE) | (values > MAX_ATTRIBUTE))
+    bad = not_number | not_integer | out_of_range
+
+    invalid_rows = bad.any(axis=1)
+    messages = {}
+    for i in np.flatnonzero(invalid_rows):
+        problems = [
+            f"{columns[j]}={text.iat[i, j]!r} (expected integer {MIN_ATTRIBUTE}-{MAX_ATTRIBUTE})"
+            for j in np.flatnonzero(bad[i])
+        ]
+        messages[i] = '; '.join(problems)
+    return values, invalid_rows, messages
+
+
+class Command(BaseCommand):
+    help = 'Importa atributos (aim, gamesense, support, clutch, mental) de uma planilha XLSX/CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo .xlsx ou .csv (colunas: id ou name, e os atributos)')
+        parser.add_argument('--sheet', default=None, help='Aba do XLSX (padrão: a ativa)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas lidas e gravadas por bloco')
+        parser.add_argument('--errors', default=None, help='Grava as linhas com erro neste CSV')
+        parser.add_argument('--dry-run', action='store_true', help='Valida sem gravar nada')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} not found')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        start = time.perf_counter()
+        errors = []
+        rows = 0
+        updated = set()
+        with transaction.atomic():
+            for frame in read_chunks(path, options['chunk_size'], options['sheet']):
+                rows += len(frame)
+                updated |= self.apply_chunk(frame, errors)
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        if options['errors'] and errors:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['row', 'player', 'error'])
+                writer.writerows(errors)
+
+        for row, player, message in errors[:20]:
+            self.stdout.write(self.style.WARNING(f'  ⚠️  Linha {row} ({player}): {message}'))
+        if len(errors) > 20:
+            self.stdout.write(self.style.WARNING(f'  ... e mais {len(errors) - 20} erros'))
+
+        elapsed = time.perf_counter() - start
+        action = 'validados (dry-run)' if options['dry_run'] else 'atualizados'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {rows} linhas lidas, {len(updated)} jogadores {action}, {len(errors)} erros em {elapsed:.1f}s'
+        ))
+
+    def apply_chunk(self, frame, errors):
+        """Valida o bloco e aplica um bulk_update com os jogadores alterados; retorna os ids."""
+        columns = [column for column in ATTRIBUTES if column in frame.columns]
+        if not columns:
+            raise CommandError(f"No attribute columns found (expected any of: {', '.join(ATTRIBUTES)})")
+        if 'id' in frame.columns:
+            key_field = 'id'
+            keys = pd.to_numeric(frame['id'], errors='coerce')
+        elif 'name' in frame.columns:
+            key_field = 'name'
+            keys = frame['name'].astype(str).str.strip()
+        else:
+            raise CommandError('The sheet needs an "id" or "name" column')
+
+        values, invalid_rows, messages = validate_attributes(frame, columns)
+        key_list = keys.tolist()
+        lines = frame['_row'].tolist()
+        for i, message in messages.items():
+            errors.append((lines[i], key_list[i], message))
+
+        valid = np.flatnonzero(~invalid_rows)
+        lookup = [key_list[i] for i in valid if key_list[i] == key_list[i] and key_list[i] != '']
+        if key_field == 'id':
+            lookup = [int(key) for key in lookup]
+        players = {}
+        ambiguous = set()
+        for player in Player.objects.filter(**{f'{key_field}__in': lookup}):
+            key = getattr(player, key_field)
+            if key in players:
+                ambiguous.add(key)
+            players[key] = player
+
+        changed = {}
+        for i in valid:
+            key = key_list[i]
+            player = players.get(int(key) if key_field == 'id' and key == key else key)
+            if key in ambiguous:
+                errors.append((lines[i], key, 'more than one player with this name, use the id column'))
+                continue
+            if player is None:
+                errors.append((lines[i], key, 'player not found'))
+                continue
+            for j, column in enumerate(columns):
+                if not np.isnan(values[i, j]) and getattr(player, column) != int(values[i, j]):
+                    setattr(player, column, int(values[i, j]))
+                    changed[player.pk] = player
+
+        Player.objects.bulk_update(list(changed.values()), columns, batch_size=500)
+        return set(changed)
@@ -1,26 +1,56 @@
 """
 Comando Django para popular o banco de dados com TODAS as 50 equipes e jogadores
 Database completa convertida de TypeScript com atributos em escala 1-20
+
+Por padrão sincroniza (upsert): compara TEAMS_DATA com o banco pelo nome do time
+e do jogador e aplica só as diferenças, sem apagar partidas. --reset apaga tudo antes.
 """
 
-from django.core.management.base import BaseCommand
-from game.models import Team, Player
+import ast
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-import sys
-import os
+from django.db.models import Exists, OuterRef, Q
+
+from game import teams_payload
+from game.models import Match, Player, PlayerMatchStat, Team
+from game.ratings import refresh_team_overalls
+
+STAT_FIELDS = ('aim', 'gamesense', 'support', 'clutch', 'mental')
+DEFAULT_STATS = {'aim': 10, 'gamesense': 10, 'support': 10, 'clutch': 10}
+TEAM_FIELDS = ('short_name', 'region', 'color_primary', 'color_secondary')
+PLAYER_FIELDS = ('team', 'role', 'rating', 'active') + STAT_FIELDS
+
+
+def stat_values(stats):
+    """Atributos e rating de um jogador a partir da entrada de PLAYER_STATS."""
+    stats = {**DEFAULT_STATS, **stats}
+    # Calcular rating médio
+    avg_stat = (stats['aim'] + stats['gamesense'] + stats['support'] + stats['clutch']) / 4
+    return {
+        'rating': int((avg_stat / 20) * 100),
+        **{field: stats[field] for field in STAT_FIELDS if field in stats},
+    }
 
-# Adicionar o diretório do projeto ao path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Importar stats convertidos
-try:
-    # Tentar importar do arquivo gerado
-    with open('player_stats_converted.py', 'r', encoding='utf-8') as f:
-        exec(f.read(), globals())
-except FileNotFoundError:
-    print("❌ Arquivo player_stats_converted.py não encontrado!")
-    print("   Execute primeiro: python convert_teams.py")
-    PLAYER_STATS = {}
+def load_player_stats(path):
+    """
+    Lê PLAYER_STATS de um .json ou do player_stats_converted.py gerado por
+    convert_teams.py (só o literal do dicionário é avaliado, nada é executado).
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.json':
+        return json.loads(text)
+    for node in ast.parse(text).body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'PLAYER_STATS' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise CommandError(f'PLAYER_STATS not found in {path}')
+
 
 # Dados completos das 50 equipes (extraídos de teams.ts)
 TEAMS_DATA = {
@@ -608,80 +638,135 @@ TEAMS_DATA = {
 
 
 class Command(BaseCommand):
-    help = 'Popula o banco de dados com TODAS as 50 equipes e jogadores'
+    help = 'Popula o banco de dados com TODAS as 50 equipes e jogadores (sincroniza só as diferenças)'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--skip-confirmation',
             action='store_true',
-            help='Pula a confirmação de 3 segundos',
+            help='Pula a confirmação de 3 segundos do --reset',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Apaga todos os times e jogadores (e as partidas deles) antes de popular',
+        )
+        parser.add_argument(
+            '--stats',
+            default=None,
+            help='Arquivo com PLAYER_STATS (.py ou .json; padrão: player_stats_converted.py na raiz do projeto)',
         )
 
     def handle(self, *args, **options):
-        if not options.get('skip_confirmation'):
-            self.stdout.write(self.style.WARNING('⚠️  Este comando irá DELETAR todos os dados existentes!'))
+        player_stats = self.load_stats(options['stats'])
+
+        if options['reset'] and not options.get('skip_confirmation'):
+            self.stdout.write(self.style.WARNING('⚠️  --reset irá DELETAR todos os times, jogadores e partidas!'))
             self.stdout.write(self.style.WARNING('    Pressione Ctrl+C para cancelar ou aguarde 3 segundos...'))
-            
-            import time
             try:
                 time.sleep(3)
             except KeyboardInterrupt:
                 self.stdout.write(self.style.ERROR('\n❌ Cancelado'))
                 return
-        
-        try:
-            with transaction.atomic():
-                # Limpar dados
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            if options['reset']:
                 self.stdout.write('\n🗑️  Limpando dados...')
                 Player.objects.all().delete()
                 Team.objects.all().delete()
-                
-                teams_created = 0
-                players_created = 0
-                
-                self.stdout.write('\n🏗️  Criando equipes...\n')
-                
-                for team_name, team_data in TEAMS_DATA.items():
-                    # Criar equipe
-                    team = Team.objects.create(
-                        name=team_name,
-                        short_name=team_data['short_name'],
-                        region=team_data.get('region', 'AMERICAS'),
-                        color_primary=team_data.get('color_primary', '#000000'),
-                        color_secondary=team_data.get('color_secondary', '#FFFFFF')
-                    )
-                    teams_created += 1
-                    
-                    # Criar jogadores
-                    for player_data in team_data['players']:
-                        player_name = player_data['name']
-                        stats = PLAYER_STATS.get(player_name, {
-                            'aim': 10, 'gamesense': 10, 'support': 10, 'clutch': 10
-                        })
-                        
-                        # Calcular rating médio
-                        avg_stat = (stats['aim'] + stats['gamesense'] + stats['support'] + stats['clutch']) / 4
-                        rating = int((avg_stat / 20) * 100)
-                        
-                        Player.objects.create(
-                            name=player_name,
-                            role=player_data['role'],
-                            team=team,
-                            rating=rating,
-                            aim=stats['aim'],
-                            gamesense=stats['gamesense'],
-                            support=stats['support'],
-                            clutch=stats['clutch']
-                        )
-                        players_created += 1
-                    
-                    self.stdout.write(f'  ✅ {team_name} ({team_data["short_name"]}) - {len(team_data["players"])} jogadores')
-                
-                self.stdout.write(self.style.SUCCESS(f'\n✅ Database populada!'))
-                self.stdout.write(self.style.SUCCESS(f'   📊 {teams_created} equipes'))
-                self.stdout.write(self.style.SUCCESS(f'   👥 {players_created} jogadores'))
-                self.stdout.write(self.style.SUCCESS(f'\n💡 Execute: python manage.py import_images'))
-                
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'\n❌ Erro: {str(e)}'))
-            raise
+            summary = self.sync(player_stats)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Database sincronizada em {elapsed:.2f}s'))
+        for label, count in summary.items():
+            self.stdout.write(self.style.SUCCESS(f'   {label}: {count}'))
+
+    def load_stats(self, path):
+        default = Path(settings.BASE_DIR) / 'player_stats_converted.py'
+        path = Path(path) if path else default
+        if not path.exists():
+            if path != default:
+                raise CommandError(f'{path} not found')
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {default.name} não encontrado (execute: python convert_teams.py); jogadores novos usam atributos 10'
+            ))
+            return {}
+        return load_player_stats(path)
+
+    def sync(self, player_stats):
+        """Aplica TEAMS_DATA no banco com um número fixo de queries."""
+        # Times, pela chave natural (nome)
+        teams = {team.name: team for team in Team.objects.all()}
+        new_teams, changed_teams = [], []
+        for team_name, team_data in TEAMS_DATA.items():
+            values = {
+                'short_name': team_data['short_name'],
+                'region': team_data.get('region', 'AMERICAS'),
+                'color_primary': team_data.get('color_primary', '#000000'),
+                'color_secondary': team_data.get('color_secondary', '#FFFFFF'),
+            }
+            team = teams.get(team_name)
+            if team is None:
+                teams[team_name] = team = Team(name=team_name, **values)
+                new_teams.append(team)
+            elif any(getattr(team, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(team, field, value)
+                changed_teams.append(team)
+        Team.objects.bulk_create(new_teams)
+        Team.objects.bulk_update(changed_teams, TEAM_FIELDS)
+
+        # Jogadores, pelo nome (um jogador que troca de time é atualizado, não recriado)
+        players = {player.name: player for player in Player.objects.all()}
+        seen = set()
+        new_players, changed_players = [], []
+        for team_name, team_data in TEAMS_DATA.items():
+            team = teams[team_name]
+            for player_data in team_data['players']:
+                player_name = player_data['name']
+                if player_name in seen:
+                    raise CommandError(f'Duplicate player name in TEAMS_DATA: {player_name}')
+                seen.add(player_name)
+
+                values = {'team_id': team.id, 'active': True, 'role': player_data['role']}
+                # Atributos só vêm da fonte de stats: sem entrada, o jogador existente
+                # mantém os atuais (editados no admin) e o novo nasce com DEFAULT_STATS
+                player = players.get(player_name)
+                if player_name in player_stats or player is None:
+                    values.update(stat_values(player_stats.get(player_name, {})))
+                if player is None:
+                    new_players.append(Player(name=player_name, **values))
+                elif any(getattr(player, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(player, field, value)
+                    changed_players.append(player)
+        Player.objects.bulk_create(new_players)
+        Player.objects.bulk_update(changed_players, PLAYER_FIELDS)
+
+        # Remoções: só quem não tem histórico (partidas/stats) é apagado; quem tem
+        # sai do elenco (active=False) e deixa de contar nos titulares e no Overall
+        has_matches = Exists(Match.objects.filter(Q(team_a=OuterRef('pk')) | Q(team_b=OuterRef('pk'))))
+        has_stats = Exists(PlayerMatchStat.objects.filter(player=OuterRef('pk')))
+        stale_players = Player.objects.exclude(name__in=seen)
+        stale_teams = Team.objects.exclude(name__in=TEAMS_DATA.keys())
+        kept_players = stale_players.filter(has_stats).count()
+        deactivated = stale_players.filter(has_stats, active=True).update(active=False)
+        removed_players, _ = stale_players.exclude(has_stats).delete()
+        # Time sem partidas ainda pode ter jogadores com histórico em outros times
+        has_history = has_matches | Exists(PlayerMatchStat.objects.filter(player__team=OuterRef('pk')))
+        kept_teams = stale_teams.filter(has_history).count()
+        removed_teams, _ = stale_teams.exclude(has_history).delete()
+        if removed_players or removed_teams or deactivated:
+            refresh_team_overalls()
+        if new_teams or changed_teams or removed_teams or deactivated:
+            teams_payload.invalidate()
+
+        return {
+            '🏗️  Times criados': len(new_teams),
+            '✏️  Times atualizados': len(changed_teams),
+            '👥 Jogadores criados': len(new_players),
+            '✏️  Jogadores atualizados': len(changed_players),
+            '🗑️  Objetos removidos': removed_players + removed_teams,
+            '📌 Mantidos por terem partidas': kept_players + kept_teams,
+        }
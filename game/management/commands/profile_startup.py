@@ -0,0 +1,116 @@
+"""
+Comando Django para medir o cold start do entry point WSGI (import por módulo + primeiro request)
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Roda num processo novo (cold start de verdade): importa o WSGI e faz o primeiro request em cada URL
+COLD_START_SCRIPT = r'''
+import io, json, sys, time
+start = time.perf_counter()
+from valsim.wsgi import application
+loaded = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+requests = []
+for url in sys.argv[1:]:
+    environ = {'PATH_INFO': url, 'HTTP_HOST': 'localhost', 'wsgi.errors': io.StringIO()}
+    setup_testing_defaults(environ)
+    status = []
+    t = time.perf_counter()
+    body = b''.join(application(environ, lambda s, h, *a: status.append(s)))
+    requests.append({'url': url, 'status': status[0], 'ms': (time.perf_counter() - t) * 1000, 'bytes': len(body)})
+print(json.dumps({
+    'import_ms': (loaded - start) * 1000,
+    'requests': requests,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+HEAVY_PACKAGES = ('numpy', 'pandas', 'openpyxl', 'PIL', 'django.contrib.admin', 'django.contrib.auth')
+
+
+def cold_start(urls, env):
+    """Roda o script com -X importtime; retorna (resultado, [(self_us, cumulativo_us, módulo)])."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', COLD_START_SCRIPT, *urls],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise CommandError(f'Cold start failed:\n{process.stderr[-2000:]}')
+    imports = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((int(match.group(1)), int(match.group(2)), match.group(4)))
+    return json.loads(process.stdout.strip().splitlines()[-1]), imports
+
+
+class Command(BaseCommand):
+    help = 'Mede o cold start do WSGI: tempo de import por pacote/módulo e o primeiro request de cada página'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', default=['/', '/quick-match/'], help='URLs do primeiro request')
+        parser.add_argument('--top', type=int, default=15, help='Quantos pacotes/módulos listar')
+        parser.add_argument('--repeat', type=int, default=3, help='Cold starts medidos (usa a mediana)')
+        parser.add_argument('--lean', action='store_true', help='Mede com VALSIM_LEAN=1')
+        parser.add_argument('--compare', action='store_true', help='Mede o modo normal e o enxuto')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive')
+        modes = [False, True] if options['compare'] else [options['lean']]
+        summaries = []
+        for lean in modes:
+            env = {**os.environ, 'VALSIM_LEAN': '1' if lean else '0'}
+            runs = [cold_start(options['urls'], env) for _ in range(options['repeat'])]
+            runs.sort(key=lambda run: run[0]['import_ms'])
+            result, imports = runs[len(runs) // 2]
+            summaries.append((lean, result))
+            self.report('enxuto' if lean else 'normal', result, imports, options['top'])
+
+        if len(summaries) == 2:
+            (_, normal), (_, lean) = summaries
+            total = [
+                run['import_ms'] + sum(request['ms'] for request in run['requests'])
+                for run in (normal, lean)
+            ]
+            self.stdout.write(self.style.SUCCESS(
+                f'\n✅ Cold start (import + primeiros requests): {total[0]:.0f} ms -> {total[1]:.0f} ms '
+                f'({100 * (1 - total[1] / total[0]):.0f}% menos)'
+            ))
+
+    def report(self, label, result, imports, top):
+        by_package = Counter()
+        for self_us, _, module in imports:
+            by_package[module.strip().split('.')[0]] += self_us
+        total_us = sum(by_package.values())
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== Modo {label} =='))
+        self.stdout.write(f"Import do valsim.wsgi: {result['import_ms']:.0f} ms "
+                          f"({len(result['modules'])} módulos, {total_us / 1000:.0f} ms em imports no total)")
+        for request in result['requests']:
+            self.stdout.write(f"Primeiro GET {request['url']}: {request['ms']:.0f} ms ({request['status']})")
+
+        self.stdout.write('\nPacotes por tempo de import (self):')
+        for package, us in by_package.most_common(top):
+            self.stdout.write(f'  {us / 1000:8.1f} ms  {package}')
+
+        self.stdout.write('\nMódulos por tempo cumulativo:')
+        for _, cumulative, module in sorted(imports, key=lambda row: row[1], reverse=True)[:top]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f} ms  {module.strip()}')
+
+        loaded = [
+            package for package in HEAVY_PACKAGES
+            if any(module == package or module.startswith(package + '.') for module in result['modules'])
+        ]
+        if loaded:
+            self.stdout.write(self.style.WARNING(f"  ⚠️  Carregados no caminho web: {', '.join(loaded)}"))
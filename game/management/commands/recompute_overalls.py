@@ -0,0 +1,23 @@
+"""
+Comando Django para recalcular Player.overall e Team.overall de todo o banco
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from game.ratings import recompute_overalls
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os Overalls armazenados de jogadores e times numa única passada vetorizada'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            players, teams = recompute_overalls()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {players} jogadores e {teams} times atualizados em {elapsed:.2f}s'
+        ))
@@ -0,0 +1,101 @@
+"""
+Comando Django para simular um campeonato inteiro via Monte Carlo
+"""
+
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from game.engine import WINS_NEEDED, lineup_attributes, simulate_tournament, team_power
+from game.engine.constants import LINEUP_SIZE
+from game.engine.tournament import FORMATS
+from game.models import Championship, Team
+from game.odds import lineup_prefetch, starting_lineup
+
+
+class Command(BaseCommand):
+    help = 'Simula um campeonato N vezes e mostra a chance de cada time chegar a cada fase'
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--championship', type=int, help='ID do Championship (usa seus times e formato)')
+        source.add_argument('--teams', help='IDs dos times separados por vírgula')
+        source.add_argument('--region', choices=[code for code, _ in Team.REGIONS], help='Todos os times da região')
+
+        parser.add_argument('--format', choices=FORMATS, help='Formato do campeonato (padrão: o do Championship)')
+        parser.add_argument('--series', default='BO3', choices=sorted(WINS_NEEDED), help='Formato das séries')
+        parser.add_argument('--final', choices=sorted(WINS_NEEDED), help='Formato da final (padrão: --series)')
+        parser.add_argument('--swiss-wins', type=int, default=3, help='Vitórias para classificar no Swiss')
+        parser.add_argument('--swiss-losses', type=int, default=3, help='Derrotas para cair no Swiss')
+        parser.add_argument('-n', '--iterations', type=int, default=100_000, help='Campeonatos simulados')
+        parser.add_argument('--workers', type=int, default=None, help='Processos no pool (padrão: CPUs)')
+        parser.add_argument('--seed', type=int, default=None, help='Seed para resultados reproduzíveis')
+        parser.add_argument('--json', action='store_true', help='Saída em JSON')
+
+    def handle(self, *args, **options):
+        teams = Team.objects.prefetch_related(lineup_prefetch())
+        tournament_format = options['format']
+        if options['championship']:
+            try:
+                championship = Championship.objects.get(id=options['championship'])
+            except Championship.DoesNotExist:
+                raise CommandError(f"Championship {options['championship']} not found")
+            teams = teams.filter(championships=championship)
+            tournament_format = tournament_format or championship.format
+        elif options['teams']:
+            try:
+                team_ids = [int(t) for t in options['teams'].split(',')]
+            except ValueError:
+                raise CommandError(f"--teams must be comma-separated team ids, got {options['teams']!r}")
+            teams = teams.filter(id__in=team_ids)
+        else:
+            teams = teams.filter(region=options['region'])
+
+        lineups = []
+        for team in teams:
+            lineup = starting_lineup(team)
+            if len(lineup) < LINEUP_SIZE:
+                raise CommandError(f'{team.name} has only {len(lineup)} players')
+            lineups.append((team, lineup_attributes(lineup)))
+        if len(lineups) < 2:
+            raise CommandError('A tournament needs at least 2 teams')
+
+        # Seed pelo poder do time: o mais forte é o cabeça de chave
+        lineups.sort(key=lambda item: -team_power(item[1]))
+        attributes = np.stack([attrs for _, attrs in lineups])
+
+        start = time.perf_counter()
+        try:
+            results = simulate_tournament(
+                attributes,
+                tournament_format=tournament_format or 'single_elimination',
+                series=options['series'],
+                final_series=options['final'],
+                iterations=options['iterations'],
+                seed=options['seed'],
+                workers=options['workers'],
+                swiss_wins=options['swiss_wins'],
+                swiss_losses=options['swiss_losses'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        names = [team.name for team, _ in lineups]
+        if options['json']:
+            self.stdout.write(json.dumps(results.as_dict(names), indent=2))
+            return
+
+        order = np.argsort(-results.probabilities[:, -1], kind='stable')
+        width = max(len(name) for name in names)
+        self.stdout.write(f"{'Team':<{width}}  " + '  '.join(f'{stage:>{len(stage)}}' for stage in results.stages))
+        for i in order:
+            cells = '  '.join(
+                f'{results.probabilities[i, s] * 100:>{len(stage)}.1f}' for s, stage in enumerate(results.stages)
+            )
+            self.stdout.write(f'{names[i]:<{width}}  {cells}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {results.iterations} campeonatos simulados em {elapsed:.1f}s'
+        ))
@@ -0,0 +1,63 @@
+"""
+Comando Django para simular séries no motor server-side e gravar os resultados
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.engine import WINS_NEEDED
+from game.engine.constants import LINEUP_SIZE
+from game.models import Map, Team
+from game.odds import lineup_prefetch, starting_lineup
+from game.results import simulate_and_store
+
+
+class Command(BaseCommand):
+    help = 'Simula N séries entre dois times e grava partidas, rounds e stats dos jogadores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('team_a', type=int, help='ID do time A')
+        parser.add_argument('team_b', type=int, help='ID do time B')
+        parser.add_argument('--format', default='BO1', choices=sorted(WINS_NEEDED), help='Formato das séries')
+        parser.add_argument('-n', '--matches', type=int, default=1, help='Séries a simular')
+        parser.add_argument('--map', type=int, default=None, help='ID do mapa')
+        parser.add_argument('--seed', type=int, default=None, help='Seed para resultados reproduzíveis')
+        parser.add_argument('--replay-only', action='store_true',
+                            help='Grava só seed + versão do motor + titulares (rounds regenerados sob demanda)')
+
+    def handle(self, *args, **options):
+        if options['matches'] < 1:
+            raise CommandError('--matches must be positive')
+        teams = Team.objects.prefetch_related(lineup_prefetch()).in_bulk([options['team_a'], options['team_b']])
+        if options['team_a'] not in teams or options['team_b'] not in teams:
+            raise CommandError('Team not found')
+        team_a, team_b = teams[options['team_a']], teams[options['team_b']]
+
+        lineups = []
+        for team in (team_a, team_b):
+            lineup = starting_lineup(team)
+            if len(lineup) < LINEUP_SIZE:
+                raise CommandError(f'{team.name} has only {len(lineup)} players')
+            lineups.append(lineup)
+
+        selected_map = None
+        if options['map']:
+            try:
+                selected_map = Map.objects.get(id=options['map'])
+            except Map.DoesNotExist:
+                raise CommandError(f"Map {options['map']} not found")
+
+        start = time.perf_counter()
+        match_ids = simulate_and_store(
+            team_a, team_b, *lineups,
+            series_format=options['format'],
+            n=options['matches'],
+            seed=options['seed'],
+            selected_map=selected_map,
+            replay_only=options['replay_only'],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(match_ids)} séries {team_a.short_name} x {team_b.short_name} gravadas em {elapsed:.1f}s'
+        ))
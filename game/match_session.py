@@ -0,0 +1,276 @@
+"""
+Sessão de partida no servidor para o botão "Next Round": avança um round por
+request e sobrevive a reloads.
+
+O estado inteiro cabe num blob de tamanho fixo (SESSION_SIZE bytes) guardado
+no cache: placar, mapa, round, série, kills/mortes por jogador, chance de round
+do time A, titulares e o estado do PCG64. Os rounds do mapa atual são gerados
+de uma vez quando o mapa começa (o mesmo sorteio de replay.series_maps, então
+a sessão segue o replay da partida) e ficam empacotados no blob, 6 bytes por
+round. Um passo é só: travar, ler o blob, decodificar um round, somar,
+gravar, destravar (4 operações no cache); o NumPy só entra na troca de mapa.
+
+Cada navegador (viewer, cookie assinado em views.py) tem a sua sessão da
+partida, e um passo segura uma trava curta no cache: um duplo clique não
+aplica o mesmo round duas vezes. A trava é um cache.add, atômico só em alguns
+backends (ATOMIC_CACHE_BACKENDS); nos outros (arquivo, banco) o add é um
+"existe?" seguido de um set, e as sessões ficam desligadas.
+"""
+
+import struct
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .engine import WIN_CONDITIONS, WINS_NEEDED
+from .engine.constants import HALFTIME_ROUND, LINEUP_SIZE, REGULATION_ROUNDS
+
+SESSION_KEY = 'match_session:{match_id}:{viewer}'
+SESSION_TIMEOUT = 60 * 60 * 24
+# Trava de um passo; expira sozinha se o processo morrer no meio
+LOCK_TIMEOUT = 10
+SESSION_VERSION = 1
+
+# cache.add atômico: SET NX no Redis, add no memcached, lock do processo no locmem
+ATOMIC_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+# Rounds guardados no blob. Passar disso exige 36 pares de overtime empatados
+# seguidos; se acontecer, o mapa é regenerado a partir do estado do início dele.
+MAX_ROUNDS = 96
+ROUND_BYTES = 6
+PLAYERS = 2 * LINEUP_SIZE
+
+# versão, vitórias p/ série, mapa, rounds jogados, rounds do mapa, placar A/B, série A/B,
+# chance de round do A, PCG64 atual e do início do mapa, ids, kills, mortes
+HEADER = struct.Struct(f'<9Bd16s16sBI16s16sBI{PLAYERS}I{PLAYERS}H{PLAYERS}H')
+SESSION_SIZE = HEADER.size + MAX_ROUNDS * ROUND_BYTES
+
+
+class SessionOver(Exception):
+    """A série já terminou."""
+
+
+class SessionBusy(Exception):
+    """Outro passo da mesma sessão está em andamento."""
+
+
+class SessionsUnavailable(Exception):
+    """O backend de cache não trava um passo de forma atômica."""
+
+
+def sessions_available():
+    """Sessões só rodam com um cache.add atômico (ver ATOMIC_CACHE_BACKENDS)."""
+    return settings.CACHES['default']['BACKEND'] in ATOMIC_CACHE_BACKENDS
+
+
+def _rng_state(generator):
+    state = generator.bit_generator.state
+    return (
+        state['state']['state'].to_bytes(16, 'little'), state['state']['inc'].to_bytes(16, 'little'),
+        state['has_uint32'], state['uinteger'],
+    )
+
+
+def _generator(state, inc, has_uint32, uinteger):
+    import numpy as np
+
+    generator = np.random.Generator(np.random.PCG64())
+    generator.bit_generator.state = {
+        'bit_generator': 'PCG64',
+        'state': {'state': int.from_bytes(state, 'little'), 'inc': int.from_bytes(inc, 'little')},
+        'has_uint32': has_uint32,
+        'uinteger': uinteger,
+    }
+    return generator
+
+
+def _encode_map(result):
+    """
+    Rounds de um mapa (MapResults de 1 mapa) em bytes, ROUND_BYTES por round:
+    byte 0 = vencedor | condição << 1; bytes 1-5 = mortes (1 bit por jogador)
+    e kills (3 bits por jogador) do round.
+    """
+    import numpy as np
+
+    from .engine.match import round_stats
+
+    played = int(result.rounds[0])
+    kills, deaths = round_stats(result.round_events[0, :, :played])
+    players = np.arange(PLAYERS, dtype=np.uint64)
+    bits = (deaths.reshape(played, PLAYERS).astype(np.uint64) << players).sum(axis=1)
+    bits |= (kills.reshape(played, PLAYERS).astype(np.uint64) << (PLAYERS + 3 * players)).sum(axis=1)
+
+    rounds = np.empty((played, ROUND_BYTES), dtype=np.uint8)
+    rounds[:, 0] = result.round_winners[0, :played] | (result.conditions[0, :played] << 1)
+    rounds[:, 1:] = bits.astype('<u8').view(np.uint8).reshape(played, 8)[:, :ROUND_BYTES - 1]
+    return rounds.tobytes()
+
+
+class MatchSession:
+    __slots__ = (
+        'wins_needed', 'map_number', 'cursor', 'map_rounds', 'score', 'series', 'win_prob',
+        'rng', 'map_rng', 'player_ids', 'kills', 'deaths', 'rounds',
+    )
+
+    @classmethod
+    def start(cls, seed, snapshot, series_format):
+        """Sessão nova no início da série (gera o primeiro mapa)."""
+        import numpy as np
+
+        from .engine.roster import lineup_attributes, round_win_probability
+
+        if series_format not in WINS_NEEDED:
+            raise ValueError(f"Unknown series format: {series_format}")
+        session = cls()
+        session.wins_needed = WINS_NEEDED[series_format]
+        session.map_number = 0
+        session.series = [0, 0]
+        session.win_prob = float(round_win_probability(
+            lineup_attributes(snapshot['team_a']), lineup_attributes(snapshot['team_b'])))
+        session.rng = _rng_state(np.random.default_rng(seed))
+        session.player_ids = [player['id'] for side in ('team_a', 'team_b') for player in snapshot[side]]
+        session._next_map()
+        return session
+
+    @classmethod
+    def from_blob(cls, blob):
+        values = HEADER.unpack_from(blob)
+        if values[0] != SESSION_VERSION:
+            raise ValueError('Unknown session version')
+        session = cls()
+        (session.wins_needed, session.map_number, session.cursor, session.map_rounds,
+         score_a, score_b, series_a, series_b, session.win_prob) = values[1:10]
+        session.score, session.series = [score_a, score_b], [series_a, series_b]
+        session.rng, session.map_rng = values[10:14], values[14:18]
+        session.player_ids = list(values[18:18 + PLAYERS])
+        session.kills = list(values[18 + PLAYERS:18 + 2 * PLAYERS])
+        session.deaths = list(values[18 + 2 * PLAYERS:])
+        session.rounds = blob[HEADER.size:]
+        return session
+
+    def to_blob(self):
+        header = HEADER.pack(
+            SESSION_VERSION, self.wins_needed, self.map_number, self.cursor, self.map_rounds,
+            *self.score, *self.series, self.win_prob, *self.rng, *self.map_rng,
+            *self.player_ids, *self.kills, *self.deaths,
+        )
+        return header + self.rounds[:MAX_ROUNDS * ROUND_BYTES].ljust(MAX_ROUNDS * ROUND_BYTES, b'\0')
+
+    @property
+    def finished(self):
+        return max(self.series) >= self.wins_needed
+
+    def _next_map(self):
+        from .engine import simulate_maps
+
+        rng = _generator(*self.rng)
+        self.map_rng = self.rng
+        result = simulate_maps(self.win_prob, n=1, rng=rng, history=True)
+        self.rng = _rng_state(rng)
+        self.map_number += 1
+        self.cursor = 0
+        self.map_rounds = int(result.rounds[0])
+        self.score = [0, 0]
+        self.kills, self.deaths = [0] * PLAYERS, [0] * PLAYERS
+        self.rounds = _encode_map(result)
+
+    def _round(self, index):
+        if index >= MAX_ROUNDS and len(self.rounds) <= index * ROUND_BYTES:
+            from .engine import simulate_maps
+
+            # Mapa maior que o blob: regenera a partir do estado do início do mapa
+            self.rounds = _encode_map(simulate_maps(self.win_prob, n=1, rng=_generator(*self.map_rng), history=True))
+        packed = self.rounds[index * ROUND_BYTES:(index + 1) * ROUND_BYTES]
+        bits = int.from_bytes(packed[1:], 'little')
+        deaths = [(bits >> player) & 1 for player in range(PLAYERS)]
+        kills = [(bits >> (PLAYERS + 3 * player)) & 7 for player in range(PLAYERS)]
+        return packed[0] & 1, packed[0] >> 1, kills, deaths
+
+    def next_round(self):
+        """Joga o próximo round; retorna o evento no formato de game/live.py."""
+        if self.finished:
+            raise SessionOver
+        if self.cursor == self.map_rounds:
+            self._next_map()
+
+        winner, condition, kills, deaths = self._round(self.cursor)
+        self.cursor += 1
+        self.score[winner] += 1
+        self.kills = [a + b for a, b in zip(self.kills, kills)]
+        self.deaths = [a + b for a, b in zip(self.deaths, deaths)]
+        if self.cursor == self.map_rounds:
+            self.series[winner] += 1
+
+        return {
+            'm': self.map_number,
+            'r': self.cursor,
+            'w': 'AB'[winner],
+            'c': WIN_CONDITIONS[condition],
+            's': list(self.score),
+            'side': 'A' if _a_defends(self.cursor) else 'B',
+            'k': [kills[:LINEUP_SIZE], kills[LINEUP_SIZE:]],
+            'd': [deaths[:LINEUP_SIZE], deaths[LINEUP_SIZE:]],
+            'series': list(self.series),
+            'done': self.finished,
+        }
+
+    def snapshot(self):
+        """Estado para retomar a partida (mesmo formato do snapshot de game/broadcast.py)."""
+        history = []
+        for index in range(self.cursor):
+            winner, condition, _, _ = self._round(index)
+            history.append(['AB'[winner], WIN_CONDITIONS[condition]])
+        return {
+            'lineups': {'a': self.player_ids[:LINEUP_SIZE], 'b': self.player_ids[LINEUP_SIZE:]},
+            'm': self.map_number,
+            'r': self.cursor,
+            's': list(self.score),
+            'series': list(self.series),
+            'k': [self.kills[:LINEUP_SIZE], self.kills[LINEUP_SIZE:]],
+            'd': [self.deaths[:LINEUP_SIZE], self.deaths[LINEUP_SIZE:]],
+            'rounds': history,
+            'done': self.finished,
+        }
+
+
+def _a_defends(round_number):
+    """Lado defensor do round (A defende no 1º tempo e nos rounds ímpares do OT)."""
+    return round_number < HALFTIME_ROUND or (round_number > REGULATION_ROUNDS and round_number % 2 == 1)
+
+
+def load_session(match_id, viewer):
+    """Sessão em andamento da partida para o viewer, ou None."""
+    blob = cache.get(SESSION_KEY.format(match_id=match_id, viewer=viewer))
+    return MatchSession.from_blob(blob) if blob is not None else None
+
+
+def advance_session(match_id, viewer, start):
+    """
+    Avança a sessão um round e retorna o evento: 4 operações no cache (add da
+    trava, get, set, delete da trava). Sem sessão, start() -> MatchSession cria
+    uma (só aí a partida é lida). Com outro passo em andamento (o add da trava
+    falha), levanta SessionBusy; num backend sem add atômico, SessionsUnavailable.
+    """
+    if not sessions_available():
+        raise SessionsUnavailable
+    key = SESSION_KEY.format(match_id=match_id, viewer=viewer)
+    lock = f'{key}:lock'
+    if not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        raise SessionBusy
+    try:
+        blob = cache.get(key)
+        session = MatchSession.from_blob(blob) if blob is not None else start()
+        event = session.next_round()
+        cache.set(key, session.to_blob(), timeout=SESSION_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return event
+
+
+def reset_session(match_id, viewer):
+    cache.delete(SESSION_KEY.format(match_id=match_id, viewer=viewer))
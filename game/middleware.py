@@ -0,0 +1,64 @@
+"""
+Middleware de instrumentação: queries, tempo de banco, de template e da view no
+header Server-Timing (aparece na aba Network do devtools).
+
+Liga com settings.SERVER_TIMING. Desligado, o Django remove o middleware na
+inicialização (MiddlewareNotUsed) e nada é medido.
+"""
+
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .timing import REQUEST_METRICS, SLOW_REQUESTS, RequestMetrics, instrument_templates, sql_timer
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instrument_templates()
+        SLOW_REQUESTS.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0.0)
+        SLOW_REQUESTS.max_entries = getattr(settings, 'SERVER_TIMING_LOG_SIZE', 200)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = REQUEST_METRICS.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sql_timer))
+                response = self.get_response(request)
+        finally:
+            REQUEST_METRICS.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        # Respostas em streaming ainda não renderizaram o corpo; o tempo é só até aqui
+        entries = [
+            f'db;desc="{metrics.queries} queries";dur={metrics.db_ms:.2f}',
+            f'tpl;desc="templates";dur={metrics.template_ms:.2f}',
+        ]
+        entries += [f'{name};dur={ms:.2f}' for name, ms in metrics.spans.items()]
+        entries.append(f'view;desc="total";dur={total_ms:.2f}')
+        response['Server-Timing'] = ', '.join(entries)
+
+        match = getattr(request, 'resolver_match', None)
+        if match and match.url_name == 'timing_debug':
+            return response
+        SLOW_REQUESTS.maybe_record({
+            'url_name': match.view_name if match else None,
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_ms, 2),
+            'template_ms': round(metrics.template_ms, 2),
+            'spans': {name: round(ms, 2) for name, ms in metrics.spans.items()},
+        })
+        return response
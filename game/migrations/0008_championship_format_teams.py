@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0007_player_mental'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='championship',
+            name='format',
+            field=models.CharField(choices=[('single_elimination', 'Single Elimination'), ('double_elimination', 'Double Elimination'), ('swiss', 'Swiss + Playoffs')], default='single_elimination', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='championship',
+            name='teams',
+            field=models.ManyToManyField(blank=True, related_name='championships', to='game.team'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+def populate_overall(apps, schema_editor):
+    from game.ratings import OVERALL_ATTRIBUTES, compute_overalls, compute_team_overalls
+
+    Player = apps.get_model('game', 'Player')
+    Team = apps.get_model('game', 'Team')
+    players = list(Player.objects.all())
+    if not players:
+        return
+    overalls = compute_overalls(
+        [p.role for p in players],
+        [[getattr(p, attr) for attr in OVERALL_ATTRIBUTES] for p in players],
+    )
+    for player, overall in zip(players, overalls.tolist()):
+        player.overall = overall
+    Player.objects.bulk_update(players, ['overall'], batch_size=500)
+
+    team_overalls = compute_team_overalls(
+        [p.team_id for p in players], [p.id for p in players], overalls
+    )
+    teams = [Team(id=team_id, overall=overall) for team_id, overall in team_overalls.items()]
+    Team.objects.bulk_update(teams, ['overall'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_championship_format_teams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='overall',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='overall',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(populate_overall, migrations.RunPython.noop),
+    ]
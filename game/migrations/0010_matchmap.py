@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0009_overall'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchMap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveSmallIntegerField()),
+                ('map_name', models.CharField(blank=True, max_length=50)),
+                ('score_a', models.IntegerField(default=0)),
+                ('score_b', models.IntegerField(default=0)),
+                ('round_history', models.JSONField(blank=True, default=list)),
+                ('player_stats', models.JSONField(blank=True, default=list)),
+                ('map', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='game.map')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='maps', to='game.match')),
+                ('winner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_maps', to='game.team')),
+            ],
+            options={
+                'ordering': ['match', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('match', 'number'), name='unique_match_map_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_json_stats(apps, schema_editor):
+    """Copia round_history/player_stats (JSON em MatchMap) para as novas tabelas."""
+    MatchMap = apps.get_model('game', 'MatchMap')
+    Player = apps.get_model('game', 'Player')
+    RoundResult = apps.get_model('game', 'RoundResult')
+    PlayerMatchStat = apps.get_model('game', 'PlayerMatchStat')
+
+    player_teams = dict(Player.objects.values_list('id', 'team_id'))
+    rounds, stats = [], []
+    for match_map in MatchMap.objects.all():
+        score = {'A': 0, 'B': 0}
+        for entry in match_map.round_history:
+            score[entry['winner']] += 1
+            rounds.append(RoundResult(
+                match_id=match_map.match_id, map_number=match_map.number, round=entry['round'],
+                winner=entry['winner'], condition=entry.get('condition') or '',
+                score_a=score['A'], score_b=score['B'],
+            ))
+        for entry in match_map.player_stats:
+            if entry['player'] not in player_teams:
+                continue
+            stats.append(PlayerMatchStat(
+                match_id=match_map.match_id, map_number=match_map.number, player_id=entry['player'],
+                team_id=player_teams[entry['player']],
+                **{field: entry.get(field, 0) for field in ('kills', 'deaths', 'assists', 'fk', 'fd')},
+            ))
+    RoundResult.objects.bulk_create(rounds, batch_size=2000)
+    PlayerMatchStat.objects.bulk_create(stats, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0010_matchmap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerMatchStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('map_number', models.PositiveSmallIntegerField(default=1)),
+                ('kills', models.PositiveSmallIntegerField(default=0)),
+                ('deaths', models.PositiveSmallIntegerField(default=0)),
+                ('assists', models.PositiveSmallIntegerField(default=0)),
+                ('fk', models.PositiveSmallIntegerField(default=0)),
+                ('fd', models.PositiveSmallIntegerField(default=0)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='game.match')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_stats', to='game.player')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game.team')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['player', 'match'], name='game_stat_player_match_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RoundResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('map_number', models.PositiveSmallIntegerField(default=1)),
+                ('round', models.PositiveSmallIntegerField()),
+                ('winner', models.CharField(choices=[('A', 'Team A'), ('B', 'Team B')], max_length=1)),
+                ('condition', models.CharField(blank=True, max_length=20)),
+                ('score_a', models.PositiveSmallIntegerField(default=0)),
+                ('score_b', models.PositiveSmallIntegerField(default=0)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rounds', to='game.match')),
+            ],
+            options={
+                'ordering': ['match', 'map_number', 'round'],
+                'indexes': [models.Index(fields=['match', 'round'], name='game_round_match_round_idx')],
+            },
+        ),
+        migrations.RunPython(move_json_stats, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='matchmap',
+            name='player_stats',
+        ),
+        migrations.RemoveField(
+            model_name='matchmap',
+            name='round_history',
+        ),
+    ]
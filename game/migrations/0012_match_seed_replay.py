@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0011_round_and_player_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='engine_version',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='roster_snapshot',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
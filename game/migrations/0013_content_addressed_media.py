@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:57
+
+import game.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0012_match_seed_replay'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='championship',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=game.storage.media_storage, upload_to='championships/'),
+        ),
+        migrations.AlterField(
+            model_name='map',
+            name='minimap',
+            field=models.ImageField(blank=True, null=True, storage=game.storage.media_storage, upload_to='maps/'),
+        ),
+        migrations.AlterField(
+            model_name='player',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=game.storage.media_storage, upload_to='players/'),
+        ),
+        migrations.AlterField(
+            model_name='team',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=game.storage.media_storage, upload_to='teams/'),
+        ),
+    ]
@@ -1,5 +1,112 @@
 from django.db import models
 
+from . import images, teams_payload
+from .storage import media_storage
+
+# Pesos por Role (A soma deve dar 1.0)
+OVERALL_WEIGHTS = {
+    'DUELIST': {
+        'aim': 0.55,        # Mira é extremamente crucial
+        'gamesense': 0.20,  # Posicionamento
+        'mental': 0.10,     # Padronizado
+        'support': 0.10,    # Menos importante
+        'clutch': 0.05      # Reduzido
+    },
+    'CONTROLLER': {
+        'aim': 0.40,        # Mira muito importante agora
+        'gamesense': 0.25,  # Fumos/Posicionamento
+        'support': 0.20,    # Ajudar o time
+        'mental': 0.10,     # Padronizado
+        'clutch': 0.05      # Reduzido
+    },
+    'INITIATOR': {
+        'aim': 0.40,        # Mira muito importante
+        'support': 0.30,    # Utilitário é o principal
+        'gamesense': 0.15,  # Info
+        'mental': 0.10,     # Padronizado
+        'clutch': 0.05      # Reduzido
+    },
+    'SENTINEL': {
+        'aim': 0.50,        # Segurar bomb/mecânica muito importante
+        'gamesense': 0.25,  # Leitura de jogo/Lurk
+        'mental': 0.10,     # Padronizado
+        'support': 0.10,    # Menos importante
+        'clutch': 0.05      # Reduzido
+    },
+    'FLEX': {  # Balanceado
+        'aim': 0.20,
+        'gamesense': 0.20,
+        'support': 0.20,
+        'mental': 0.20,
+        'clutch': 0.20
+    }
+}
+
+# Campos que entram no cálculo do Overall
+OVERALL_FIELDS = {'role', 'aim', 'gamesense', 'support', 'clutch', 'mental'}
+
+
+class PlayerQuerySet(models.QuerySet):
+    """
+    bulk_create/bulk_update e delete() em lote não chamam save()/Player.delete():
+    aqui o Overall dos jogadores é recalculado em lote e o dos times afetados
+    atualizado no final.
+    """
+
+    def _set_overalls(self, objs):
+        from .ratings import OVERALL_ATTRIBUTES, compute_overalls
+
+        if not objs:
+            return
+        overalls = compute_overalls(
+            [p.role for p in objs],
+            [[getattr(p, attr) for attr in OVERALL_ATTRIBUTES] for p in objs],
+        )
+        for player, overall in zip(objs, overalls.tolist()):
+            player.overall = overall
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .ratings import refresh_team_overalls
+
+        objs = list(objs)
+        self._set_overalls(objs)
+        created = super().bulk_create(objs, *args, **kwargs)
+        refresh_team_overalls(p.team_id for p in objs)
+        teams_payload.invalidate()
+        return created
+
+    def bulk_update(self, objs, fields, *args, refresh_teams=True, **kwargs):
+        from .ratings import refresh_team_overalls
+
+        objs = list(objs)
+        fields = list(fields)
+        if OVERALL_FIELDS.intersection(fields):
+            self._set_overalls(objs)
+            if 'overall' not in fields:
+                fields.append('overall')
+        refresh_teams = refresh_teams and bool({'overall', 'team', 'active'}.intersection(fields))
+        if refresh_teams:
+            # Times de antes da atualização (team_id dos objetos pode nem estar
+            # carregado, ex.: Player(id=..., overall=...)): quem troca de time muda
+            # o Overall do time de origem também
+            team_ids = set(self.model.objects.filter(id__in=[p.pk for p in objs]).values_list('team_id', flat=True))
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        if refresh_teams:
+            if 'team' in fields:
+                team_ids.update(p.team_id for p in objs)
+            refresh_team_overalls(team_ids)
+        teams_payload.invalidate()
+        return updated
+
+    def delete(self):
+        from .ratings import refresh_team_overalls
+
+        team_ids = set(self.values_list('team_id', flat=True))
+        deleted = super().delete()
+        refresh_team_overalls(team_ids)
+        return deleted
+
+
 class Team(models.Model):
     REGIONS = [
         ('AMERICAS', 'Americas'),
@@ -13,7 +120,9 @@ class Team(models.Model):
     region = models.CharField(max_length=20, choices=REGIONS, default='AMERICAS')
     color_primary = models.CharField(max_length=7, default='#000000') # Hex code
     color_secondary = models.CharField(max_length=7, default='#ffffff')
-    logo = models.ImageField(upload_to='teams/', blank=True, null=True)
+    logo = models.ImageField(upload_to='teams/', blank=True, null=True, storage=media_storage)
+    # Cache de calculate_team_overall, mantido por Player.save/bulk_* e recompute_overalls
+    overall = models.IntegerField(default=0, db_index=True)
     
     class Meta:
         ordering = ['region', 'name']
@@ -23,12 +132,23 @@ class Team(models.Model):
         Calcula o Overall do time dinamicamente baseado nos 5 primeiros jogadores.
         Retorna a média dos overall ratings dos top 5 jogadores.
         """
-        players = self.players.all()[:5]
+        players = self.players.filter(active=True).order_by('id')[:5]
         if not players:
             return 0
         
-        player_ratings = [p.calculate_overall() for p in players]
+        player_ratings = [p.overall for p in players]
         return int(sum(player_ratings) / len(player_ratings))
+
+    def refresh_overall(self):
+        """Recalcula e grava o Overall do time."""
+        self.overall = self.calculate_team_overall()
+        Team.objects.filter(pk=self.pk).update(overall=self.overall)
+        teams_payload.invalidate()
+
+    @property
+    def logo_srcset(self):
+        """srcset com as variantes WebP do logo ('' se ainda não foram geradas)."""
+        return images.srcset(self.logo)
     
     def __str__(self):
         return self.name
@@ -45,7 +165,7 @@ class Player(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='players')
     role = models.CharField(max_length=20, choices=ROLES)
     rating = models.IntegerField(default=75) # 0-100
-    photo = models.ImageField(upload_to='players/', blank=True, null=True)
+    photo = models.ImageField(upload_to='players/', blank=True, null=True, storage=media_storage)
     
     # Player Attributes (1-20 scale)
     aim = models.IntegerField(default=10)  # Mechanical skill
@@ -53,53 +173,48 @@ class Player(models.Model):
     support = models.IntegerField(default=10)  # Utility & teamplay
     clutch = models.IntegerField(default=10)  # Performance under pressure
     mental = models.IntegerField(default=10)  # Mental strength / resilience
+    # Cache de calculate_overall, recalculado em save()
+    overall = models.IntegerField(default=0, db_index=True)
+    # False: saiu do elenco mas ficou pelo histórico de partidas (fora dos
+    # titulares, do Overall do time e do payload de times)
+    active = models.BooleanField(default=True)
+
+    objects = PlayerQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Time original, para atualizar o Overall dele se o jogador trocar de time
+        instance._loaded_team_id = instance.__dict__.get('team_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .ratings import refresh_team_overalls
+
+        self.overall = self.calculate_overall()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'overall' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'overall']
+        super().save(*args, **kwargs)
+
+        refresh_team_overalls({self.team_id, getattr(self, '_loaded_team_id', None)})
+        self._loaded_team_id = self.team_id
+
+    def delete(self, *args, **kwargs):
+        from .ratings import refresh_team_overalls
+
+        team_id = self.team_id
+        result = super().delete(*args, **kwargs)
+        refresh_team_overalls([team_id])
+        return result
     
     def calculate_overall(self):
         """
         Calcula o Overall (0-99) baseado na Role do jogador.
         Atributos de entrada: 1-20.
         """
-        # Pesos por Role (A soma deve dar 1.0)
-        weights = {
-            'DUELIST': {
-                'aim': 0.55,        # Mira é extremamente crucial
-                'gamesense': 0.20,  # Posicionamento
-                'mental': 0.10,     # Padronizado
-                'support': 0.10,    # Menos importante
-                'clutch': 0.05      # Reduzido
-            },
-            'CONTROLLER': {
-                'aim': 0.40,        # Mira muito importante agora
-                'gamesense': 0.25,  # Fumos/Posicionamento
-                'support': 0.20,    # Ajudar o time
-                'mental': 0.10,     # Padronizado
-                'clutch': 0.05      # Reduzido
-            },
-            'INITIATOR': {
-                'aim': 0.40,        # Mira muito importante
-                'support': 0.30,    # Utilitário é o principal
-                'gamesense': 0.15,  # Info
-                'mental': 0.10,     # Padronizado
-                'clutch': 0.05      # Reduzido
-            },
-            'SENTINEL': {
-                'aim': 0.50,        # Segurar bomb/mecânica muito importante
-                'gamesense': 0.25,  # Leitura de jogo/Lurk
-                'mental': 0.10,     # Padronizado
-                'support': 0.10,    # Menos importante
-                'clutch': 0.05      # Reduzido
-            },
-            'FLEX': {  # Balanceado
-                'aim': 0.20,
-                'gamesense': 0.20,
-                'support': 0.20,
-                'mental': 0.20,
-                'clutch': 0.20
-            }
-        }
-
         # Pega os pesos da role do jogador (fallback para Flex)
-        w = weights.get(self.role, weights['FLEX'])
+        w = OVERALL_WEIGHTS.get(self.role, OVERALL_WEIGHTS['FLEX'])
 
         # 1. Calcula a média ponderada (Resultado será entre 1 e 20)
         weighted_score = (
@@ -125,20 +240,40 @@ class Player(models.Model):
         
         # Clamp para garantir que fique entre 40 e 99
         return int(max(40, min(99, overall)))
+
+    @property
+    def photo_srcset(self):
+        return images.srcset(self.photo)
     
     def __str__(self):
         return f"{self.name} ({self.team.short_name})"
 
 class Championship(models.Model):
+    FORMATS = [
+        ('single_elimination', 'Single Elimination'),
+        ('double_elimination', 'Double Elimination'),
+        ('swiss', 'Swiss + Playoffs'),
+    ]
+
     name = models.CharField(max_length=100)
-    logo = models.ImageField(upload_to='championships/', blank=True, null=True)
+    logo = models.ImageField(upload_to='championships/', blank=True, null=True, storage=media_storage)
+    format = models.CharField(max_length=20, choices=FORMATS, default='single_elimination')
+    teams = models.ManyToManyField(Team, blank=True, related_name='championships')
+
+    @property
+    def logo_srcset(self):
+        return images.srcset(self.logo)
 
     def __str__(self):
         return self.name
 
 class Map(models.Model):
     name = models.CharField(max_length=50)
-    minimap = models.ImageField(upload_to='maps/', blank=True, null=True)
+    minimap = models.ImageField(upload_to='maps/', blank=True, null=True, storage=media_storage)
+
+    @property
+    def minimap_srcset(self):
+        return images.srcset(self.minimap)
 
     def __str__(self):
         return self.name
@@ -154,6 +289,73 @@ class Match(models.Model):
     map = models.ForeignKey(Map, on_delete=models.SET_NULL, null=True, blank=True)
     championship = models.ForeignKey(Championship, on_delete=models.SET_NULL, null=True, blank=True)
     date = models.DateTimeField(auto_now_add=True)
+    # Replay sob demanda (game/replay.py): com seed, os rounds são regenerados pelo motor
+    seed = models.BigIntegerField(null=True, blank=True)
+    engine_version = models.CharField(max_length=20, blank=True)
+    roster_snapshot = models.JSONField(null=True, blank=True) # Titulares e atributos no momento da partida
+
+    @property
+    def is_finished(self):
+        """A partida só tem vencedor depois que o resultado é gravado."""
+        return self.winner_id is not None
     
     def __str__(self):
         return f"{self.team_a} vs {self.team_b} ({self.score_a}-{self.score_b})"
+
+class MatchMap(models.Model):
+    """Resultado de um mapa da série (Match guarda o placar de mapas)."""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='maps')
+    number = models.PositiveSmallIntegerField() # 1, 2, 3... na ordem jogada
+    map = models.ForeignKey(Map, on_delete=models.SET_NULL, null=True, blank=True)
+    map_name = models.CharField(max_length=50, blank=True)
+    score_a = models.IntegerField(default=0)
+    score_b = models.IntegerField(default=0)
+    winner = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, related_name='won_maps')
+
+    class Meta:
+        ordering = ['match', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'number'], name='unique_match_map_number'),
+        ]
+
+    def __str__(self):
+        return f"{self.match} - Map {self.number} ({self.score_a}-{self.score_b})"
+
+class RoundResult(models.Model):
+    """Um round de um mapa da série (roundHistory em simulation.js)."""
+    WINNERS = [('A', 'Team A'), ('B', 'Team B')]
+
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='rounds')
+    map_number = models.PositiveSmallIntegerField(default=1)
+    round = models.PositiveSmallIntegerField()
+    winner = models.CharField(max_length=1, choices=WINNERS)
+    condition = models.CharField(max_length=20, blank=True) # elimination, boom, defuse, time
+    # Placar do mapa depois do round
+    score_a = models.PositiveSmallIntegerField(default=0)
+    score_b = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['match', 'map_number', 'round']
+        indexes = [models.Index(fields=['match', 'round'], name='game_round_match_round_idx')]
+
+    def __str__(self):
+        return f"{self.match_id} - Map {self.map_number} R{self.round}: {self.winner}"
+
+class PlayerMatchStat(models.Model):
+    """K/D/A/FK/FD de um jogador em um mapa da série (playerStats em simulation.js)."""
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='match_stats')
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='player_stats')
+    # Time do jogador na partida (pode mudar depois)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    map_number = models.PositiveSmallIntegerField(default=1)
+    kills = models.PositiveSmallIntegerField(default=0)
+    deaths = models.PositiveSmallIntegerField(default=0)
+    assists = models.PositiveSmallIntegerField(default=0)
+    fk = models.PositiveSmallIntegerField(default=0) # First kills
+    fd = models.PositiveSmallIntegerField(default=0) # First deaths
+
+    class Meta:
+        indexes = [models.Index(fields=['player', 'match'], name='game_stat_player_match_idx')]
+
+    def __str__(self):
+        return f"{self.player_id} @ {self.match_id} (map {self.map_number}): {self.kills}/{self.deaths}/{self.assists}"
@@ -0,0 +1,82 @@
+"""
+Probabilidades de vitória via Monte Carlo no motor server-side (game.engine).
+"""
+
+import zlib
+
+import numpy as np
+
+from .caching import LRUCache
+from .engine import lineup_attributes, lineup_fingerprint, round_win_probability, simulate_series
+from .engine.constants import LINEUP_SIZE
+from .lineups import lineup_prefetch  # noqa: F401 (reexportado para os comandos)
+
+DEFAULT_SIMULATIONS = 2000
+MAX_SIMULATIONS = 20000
+
+# (fingerprint A, fingerprint B, formato, n) -> resultado da simulação
+# (o motor não tem efeito de mapa, então o mapa não entra na chave)
+ODDS_CACHE = LRUCache(max_entries=512)
+
+
+def starting_lineup(team):
+    """Os 5 titulares do time (use com lineup_prefetch para não gerar query extra)."""
+    return [player for player in team.players.all() if player.active][:LINEUP_SIZE]
+
+
+def match_odds(lineup_a, lineup_b, series_format='BO1', n=DEFAULT_SIMULATIONS):
+    """
+    Chance de vitória, distribuição de placares e K/D esperado por jogador em n séries.
+    O resultado é memorizado por lineup, formato e n.
+    """
+    key = (lineup_fingerprint(lineup_a), lineup_fingerprint(lineup_b), series_format, n)
+    odds = ODDS_CACHE.get_or_set(key, lambda: _simulate_odds(lineup_a, lineup_b, series_format, n, key))
+
+    # Nomes não entram no fingerprint; junta os atuais sem mexer no valor em cache
+    players = {
+        side: [dict(stats, name=p.name, role=p.role) for p, stats in zip(lineup, odds['players'][side])]
+        for side, lineup in (('team_a', lineup_a), ('team_b', lineup_b))
+    }
+    return dict(odds, players=players)
+
+
+def _simulate_odds(lineup_a, lineup_b, series_format, n, key):
+    win_prob = round_win_probability(lineup_attributes(lineup_a), lineup_attributes(lineup_b))
+    seed = zlib.crc32(repr(key).encode())
+    series = simulate_series(win_prob, series_format, n=n, rng=seed)
+
+    win_a = float(series.winner_a.mean())
+
+    series_scores, counts = np.unique(series.maps_a * 10 + series.maps_b, return_counts=True)
+    played = series.map_scores[..., 0] >= 0
+    map_scores, map_counts = np.unique(
+        series.map_scores[played][:, 0] * 100 + series.map_scores[played][:, 1], return_counts=True,
+    )
+    order = np.argsort(-map_counts, kind='stable')
+
+    kills = series.kills.mean(axis=0)
+    deaths = series.deaths.mean(axis=0)
+    kd = series.kills.sum(axis=0) / np.maximum(series.deaths.sum(axis=0), 1)
+
+    return {
+        'simulations': n,
+        'round_win_probability': round(float(win_prob), 4),
+        'win_probability': {'team_a': round(win_a, 4), 'team_b': round(1 - win_a, 4)},
+        'series_scores': {
+            f'{score // 10}-{score % 10}': round(count / n, 4) for score, count in zip(series_scores, counts)
+        },
+        'map_scores': {
+            f'{map_scores[i] // 100}-{map_scores[i] % 100}': round(map_counts[i] / played.sum(), 4) for i in order
+        },
+        'players': {
+            side: [
+                {
+                    'kills': round(float(kills[t, i]), 2),
+                    'deaths': round(float(deaths[t, i]), 2),
+                    'kd': round(float(kd[t, i]), 2),
+                }
+                for i in range(LINEUP_SIZE)
+            ]
+            for t, side in enumerate(('team_a', 'team_b'))
+        },
+    }
@@ -0,0 +1,113 @@
+"""
+Cálculo vetorizado dos Overalls (Player.overall e Team.overall).
+
+Mesma fórmula de Player.calculate_overall / Team.calculate_team_overall, mas
+aplicada a todos os jogadores de uma vez com NumPy.
+"""
+
+import numpy as np
+
+from . import teams_payload
+
+OVERALL_ATTRIBUTES = ('aim', 'gamesense', 'support', 'clutch', 'mental')
+
+
+def compute_overalls(roles, attributes):
+    """
+    Overall (40-99) de cada jogador.
+    roles: sequência de roles; attributes: (N, 5) na ordem de OVERALL_ATTRIBUTES.
+    """
+    from .models import OVERALL_WEIGHTS
+
+    roles = np.asarray(roles)
+    attributes = np.asarray(attributes, dtype=np.float64).reshape(len(roles), len(OVERALL_ATTRIBUTES))
+    weights = np.empty_like(attributes)
+    known = np.zeros(len(roles), dtype=bool)
+    for role, role_weights in OVERALL_WEIGHTS.items():
+        mask = roles == role
+        weights[mask] = [role_weights.get(attr, 0) for attr in OVERALL_ATTRIBUTES]
+        known |= mask
+    flex = OVERALL_WEIGHTS['FLEX']
+    weights[~known] = [flex.get(attr, 0) for attr in OVERALL_ATTRIBUTES]
+
+    # Soma na mesma ordem de calculate_overall para não divergir no arredondamento
+    products = attributes * weights
+    weighted_score = (
+        products[:, 0] + products[:, 1] + products[:, 2] + products[:, 3] + products[:, 4]
+    )
+    overall = 50 + (weighted_score * 2.45)
+    return np.clip(overall, 40, 99).astype(np.int64)
+
+
+def compute_team_overalls(team_ids, player_ids, overalls):
+    """
+    Overall de cada time: média inteira dos 5 primeiros jogadores (por id).
+    Retorna {team_id: overall}; times sem jogadores não aparecem.
+    """
+    team_ids = np.asarray(team_ids, dtype=np.int64)
+    if not len(team_ids):
+        return {}
+    order = np.lexsort((np.asarray(player_ids), team_ids))
+    teams = team_ids[order]
+    ratings = np.asarray(overalls, dtype=np.int64)[order]
+
+    first = np.r_[True, teams[1:] != teams[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(teams)), 0))
+    starters = (np.arange(len(teams)) - group_start) < 5
+
+    unique_teams, index = np.unique(teams[starters], return_inverse=True)
+    totals = np.bincount(index, weights=ratings[starters]).astype(np.int64)
+    counts = np.bincount(index)
+    return dict(zip(unique_teams.tolist(), (totals // counts).tolist()))
+
+
+def refresh_team_overalls(team_ids=None):
+    """Recalcula Team.overall (todos os times ou só team_ids) a partir de Player.overall."""
+    from .models import Player, Team
+
+    players = Player.objects.filter(active=True)
+    teams = Team.objects.all()
+    if team_ids is not None:
+        team_ids = {team_id for team_id in team_ids if team_id is not None}
+        if not team_ids:
+            return 0
+        players = players.filter(team_id__in=team_ids)
+        teams = teams.filter(id__in=team_ids)
+
+    rows = list(players.values_list('team_id', 'id', 'overall'))
+    overalls = compute_team_overalls(*zip(*rows)) if rows else {}
+
+    changed = []
+    for team_id, current in teams.values_list('id', 'overall'):
+        overall = overalls.get(team_id, 0)
+        if overall != current:
+            changed.append(Team(id=team_id, overall=overall))
+    if changed:
+        Team.objects.bulk_update(changed, ['overall'], batch_size=500)
+        teams_payload.invalidate()
+    return len(changed)
+
+
+def recompute_overalls():
+    """
+    Recalcula Player.overall e Team.overall de todo o banco numa passada vetorizada.
+    Retorna (jogadores alterados, times alterados).
+    """
+    from .models import Player
+
+    rows = list(Player.objects.values_list('id', 'role', 'overall', *OVERALL_ATTRIBUTES))
+    if not rows:
+        return 0, refresh_team_overalls()
+
+    ids, roles, current = (np.array(column) for column in list(zip(*rows))[:3])
+    attributes = np.array([row[3:] for row in rows], dtype=np.float64)
+    overalls = compute_overalls(roles, attributes)
+
+    changed = np.flatnonzero(overalls != current)
+    Player.objects.bulk_update(
+        [Player(id=int(ids[i]), overall=int(overalls[i])) for i in changed],
+        ['overall'],
+        batch_size=500,
+        refresh_teams=False,
+    )
+    return len(changed), refresh_team_overalls()
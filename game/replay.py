@@ -0,0 +1,151 @@
+"""
+Partidas reproduzíveis: o Match guarda só (seed, engine_version, roster_snapshot)
+e o replay completo (rounds, condições, placar e stats por mapa) é regenerado pelo
+motor quando a série é transmitida (game/live.py, game/match_session.py) ou termina.
+
+Todo sorteio da série sai de um único np.random.Generator criado a partir do seed,
+então o mesmo seed + mesma versão do motor + mesmos titulares geram sempre o mesmo
+replay. Os replays regenerados ficam num LRU em memória.
+"""
+
+import secrets
+
+import numpy as np
+
+from .caching import LRUCache
+from .engine import ENGINE_VERSION, WIN_CONDITIONS, WINS_NEEDED, lineup_fingerprint, simulate_maps
+from .engine.constants import ATTRIBUTES
+from .engine.match import TEAM_A
+from .engine.roster import lineup_attributes, round_win_probability
+
+REPLAY_CACHE = LRUCache(max_entries=256)
+SNAPSHOT_FIELDS = ('id', 'name', 'role') + ATTRIBUTES + ('mental',)
+
+
+def new_seed():
+    """Seed aleatório que cabe num BigIntegerField."""
+    return secrets.randbits(63)
+
+
+def roster_snapshot(lineup_a, lineup_b):
+    """Titulares de cada lado com os campos que a simulação usa."""
+    return {
+        side: [{field: getattr(player, field) for field in SNAPSHOT_FIELDS} for player in lineup]
+        for side, lineup in (('team_a', lineup_a), ('team_b', lineup_b))
+    }
+
+
+def _cache_key(seed, series_format, snapshot):
+    return (
+        seed,
+        ENGINE_VERSION,
+        series_format,
+        lineup_fingerprint(snapshot['team_a']),
+        lineup_fingerprint(snapshot['team_b']),
+    )
+
+
+def series_maps(seed, snapshot, series_format='BO1'):
+    """
+    Gera os mapas da série em ordem (MapResults de 1 mapa, com histórico) até
+    alguém fechar a série. É a mesma sequência de sorteios do replay e da partida
+    ao vivo (game/live.py).
+    """
+    if series_format not in WINS_NEEDED:
+        raise ValueError(f"Unknown series format: {series_format}")
+    wins_needed = WINS_NEEDED[series_format]
+    rng = np.random.default_rng(seed)
+    p = round_win_probability(lineup_attributes(snapshot['team_a']), lineup_attributes(snapshot['team_b']))
+
+    wins = [0, 0]
+    while max(wins) < wins_needed:
+        result = simulate_maps(p, n=1, rng=rng, history=True)
+        wins[0 if result.score_a[0] > result.score_b[0] else 1] += 1
+        yield result
+
+
+def simulate_replay(seed, snapshot, series_format='BO1'):
+    """Simula a série inteira a partir do seed. Retorna um dict pronto para JSON."""
+    maps = []
+    wins = [0, 0]
+    for result in series_maps(seed, snapshot, series_format):
+        score_a, score_b = int(result.score_a[0]), int(result.score_b[0])
+        winners = result.round_winners[0, :score_a + score_b].tolist()
+        conditions = result.conditions[0, :score_a + score_b].tolist()
+
+        rounds = []
+        running = [0, 0]
+        for number, (winner, condition) in enumerate(zip(winners, conditions), start=1):
+            running[winner] += 1
+            rounds.append({
+                'round': number,
+                'winner': 'A' if winner == TEAM_A else 'B',
+                'condition': WIN_CONDITIONS[condition],
+                'score': f'{running[0]}-{running[1]}',
+            })
+
+        kills, deaths = result.kills[0].tolist(), result.deaths[0].tolist()
+        maps.append({
+            'number': len(maps) + 1,
+            'score_a': score_a,
+            'score_b': score_b,
+            'winner': 'A' if score_a > score_b else 'B',
+            'rounds': rounds,
+            'players': {
+                side: [
+                    {'id': player['id'], 'kills': kills[index][slot], 'deaths': deaths[index][slot]}
+                    for slot, player in enumerate(snapshot[side])
+                ]
+                for index, side in enumerate(('team_a', 'team_b'))
+            },
+        })
+        wins[0 if score_a > score_b else 1] += 1
+
+    return {
+        'seed': seed,
+        'engine_version': ENGINE_VERSION,
+        'score_a': wins[0],
+        'score_b': wins[1],
+        'winner': 'A' if wins[0] > wins[1] else 'B',
+        'maps': maps,
+    }
+
+
+def is_replayable(match):
+    """A partida tem seed e titulares gravados por esta versão do motor."""
+    return match.seed is not None and bool(match.roster_snapshot) and match.engine_version == ENGINE_VERSION
+
+
+def match_replay(match):
+    """
+    Replay da partida (do LRU ou regenerado), ou None se ela não tem seed ou foi
+    gravada por outra versão do motor. O dict retornado é compartilhado: não alterar.
+    """
+    if not is_replayable(match):
+        return None
+    key = _cache_key(match.seed, match.format, match.roster_snapshot)
+    return REPLAY_CACHE.get_or_set(key, lambda: simulate_replay(match.seed, match.roster_snapshot, match.format))
+
+
+def pending_match_fields(lineup_a, lineup_b, seed=None):
+    """
+    Campos de Match para uma partida reproduzível ainda não jogada: só seed, versão
+    do motor e titulares, nada é simulado. Os rounds saem pelo SSE ou pela sessão
+    "Next Round", e o placar é gravado no fim da série (results.finish_seeded_match).
+    """
+    return {
+        'seed': new_seed() if seed is None else seed,
+        'engine_version': ENGINE_VERSION,
+        'roster_snapshot': roster_snapshot(lineup_a, lineup_b),
+    }
+
+
+def seeded_match_fields(lineup_a, lineup_b, series_format, seed=None):
+    """
+    Campos de Match para uma partida reproduzível, com placar e vencedor já
+    resolvidos pelo replay (o replay entra no LRU para a primeira visualização).
+    """
+    fields = pending_match_fields(lineup_a, lineup_b, seed)
+    replay = simulate_replay(fields['seed'], fields['roster_snapshot'], series_format)
+    REPLAY_CACHE.set(_cache_key(fields['seed'], series_format, fields['roster_snapshot']), replay)
+    return {**fields, 'score_a': replay['score_a'], 'score_b': replay['score_b']}, replay
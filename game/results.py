@@ -0,0 +1,434 @@
+"""
+Gravação em lote de séries finalizadas (placar, mapas, histórico de rounds e stats),
+vindas do front-end (ingest_matches) ou do motor server-side (simulate_and_store).
+
+Formato de cada partida (ver results_api e match_result_save):
+    {
+        "match_id": 12,              # opcional: completa o Match criado por simulate_match
+        "team_a": 1, "team_b": 2,    # obrigatórios sem match_id
+        "format": "BO3",
+        "championship": 3,           # opcional
+        "maps": [
+            {
+                "map": 4, "map_name": "Ascent",   # um dos dois
+                "score_a": 13, "score_b": 9,
+                "rounds": [{"round": 1, "winner": "A", "condition": "elimination"}, ...],
+                "players": [{"player": 7, "kills": 20, "deaths": 12, "assists": 4, "fk": 3, "fd": 1}, ...]
+            }
+        ]
+    }
+
+rounds e players são opcionais; rounds, quando vem, tem um round por ponto do
+placar (números 1..n, vencedores batendo com score_a/score_b). Contagens têm
+limites por mapa (MAX_MAP_ROUNDS, MAX_MAP_PLAYERS, MAX_STAT).
+
+Match.score_a/score_b passam a ser o placar de mapas da série; o placar de
+rounds de cada mapa fica em MatchMap, cada round em RoundResult e as stats de
+cada jogador por mapa em PlayerMatchStat.
+"""
+
+from itertools import islice
+
+from django.db import transaction
+
+from .engine.constants import (
+    LINEUP_SIZE, OVERTIME_MARGIN, REGULATION_ROUNDS, ROUNDS_TO_WIN, WIN_CONDITIONS, WINS_NEEDED,
+)
+from .models import Championship, Map, Match, MatchMap, Player, PlayerMatchStat, RoundResult, Team
+
+# Limite de partidas por requisição
+MAX_BATCH = 1000
+# Limites por mapa (a API é aberta sem RESULTS_API_TOKEN): rounds jogados,
+# jogadores com stats e valor de cada stat (cabe no PositiveSmallIntegerField)
+MAX_MAP_ROUNDS = 120
+MAX_MAP_PLAYERS = 4 * LINEUP_SIZE
+MAX_STAT = MAX_MAP_ROUNDS * LINEUP_SIZE
+MAX_ID = 2**63 - 1
+# Linhas por bulk_create de RoundResult/PlayerMatchStat
+BULK_CHUNK_SIZE = 5000
+STAT_FIELDS = ('kills', 'deaths', 'assists', 'fk', 'fd')
+
+
+class IngestError(ValueError):
+    pass
+
+
+def bulk_create_chunked(model, objs, chunk_size=BULK_CHUNK_SIZE):
+    """bulk_create de um iterável em blocos, sem montar todos os objetos de uma vez."""
+    objs = iter(objs)
+    total = 0
+    while chunk := list(islice(objs, chunk_size)):
+        model.objects.bulk_create(chunk, batch_size=chunk_size)
+        total += len(chunk)
+    return total
+
+
+def _running_score(rounds):
+    """(round, placar A, placar B) depois de cada round."""
+    score = {'A': 0, 'B': 0}
+    for entry in rounds:
+        score[entry['winner']] += 1
+        yield entry, score['A'], score['B']
+
+
+def _int(value, field, index, low=0, high=MAX_ID):
+    """Inteiro entre low e high (inclusive)."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise IngestError(f'matches[{index}]: {field} must be an integer')
+    if not low <= value <= high:
+        raise IngestError(f'matches[{index}]: {field} must be between {low} and {high}')
+    return value
+
+
+def map_winner(score_a, score_b):
+    """'A'/'B' para um placar final válido de mapa, ou None se o mapa não terminou."""
+    high, low = max(score_a, score_b), min(score_a, score_b)
+    if low < 0:
+        return None
+    if high + low <= REGULATION_ROUNDS:
+        finished = high == ROUNDS_TO_WIN
+    else:
+        finished = low >= ROUNDS_TO_WIN - 1 and high - low == OVERTIME_MARGIN
+    if not finished:
+        return None
+    return 'A' if score_a > score_b else 'B'
+
+
+def _parse_rounds(rounds, index, number, score_a, score_b):
+    """Rounds do mapa (opcionais); quando vêm, precisam bater com o placar: 1..n, sem repetir."""
+    if not isinstance(rounds, list):
+        raise IngestError(f'matches[{index}].maps[{number}]: rounds must be a list')
+    if not rounds:
+        return []
+    if len(rounds) != score_a + score_b:
+        raise IngestError(f'matches[{index}].maps[{number}]: {len(rounds)} rounds for a {score_a}-{score_b} map')
+    parsed = []
+    for entry in rounds:
+        if not isinstance(entry, dict) or entry.get('winner') not in ('A', 'B'):
+            raise IngestError(f'matches[{index}].maps[{number}]: each round needs winner "A" or "B"')
+        condition = entry.get('condition')
+        if condition is not None and condition not in WIN_CONDITIONS:
+            raise IngestError(f'matches[{index}].maps[{number}]: unknown condition {condition!r}')
+        parsed.append({
+            'round': _int(entry.get('round', len(parsed) + 1), 'round', index, 1, len(rounds)),
+            'winner': entry['winner'],
+            'condition': condition,
+        })
+    if len({entry['round'] for entry in parsed}) != len(parsed):
+        raise IngestError(f'matches[{index}].maps[{number}]: round numbers must not repeat')
+    if sum(entry['winner'] == 'A' for entry in parsed) != score_a:
+        raise IngestError(f'matches[{index}].maps[{number}]: round winners do not match {score_a}-{score_b}')
+    # Gravados na ordem do round (o placar parcial de RoundResult depende disso)
+    return sorted(parsed, key=lambda entry: entry['round'])
+
+
+def _parse_players(players, index, number):
+    if not isinstance(players, list):
+        raise IngestError(f'matches[{index}].maps[{number}]: players must be a list')
+    if len(players) > MAX_MAP_PLAYERS:
+        raise IngestError(f'matches[{index}].maps[{number}]: at most {MAX_MAP_PLAYERS} players per map')
+    parsed = []
+    for entry in players:
+        if not isinstance(entry, dict):
+            raise IngestError(f'matches[{index}].maps[{number}]: invalid player entry')
+        stats = {'player': _int(entry.get('player'), 'player', index, 1)}
+        for field in STAT_FIELDS:
+            stats[field] = _int(entry.get(field, 0), field, index, 0, MAX_STAT)
+        parsed.append(stats)
+    if len({stats['player'] for stats in parsed}) != len(parsed):
+        raise IngestError(f'matches[{index}].maps[{number}]: each player can appear only once')
+    return parsed
+
+
+def parse_match(entry, index):
+    """Valida a estrutura de uma partida (sem tocar no banco)."""
+    if not isinstance(entry, dict):
+        raise IngestError(f'matches[{index}]: expected an object')
+
+    match_id = entry.get('match_id')
+    parsed = {
+        'match_id': _int(match_id, 'match_id', index) if match_id is not None else None,
+        'team_a': _int(entry['team_a'], 'team_a', index) if entry.get('team_a') is not None else None,
+        'team_b': _int(entry['team_b'], 'team_b', index) if entry.get('team_b') is not None else None,
+        'format': str(entry.get('format', 'BO1')).upper(),
+        'championship': _int(entry['championship'], 'championship', index) if entry.get('championship') else None,
+        'maps': [],
+    }
+    if parsed['match_id'] is None and (parsed['team_a'] is None or parsed['team_b'] is None):
+        raise IngestError(f'matches[{index}]: team_a and team_b are required without match_id')
+    if parsed['format'] not in WINS_NEEDED:
+        raise IngestError(f"matches[{index}]: invalid format {parsed['format']}")
+
+    maps = entry.get('maps')
+    if not isinstance(maps, list) or not maps:
+        raise IngestError(f'matches[{index}]: maps must be a non-empty list')
+
+    wins = {'A': 0, 'B': 0}
+    needed = WINS_NEEDED[parsed['format']]
+    for number, map_entry in enumerate(maps, start=1):
+        if not isinstance(map_entry, dict):
+            raise IngestError(f'matches[{index}].maps[{number}]: expected an object')
+        if max(wins.values()) >= needed:
+            raise IngestError(f'matches[{index}]: series was already decided before map {number}')
+        score_a = _int(map_entry.get('score_a'), 'score_a', index, 0, MAX_MAP_ROUNDS)
+        score_b = _int(map_entry.get('score_b'), 'score_b', index, 0, MAX_MAP_ROUNDS)
+        winner = map_winner(score_a, score_b)
+        if winner is None or score_a + score_b > MAX_MAP_ROUNDS:
+            raise IngestError(f'matches[{index}].maps[{number}]: {score_a}-{score_b} is not a final score')
+        wins[winner] += 1
+        map_id = map_entry.get('map')
+        parsed['maps'].append({
+            'number': number,
+            'map': _int(map_id, 'map', index) if map_id is not None else None,
+            'map_name': str(map_entry.get('map_name') or '')[:50],
+            'score_a': score_a,
+            'score_b': score_b,
+            'winner': winner,
+            'rounds': _parse_rounds(map_entry.get('rounds', []), index, number, score_a, score_b),
+            'players': _parse_players(map_entry.get('players', []), index, number),
+        })
+
+    if max(wins.values()) < needed:
+        raise IngestError(f"matches[{index}]: {parsed['format']} series is not finished")
+    parsed['maps_a'], parsed['maps_b'] = wins['A'], wins['B']
+    return parsed
+
+
+def ingest_matches(entries):
+    """
+    Valida e grava uma lista de partidas finalizadas numa única transação.
+    Retorna os ids dos Match gravados, na ordem recebida. IngestError em
+    qualquer erro (nada é gravado).
+    """
+    if not isinstance(entries, list) or not entries:
+        raise IngestError('matches must be a non-empty list')
+    if len(entries) > MAX_BATCH:
+        raise IngestError(f'At most {MAX_BATCH} matches per request')
+    parsed = [parse_match(entry, index) for index, entry in enumerate(entries)]
+
+    match_ids = [p['match_id'] for p in parsed if p['match_id']]
+    if len(match_ids) != len(set(match_ids)):
+        raise IngestError('The same match_id appears more than once')
+
+    # Uma query por tabela para resolver todas as referências do lote
+    existing = Match.objects.in_bulk(match_ids)
+    for index, p in enumerate(parsed):
+        if p['match_id'] is None:
+            continue
+        match = existing.get(p['match_id'])
+        if match is None:
+            raise IngestError(f"matches[{index}]: match {p['match_id']} not found")
+        if match.is_finished:
+            raise IngestError(f"matches[{index}]: match {p['match_id']} already has a result")
+        if match.seed is not None:
+            raise IngestError(f"matches[{index}]: match {p['match_id']} is simulated on the server")
+        p['team_a'] = p['team_a'] or match.team_a_id
+        p['team_b'] = p['team_b'] or match.team_b_id
+        if (p['team_a'], p['team_b']) != (match.team_a_id, match.team_b_id):
+            raise IngestError(f"matches[{index}]: teams do not match match {p['match_id']}")
+
+    teams = Team.objects.in_bulk({t for p in parsed for t in (p['team_a'], p['team_b'])})
+    maps = Map.objects.in_bulk({m['map'] for p in parsed for m in p['maps'] if m['map']})
+    championships = Championship.objects.in_bulk({p['championship'] for p in parsed if p['championship']})
+    player_ids = {s['player'] for p in parsed for m in p['maps'] for s in m['players']}
+    players = dict(Player.objects.filter(id__in=player_ids).values_list('id', 'team_id'))
+
+    for index, p in enumerate(parsed):
+        if p['team_a'] not in teams or p['team_b'] not in teams:
+            raise IngestError(f'matches[{index}]: team not found')
+        if p['championship'] and p['championship'] not in championships:
+            raise IngestError(f"matches[{index}]: championship {p['championship']} not found")
+        for m in p['maps']:
+            if m['map'] and m['map'] not in maps:
+                raise IngestError(f"matches[{index}]: map {m['map']} not found")
+            m['map_name'] = m['map_name'] or (maps[m['map']].name if m['map'] else 'Unknown')
+            for stats in m['players']:
+                if players.get(stats['player']) not in (p['team_a'], p['team_b']):
+                    raise IngestError(f"matches[{index}]: player {stats['player']} is not in this match")
+
+    with transaction.atomic():
+        matches = []
+        for p in parsed:
+            match = existing[p['match_id']] if p['match_id'] else Match(team_a_id=p['team_a'], team_b_id=p['team_b'])
+            match.format = p['format']
+            match.score_a, match.score_b = p['maps_a'], p['maps_b']
+            match.winner_id = p['team_a'] if p['maps_a'] > p['maps_b'] else p['team_b']
+            first_map = p['maps'][0]
+            match.map_id, match.map_name = first_map['map'], first_map['map_name']
+            match.championship_id = p['championship'] or match.championship_id
+            matches.append(match)
+
+        completed = [m for m in matches if m.pk is not None]
+        Match.objects.bulk_create([m for m in matches if m.pk is None])
+        Match.objects.bulk_update(
+            completed, ['format', 'score_a', 'score_b', 'winner', 'map', 'map_name', 'championship']
+        )
+
+        MatchMap.objects.bulk_create([
+            MatchMap(
+                match=match,
+                number=m['number'],
+                map_id=m['map'],
+                map_name=m['map_name'],
+                score_a=m['score_a'],
+                score_b=m['score_b'],
+                winner_id=p['team_a'] if m['winner'] == 'A' else p['team_b'],
+            )
+            for match, p in zip(matches, parsed) for m in p['maps']
+        ], batch_size=500)
+
+        bulk_create_chunked(RoundResult, (
+            RoundResult(
+                match_id=match.pk, map_number=m['number'], round=entry['round'], winner=entry['winner'],
+                condition=entry['condition'] or '', score_a=score_a, score_b=score_b,
+            )
+            for match, p in zip(matches, parsed) for m in p['maps']
+            for entry, score_a, score_b in _running_score(m['rounds'])
+        ))
+        bulk_create_chunked(PlayerMatchStat, (
+            PlayerMatchStat(
+                match_id=match.pk, map_number=m['number'], player_id=stats['player'],
+                team_id=players[stats['player']], **{field: stats[field] for field in STAT_FIELDS},
+            )
+            for match, p in zip(matches, parsed) for m in p['maps'] for stats in m['players']
+        ))
+
+    # bulk_* não dispara post_save: limpa as páginas em cache das partidas completadas
+    from .views import invalidate_match_pages
+    invalidate_match_pages([match.pk for match in completed])
+    return [match.pk for match in matches]
+
+
+def finish_seeded_match(match):
+    """
+    Grava placar e vencedor de uma partida com seed a partir do replay do servidor
+    (o corpo enviado pelo navegador é ignorado). IngestError se ela já tem resultado.
+    """
+    from .replay import match_replay
+
+    replay = match_replay(match)
+    if replay is None:
+        raise IngestError(f'Match {match.id} has no server-side simulation')
+    winner_id = match.team_a_id if replay['winner'] == 'A' else match.team_b_id
+    # Só quem encontra a partida sem vencedor grava (dois navegadores no fim da série)
+    updated = Match.objects.filter(id=match.id, winner__isnull=True).update(
+        score_a=replay['score_a'], score_b=replay['score_b'], winner_id=winner_id,
+    )
+    if not updated:
+        raise IngestError(f'Match {match.id} already has a result')
+    return match.id
+
+
+def simulate_and_store(team_a, team_b, lineup_a, lineup_b, series_format='BO1', n=1, seed=None,
+                       selected_map=None, championship=None, replay_only=False):
+    """
+    Simula n séries no motor server-side e grava Match, MatchMap, RoundResult e
+    PlayerMatchStat (bulk_create em blocos). Retorna os ids dos Match criados.
+    lineup_a/lineup_b: os 5 titulares (Player) de cada time.
+    replay_only: grava só o Match com seed/versão/titulares; rounds e stats são
+        regenerados sob demanda (game/replay.py).
+    """
+    import numpy as np
+
+    from .engine import lineup_attributes, round_win_probability, simulate_maps
+    from .engine.match import TEAM_A
+
+    if series_format not in WINS_NEEDED:
+        raise IngestError(f'Invalid format: {series_format}')
+    wins_needed = WINS_NEEDED[series_format]
+    rng = np.random.default_rng(seed)
+    map_name = selected_map.name if selected_map else 'Unknown'
+
+    if replay_only:
+        from .engine import ENGINE_VERSION
+        from .replay import roster_snapshot, simulate_replay
+
+        snapshot = roster_snapshot(lineup_a, lineup_b)
+        matches = []
+        for match_seed in rng.integers(0, 2**63 - 1, size=n).tolist():
+            replay = simulate_replay(match_seed, snapshot, series_format)
+            matches.append(Match(
+                team_a=team_a, team_b=team_b, format=series_format,
+                score_a=replay['score_a'], score_b=replay['score_b'],
+                winner=team_a if replay['winner'] == 'A' else team_b,
+                map=selected_map, map_name=map_name, championship=championship,
+                seed=match_seed, engine_version=ENGINE_VERSION, roster_snapshot=snapshot,
+            ))
+        Match.objects.bulk_create(matches, batch_size=500)
+        return [match.pk for match in matches]
+
+    p = round_win_probability(lineup_attributes(lineup_a), lineup_attributes(lineup_b))
+
+    # Mapa a mapa, só para as séries ainda em aberto (como simulate_series, mas com histórico)
+    maps_won = np.zeros((n, 2), dtype=np.int16)
+    played = []
+    pending = np.arange(n)
+    for _ in range(2 * wins_needed - 1):
+        result = simulate_maps(np.full(len(pending), p), rng=rng, history=True)
+        played.append((pending, result))
+        maps_won[pending, 0] += result.winner_a
+        maps_won[pending, 1] += ~result.winner_a
+        pending = pending[(maps_won[pending] < wins_needed).all(axis=1)]
+        if not pending.size:
+            break
+
+    player_ids = [[player.id for player in lineup] for lineup in (lineup_a, lineup_b)]
+    team_ids = (team_a.id, team_b.id)
+
+    def maps():
+        for number, (rows, result) in enumerate(played, start=1):
+            yield number, rows.tolist(), result
+
+    with transaction.atomic():
+        matches = [
+            Match(
+                team_a=team_a, team_b=team_b, format=series_format,
+                score_a=int(won_a), score_b=int(won_b), winner=team_a if won_a > won_b else team_b,
+                map=selected_map, map_name=map_name, championship=championship,
+            )
+            for won_a, won_b in maps_won.tolist()
+        ]
+        Match.objects.bulk_create(matches, batch_size=500)
+        match_ids = [match.pk for match in matches]
+
+        bulk_create_chunked(MatchMap, (
+            MatchMap(
+                match_id=match_ids[row], number=number, map=selected_map, map_name=map_name,
+                score_a=score_a, score_b=score_b, winner_id=team_ids[0] if score_a > score_b else team_ids[1],
+            )
+            for number, rows, result in maps()
+            for row, score_a, score_b in zip(rows, result.score_a.tolist(), result.score_b.tolist())
+        ))
+
+        def rounds():
+            for number, rows, result in maps():
+                a_won = result.round_winners == TEAM_A
+                cum_a = np.cumsum(a_won, axis=1).tolist()
+                cum_b = np.cumsum(~a_won & (result.round_winners >= 0), axis=1).tolist()
+                conditions = result.conditions.tolist()
+                for k, (row, total) in enumerate(zip(rows, result.rounds.tolist())):
+                    for r in range(total):
+                        yield RoundResult(
+                            match_id=match_ids[row], map_number=number, round=r + 1,
+                            winner='A' if cum_a[k][r] > (cum_a[k][r - 1] if r else 0) else 'B',
+                            condition=WIN_CONDITIONS[conditions[k][r]],
+                            score_a=cum_a[k][r], score_b=cum_b[k][r],
+                        )
+
+        def stats():
+            for number, rows, result in maps():
+                kills, deaths = result.kills.tolist(), result.deaths.tolist()
+                for k, row in enumerate(rows):
+                    for side in (0, 1):
+                        for slot, player_id in enumerate(player_ids[side]):
+                            yield PlayerMatchStat(
+                                match_id=match_ids[row], map_number=number, player_id=player_id,
+                                team_id=team_ids[side], kills=kills[k][side][slot], deaths=deaths[k][side][slot],
+                            )
+
+        bulk_create_chunked(RoundResult, rounds())
+        bulk_create_chunked(PlayerMatchStat, stats())
+
+    return match_ids
@@ -0,0 +1,77 @@
+"""
+Invalidação de caches: payload de times do Quick Match (Team/Player) e
+páginas de resultado de partidas finalizadas (Match; todas quando um time,
+jogador, mapa ou campeonato muda, ver teams_payload.invalidate). Também gera
+as variantes WebP das imagens enviadas (game/images.py), depois do commit e
+só quando o arquivo muda.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import images, teams_payload
+from .models import Championship, Map, Match, Player, Team
+
+IMAGE_FIELDS = {Team: 'logo', Player: 'photo', Championship: 'logo', Map: 'minimap'}
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_teams_payload(sender, **kwargs):
+    teams_payload.invalidate()
+
+
+@receiver(post_save, sender=Map)
+@receiver(post_delete, sender=Map)
+@receiver(post_save, sender=Championship)
+@receiver(post_delete, sender=Championship)
+def invalidate_all_match_pages(sender, **kwargs):
+    from . import views
+    views.invalidate_all_match_pages()
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def invalidate_match_page(sender, instance, **kwargs):
+    from .views import invalidate_match_pages
+    invalidate_match_pages([instance.pk])
+
+
+@receiver(pre_save, sender=Team)
+@receiver(pre_save, sender=Player)
+@receiver(pre_save, sender=Championship)
+@receiver(pre_save, sender=Map)
+def track_image_upload(sender, instance, **kwargs):
+    # Antes do pre_save do campo: um upload novo ainda não foi gravado no storage.
+    # Nome trocado à mão (logo = 'teams/x.png') fica para o build_image_variants
+    instance._image_uploaded = not getattr(instance, IMAGE_FIELDS[sender])._committed
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_save, sender=Championship)
+@receiver(post_save, sender=Map)
+def generate_image_variants(sender, instance, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS[sender]
+    if update_fields is not None and field not in update_fields:
+        return
+    name = getattr(instance, field).name
+    if not name or not instance.__dict__.pop('_image_uploaded', False):
+        return
+    # Pillow fora da transação (e só se ela for confirmada)
+    transaction.on_commit(lambda: build_variants(name))
+
+
+def build_variants(name):
+    if images.has_variants(name):
+        return
+    try:
+        images.generate_variants(name)
+    except (OSError, ValueError):
+        # Imagem ilegível ou ausente: a página continua usando o original
+        return
+    # Páginas em cache ainda apontam só para o original
+    teams_payload.invalidate()
@@ -0,0 +1,100 @@
+"""
+Storage de mídia endereçado por conteúdo.
+
+O arquivo é salvo como <pasta do upload_to>/<sha256[:32]><extensão>: o mesmo logo
+enviado duas vezes vira um único arquivo e o nome só muda quando o conteúdo muda
+(bom para cache de navegador/CDN).
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_LENGTH = 32
+FILE_PERMISSIONS = 0o644
+
+
+def file_digest(content):
+    """sha256 de um File/arquivo aberto, lido em blocos."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    chunks = content.chunks() if hasattr(content, 'chunks') else iter(lambda: content.read(64 * 1024), b'')
+    for chunk in chunks:
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def write_atomic(path, write, permissions=FILE_PERMISSIONS):
+    """
+    Grava via write(arquivo) num temporário na mesma pasta e move para path:
+    quem lê nunca vê um arquivo pela metade.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            write(tmp)
+        # mkstemp cria com 0600; o servidor web precisa ler
+        os.chmod(tmp_path, permissions)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def content_name(name, digest):
+    """Nome endereçado por conteúdo: mesma pasta e extensão de name, arquivo = hash."""
+    directory, filename = os.path.split(name)
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, digest[:HASH_LENGTH] + extension).replace('\\', '/')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage que nomeia os arquivos pelo hash e reaproveita blobs existentes."""
+
+    def hashed_name(self, name, content):
+        return content_name(name, file_digest(content))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # O nome já é único pelo conteúdo: nunca adiciona sufixo aleatório
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+
+        def write(tmp):
+            for chunk in content.chunks():
+                tmp.write(chunk)
+
+        # Dois uploads simultâneos do mesmo arquivo não colidem
+        write_atomic(self.path(name), write, self.file_permissions_mode or FILE_PERMISSIONS)
+        return name
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def media_storage():
+    """Storage dos ImageFields (callable para não acoplar as migrations à instância)."""
+    return content_addressed_storage
@@ -0,0 +1,100 @@
+"""
+Payload de times/jogadores do Quick Match, montado uma vez e guardado no cache.
+
+A chave do payload inclui uma versão (token aleatório guardado no próprio cache)
+que é trocada sempre que uma linha de Team ou Player muda (ver game/signals.py e
+os bulk_* de PlayerQuerySet). Em regime, a página e o endpoint JSON não fazem
+nenhuma query de times. A troca feita por um comando de manage.py só chega aos
+workers com Redis (CACHE_BACKEND em settings); com o padrão locmem cada processo
+só vê as próprias trocas.
+"""
+
+import json
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+
+VERSION_KEY = 'teams_payload:version'
+PAYLOAD_KEY = 'teams_payload:{version}'
+# O payload nunca fica velho (a versão muda junto com os dados); o timeout só limpa versões antigas
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+
+def payload_version():
+    return cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def invalidate():
+    """
+    Troca a versão: o próximo acesso remonta o payload. As páginas de partidas
+    mostram os mesmos nomes, logos e elencos, então a geração delas também muda
+    (cobre os bulk_* e comandos que não disparam sinais).
+    """
+    from .views import invalidate_all_match_pages
+
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    invalidate_all_match_pages()
+
+
+def etag():
+    return f'"teams-{payload_version()}"'
+
+
+def build_payload():
+    """Monta o payload com 2 queries (times + jogadores via prefetch)."""
+    from .atlas import load_manifest, sprite_teams
+    from .models import Team
+    from .lineups import lineup_prefetch
+
+    queryset = list(Team.objects.prefetch_related(lineup_prefetch()))  # Já ordenado por região
+    atlas = load_manifest()
+    in_atlas = sprite_teams(atlas, queryset)
+
+    teams = []
+    teams_by_region = defaultdict(list)
+    for team in queryset:
+        logo = team.logo.url if team.logo else None
+        logo_srcset = team.logo_srcset
+        teams.append({
+            "id": team.id,
+            "name": team.name,
+            "logo": logo,
+            "logo_srcset": logo_srcset,
+            "sprite": str(team.id) in in_atlas,
+            "overall": team.overall,
+            "players": [
+                {
+                    "name": player.name,
+                    "role": player.role,
+                    "rating": player.overall,
+                    "photo": player.photo.url if player.photo else None,
+                    "photo_srcset": player.photo_srcset,
+                } for player in team.players.all()
+            ]
+        })
+        teams_by_region[team.region].append({
+            "id": team.id, "name": team.name, "logo": logo, "logo_srcset": logo_srcset,
+            "sprite": str(team.id) in in_atlas,
+        })
+
+    return {
+        'json': json.dumps({"teams": teams}),
+        'teams_by_region': dict(teams_by_region),
+        'logo_atlas_css': atlas['css'] if atlas else None,
+    }
+
+
+def get_payload():
+    """
+    Retorna (versão, payload); payload['json'] é o corpo do endpoint e
+    payload['teams_by_region'] alimenta os dropdowns da página (com o atlas de
+    logos em payload['logo_atlas_css'], se já foi gerado).
+    """
+    version = payload_version()
+    key = PAYLOAD_KEY.format(version=version)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_payload()
+        cache.set(key, payload, timeout=PAYLOAD_TIMEOUT)
+    return version, payload
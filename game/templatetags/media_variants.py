@@ -0,0 +1,25 @@
+"""
+Filtros para as variantes WebP das imagens (game/images.py).
+
+    {% load media_variants %}
+    <img src="{{ team.logo }}" srcset="{{ team.logo|srcset }}" sizes="20px">
+    <img src="{{ player.photo|variant:64 }}">
+
+Aceitam um FieldFile, um nome de arquivo ou a URL de mídia (como nos dicts das views).
+"""
+
+from django import template
+
+from game import images
+
+register = template.Library()
+
+
+@register.filter
+def srcset(value):
+    return images.srcset(value)
+
+
+@register.filter
+def variant(value, width):
+    return images.variant_url(value, int(width))
@@ -1,3 +1,1282 @@
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from django.urls import reverse
+
+from . import images
+from .atlas import build_atlas, load_manifest, sprite_teams
+from .balance_sweep import grid_points, point_key, run_sweep
+from .broadcast import CHANNELS, get_channel
+from .caching import LRUCache
+from .engine import (
+    lineup_attributes, lineup_roles, round_win_probability, simulate_maps, simulate_maps_economy, simulate_tournament,
+)
+from .engine.balance import DEFAULT_BALANCE, Balance, with_params
+from .engine.constants import OVERTIME_MARGIN, REGULATION_ROUNDS, ROUNDS_TO_WIN
+from .engine.economy import ECO, FORCE, FULL, loadout
+from .head_to_head import build_matrix, load_matrix, matchup
+from .live import series_events
+from .management.commands.benchmark import Command as BenchmarkCommand
+from .management.commands.dedupe_media import scan_media
+from .match_session import SESSION_KEY, MatchSession, SessionsUnavailable, advance_session, sessions_available
+from .models import Map, Match, MatchMap, Player, PlayerMatchStat, RoundResult, Team
+from .odds import ODDS_CACHE
+from .replay import REPLAY_CACHE, match_replay, seeded_match_fields, simulate_replay
+from .results import simulate_and_store
+from .storage import ContentAddressedStorage, content_name
+from .timing import SLOW_REQUESTS
+from .views import _session_viewer
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+SETTINGS_ENV = ('VERCEL', 'DATABASE_URL', 'DB_CONN_MAX_AGE', 'DB_POOL', 'SQLITE_MODE', 'CACHE_URL', 'REDIS_URL',
+                'CACHE_BACKEND', 'VALSIM_LEAN')
+
+ROLES = ('DUELIST', 'INITIATOR', 'CONTROLLER', 'SENTINEL', 'FLEX')
+
+
+def load_settings(**env):
+    """Módulo de settings avaliado de novo com as variáveis de ambiente dadas."""
+    with patch.dict(os.environ):
+        for name in SETTINGS_ENV:
+            os.environ.pop(name, None)
+        os.environ.update(env)
+        return runpy.run_path(os.path.join(settings.BASE_DIR, 'valsim', 'settings.py'))
+
+
+def make_snapshot():
+    """roster_snapshot de dois times fictícios (ids 1-10), sem banco."""
+    return {
+        side: [
+            {'id': offset + slot + 1, 'name': f'P{offset + slot + 1}', 'role': role,
+             'aim': 10 + slot + bonus, 'gamesense': 12, 'support': 11, 'clutch': 9 + bonus, 'mental': 10}
+            for slot, role in enumerate(ROLES)
+        ]
+        for side, offset, bonus in (('team_a', 0, 2), ('team_b', 5, 0))
+    }
+
+
+def make_match(team_a, team_b, series_format='BO1', seed=3):
+    """Partida reproduzível (seed + titulares) entre os dois times."""
+    fields, replay = seeded_match_fields(
+        team_a.players.order_by('id'), team_b.players.order_by('id'), series_format, seed=seed,
+    )
+    return Match.objects.create(
+        team_a=team_a, team_b=team_b, winner=team_a if replay['winner'] == 'A' else team_b,
+        format=series_format, map_name='Ascent', **fields,
+    )
+
+
+def make_png(color, size=(300, 200)):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='logo.png')
+
+
+def make_team(name, aim):
+    team = Team.objects.create(name=name, short_name=name[:3].upper())
+    Player.objects.bulk_create([
+        Player(name=f'{name} {slot}', team=team, role=role, aim=aim, gamesense=aim, support=aim, clutch=aim,
+               mental=aim)
+        for slot, role in enumerate(ROLES)
+    ])
+    return team
+
+
+class EngineTests(SimpleTestCase):
+    def test_same_seed_same_maps(self):
+        first = simulate_maps(0.55, n=200, rng=42, history=True)
+        second = simulate_maps(0.55, n=200, rng=42, history=True)
+        for field in ('score_a', 'score_b', 'kills', 'deaths', 'round_winners', 'conditions'):
+            np.testing.assert_array_equal(getattr(first, field), getattr(second, field), err_msg=field)
+
+    def test_scores_are_final(self):
+        result = simulate_maps(0.5, n=2000, rng=1)
+        high = np.maximum(result.score_a, result.score_b)
+        low = np.minimum(result.score_a, result.score_b)
+        regulation = high + low <= REGULATION_ROUNDS
+        self.assertTrue(np.all(high[regulation] == ROUNDS_TO_WIN))
+        self.assertTrue(np.all(high[~regulation] - low[~regulation] == OVERTIME_MARGIN))
+        self.assertTrue(np.all(low[~regulation] >= ROUNDS_TO_WIN - 1))
+
+    def test_kills_match_opponent_deaths(self):
+        result = simulate_maps(0.6, n=500, rng=2)
+        np.testing.assert_array_equal(result.kills.sum(axis=2), result.deaths[:, ::-1].sum(axis=2))
+        self.assertTrue(np.all(result.deaths.max(axis=2) <= result.rounds[:, None]))
+
+    def test_stronger_lineup_wins_more(self):
+        strong = lineup_attributes(make_snapshot()['team_a'])
+        weak = lineup_attributes(make_snapshot()['team_b'])
+        p = round_win_probability(strong, weak)
+        self.assertGreater(p, 0.5)
+        self.assertGreater(simulate_maps(p, n=2000, rng=3).winner_a.mean(), 0.5)
+
+
+class EconomyEngineTests(SimpleTestCase):
+    def setUp(self):
+        snapshot = make_snapshot()
+        self.attributes = [lineup_attributes(snapshot[side]) for side in ('team_a', 'team_b')]
+        self.roles = [lineup_roles(snapshot[side]) for side in ('team_a', 'team_b')]
+
+    def simulate(self, **kwargs):
+        return simulate_maps_economy(*self.attributes, *self.roles, **kwargs)
+
+    def test_same_seed_same_maps(self):
+        for balance in (None, Balance()):
+            first = self.simulate(n=200, rng=42, history=True, balance=balance)
+            second = self.simulate(n=200, rng=42, history=True, balance=balance)
+            for field in ('score_a', 'score_b', 'kills', 'deaths', 'round_winners', 'conditions', 'round_events'):
+                np.testing.assert_array_equal(getattr(first, field), getattr(second, field), err_msg=field)
+
+    def test_scores_are_final(self):
+        for balance in (None, Balance()):
+            result = self.simulate(n=2000, rng=1, balance=balance)
+            high = np.maximum(result.score_a, result.score_b)
+            low = np.minimum(result.score_a, result.score_b)
+            regulation = high + low <= REGULATION_ROUNDS
+            self.assertTrue(np.all(high[regulation] == ROUNDS_TO_WIN))
+            self.assertTrue(np.all(high[~regulation] - low[~regulation] == OVERTIME_MARGIN))
+            np.testing.assert_array_equal(result.kills.sum(axis=2), result.deaths[:, ::-1].sum(axis=2))
+
+    def test_shared_lineup_equals_batched_lineups(self):
+        """(5, 4) com n é o mesmo lote que as escalações repetidas (lote, 5, 4)."""
+        shared = self.simulate(n=300, rng=5, history=True)
+        batched = simulate_maps_economy(
+            *(np.repeat(array[None], 300, axis=0) for array in (*self.attributes, *self.roles)), rng=5, history=True,
+        )
+        for field in ('score_a', 'score_b', 'kills', 'deaths', 'round_winners', 'conditions', 'round_events'):
+            np.testing.assert_array_equal(getattr(shared, field), getattr(batched, field), err_msg=field)
+
+    def test_stronger_lineup_wins_more(self):
+        self.assertGreater(self.simulate(n=2000, rng=3).winner_a.mean(), 0.5)
+
+    def test_loadouts_follow_economy_js(self):
+        self.assertEqual(loadout('DUELIST', FULL, 3900), ('vandal', 1.0, 3900))
+        self.assertEqual(loadout('CONTROLLER', ECO, 1500), ('sheriff', 0.5, 800))
+        self.assertEqual(loadout('DUELIST', ECO, 1000), ('classic', 0.8, 0))
+        self.assertEqual(loadout('SENTINEL', FORCE, 2900, random=0.9), ('guardian', 0.95, 2650))
+
+
+class BalanceSweepTests(SimpleTestCase):
+    def setUp(self):
+        # Dois confrontos: A x B e B x A
+        snapshot = make_snapshot()
+        attributes = np.stack([lineup_attributes(snapshot['team_a']), lineup_attributes(snapshot['team_b'])])
+        roles = np.stack([lineup_roles(snapshot['team_a']), lineup_roles(snapshot['team_b'])])
+        self.pairings = (attributes, attributes[::-1], roles, roles[::-1])
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_repeated_sweep_is_read_from_cache(self):
+        points = grid_points({'ecoVariance.ecoVsFull': [0.2, 0.3]})
+        with override_settings(BALANCE_SWEEP_CACHE=self.cache_dir):
+            first = run_sweep(points, self.pairings, n=20, workers=1)
+            second = run_sweep(points, self.pairings, n=20, workers=1)
+        self.assertEqual([entry['cached'] for entry in first], [False, False])
+        self.assertEqual([entry['cached'] for entry in second], [True, True])
+        self.assertEqual([entry['metrics'] for entry in first], [entry['metrics'] for entry in second])
+        self.assertNotEqual(first[0]['config'], first[1]['config'])
+
+    def test_cache_key_covers_engine_versions(self):
+        config = with_params({}, DEFAULT_BALANCE)
+        key = point_key(config, self.pairings, 20, 0)
+        self.assertEqual(key, point_key(config, self.pairings, 20, 0))
+        self.assertNotEqual(key, point_key(config, self.pairings, 20, 1))
+        self.assertNotEqual(key, point_key(with_params({'ecoVariance.ecoVsFull': 0.2}), self.pairings, 20, 0))
+        with patch('game.balance_sweep.ECONOMY_VERSION', 'other'):
+            self.assertNotEqual(key, point_key(config, self.pairings, 20, 0))
+        with patch('game.balance_sweep.ENGINE_VERSION', 'other'):
+            self.assertNotEqual(key, point_key(config, self.pairings, 20, 0))
+
+
+class ReplayTests(TestCase):
+    def test_replay_is_stable(self):
+        snapshot = make_snapshot()
+        self.assertEqual(simulate_replay(1234, snapshot, 'BO3'), simulate_replay(1234, snapshot, 'BO3'))
+
+    def test_stored_match_replays_from_seed(self):
+        match = make_match(make_team('Alpha', 14), make_team('Bravo', 12), series_format='BO3', seed=99)
+        REPLAY_CACHE.clear()
+        replay = match_replay(Match.objects.get(pk=match.pk))
+        self.assertEqual((replay['score_a'], replay['score_b']), (match.score_a, match.score_b))
+        self.assertEqual(len(replay['maps']), match.score_a + match.score_b)
+
+    def test_other_engine_version_is_not_replayed(self):
+        match = make_match(make_team('Alpha', 14), make_team('Bravo', 12))
+        Match.objects.filter(pk=match.pk).update(engine_version='old')
+        self.assertIsNone(match_replay(Match.objects.get(pk=match.pk)))
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+
+    def test_cached_none_is_a_hit(self):
+        cache = LRUCache()
+        calls = []
+        for _ in range(2):
+            self.assertIsNone(cache.get_or_set('key', lambda: calls.append(1)))
+        self.assertEqual(len(calls), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OddsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.strong = make_team('Strong', 17)
+        cls.weak = make_team('Weak', 8)
+
+    def setUp(self):
+        ODDS_CACHE.clear()
+        self.addCleanup(ODDS_CACHE.clear)
+
+    def get(self, **params):
+        return self.client.get(reverse('odds_api'), {'team_a': self.strong.id, 'team_b': self.weak.id, **params})
+
+    def test_favourite_and_probabilities(self):
+        odds = self.get(format='BO3', n=500).json()
+        win = odds['win_probability']
+        self.assertGreater(win['team_a'], 0.5)
+        self.assertAlmostEqual(win['team_a'] + win['team_b'], 1, places=3)
+        self.assertAlmostEqual(sum(odds['series_scores'].values()), 1, places=2)
+        self.assertEqual([len(odds['players'][side]) for side in ('team_a', 'team_b')], [5, 5])
+
+    def test_result_is_cached_per_lineup_format_and_n(self):
+        first = self.get(n=300).json()
+        self.assertEqual(self.get(n=300, map=7).json(), first)
+        self.assertEqual(len(ODDS_CACHE), 1)
+        self.get(n=300, format='BO3')
+        self.assertEqual(len(ODDS_CACHE), 2)
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.get(format='BO7').status_code, 400)
+        self.assertEqual(self.get(n='many').status_code, 400)
+        self.assertEqual(self.client.get(reverse('odds_api'), {'team_a': self.strong.id, 'team_b': 0}).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class HeadToHeadTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'head_to_head.npz')
+
+    def lineups(self):
+        return {team.id: list(team.players.order_by('id')) for team in Team.objects.all()}
+
+    def test_incremental_rebuild_only_simulates_changed_teams(self):
+        teams = [make_team(name, aim) for name, aim in (('Alpha', 16), ('Bravo', 12), ('Charlie', 9))]
+        matrix, simulated = build_matrix(self.lineups(), n=200, workers=1, seed=0)
+        self.assertEqual(simulated, 6)
+        win, _ = matchup(teams[0].id, teams[2].id, matrix)
+        self.assertGreater(win, 0.5)
+
+        player = teams[1].players.order_by('id').first()
+        player.aim = 20
+        player.save()
+        rebuilt, simulated = build_matrix(self.lineups(), n=200, previous=matrix, workers=1, seed=0)
+        self.assertEqual(simulated, 4)
+        self.assertEqual(rebuilt['win_prob'][0, 2], matrix['win_prob'][0, 2])
+
+    def test_command_without_full_lineups_saves_empty_matrix(self):
+        Team.objects.create(name='Empty', short_name='EMP')
+        out = StringIO()
+        call_command('build_head_to_head', '--output', self.path, '--workers', '1', stdout=out)
+        self.assertIn('Nenhum time com lineup completa', out.getvalue())
+        matrix = load_matrix(self.path)
+        self.assertEqual(matrix['win_prob'].shape, (0, 0))
+        self.assertIsNone(matchup(1, 2, matrix))
+
+
+class TournamentTests(SimpleTestCase):
+    def field(self, teams):
+        """Times em ordem de seed, do mais forte ao mais fraco."""
+        return np.array([np.full((5, 4), 20.0 - 1.5 * team) for team in range(teams)])
+
+    def test_single_elimination_stages_sum_to_bracket(self):
+        result = simulate_tournament(self.field(8), iterations=3000, seed=0, workers=1)
+        totals = dict(zip(result.stages, result.probabilities.sum(axis=0)))
+        self.assertEqual(totals, {'Quarterfinals': 8, 'Semifinals': 4, 'Final': 2, 'Champion': 1})
+        champion = result.probabilities[:, result.stages.index('Champion')]
+        self.assertEqual(champion.argmax(), 0)
+
+    def test_result_does_not_depend_on_workers_or_blocks(self):
+        kwargs = {'tournament_format': 'double_elimination', 'iterations': 2500, 'seed': 4}
+        single = simulate_tournament(self.field(6), workers=1, **kwargs)
+        pooled = simulate_tournament(self.field(6), workers=2, **kwargs)
+        np.testing.assert_array_equal(single.probabilities, pooled.probabilities)
+        self.assertAlmostEqual(single.probabilities[:, -1].sum(), 1)
+
+    def test_swiss_with_odd_field_gives_byes(self):
+        result = simulate_tournament(self.field(7), 'swiss', iterations=2000, seed=1, workers=1)
+        totals = dict(zip(result.stages, result.probabilities.sum(axis=0)))
+        self.assertGreater(totals['Swiss Bye'], 0)
+        self.assertAlmostEqual(totals['Champion'], 1)
+        self.assertLessEqual(totals['Qualified'], 7)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            simulate_tournament(self.field(1), iterations=10)
+        with self.assertRaises(ValueError):
+            simulate_tournament(self.field(4), 'round_robin', iterations=10)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TeamOverallTests(TestCase):
+    def assertOverallsCurrent(self, *teams):
+        for team in teams:
+            team.refresh_from_db()
+            self.assertEqual(team.overall, team.calculate_team_overall(), team.name)
+
+    def test_bulk_create_sets_team_overall(self):
+        team = make_team('Alpha', 16)
+        self.assertOverallsCurrent(team)
+        self.assertGreater(team.overall, 0)
+
+    def test_bulk_update_team_move_refreshes_both_teams(self):
+        strong, weak = make_team('Strong', 18), make_team('Weak', 6)
+        before = {team.id: Team.objects.get(id=team.id).overall for team in (strong, weak)}
+
+        # Troca um titular de cada lado; os objetos só carregam id e o time novo
+        star = strong.players.order_by('id').first()
+        rookie = weak.players.order_by('id').first()
+        Player.objects.bulk_update(
+            [Player(id=star.id, team_id=weak.id), Player(id=rookie.id, team_id=strong.id)], ['team'],
+        )
+
+        self.assertOverallsCurrent(strong, weak)
+        self.assertLess(strong.overall, before[strong.id])
+        self.assertGreater(weak.overall, before[weak.id])
+
+    def test_bulk_update_move_out_refreshes_origin(self):
+        origin, target = make_team('Origin', 15), make_team('Target', 9)
+        leaving = list(origin.players.all())
+        for player in leaving:
+            player.team_id = target.id
+        Player.objects.bulk_update(leaving, ['team'])
+
+        self.assertOverallsCurrent(origin, target)
+        self.assertEqual(origin.overall, 0)
+
+    def test_queryset_delete_refreshes_teams(self):
+        alpha, bravo = make_team('Alpha', 16), make_team('Bravo', 8)
+        Player.objects.filter(id__in=list(alpha.players.values_list('id', flat=True)[:3])).delete()
+        Player.objects.filter(team=bravo).delete()
+
+        self.assertOverallsCurrent(alpha, bravo)
+        self.assertEqual(bravo.overall, 0)
+        self.assertEqual(alpha.players.count(), 2)
+
+    def test_inactive_players_do_not_count(self):
+        team = make_team('Alpha', 12)
+        star = team.players.order_by('id').first()
+        star.aim = star.gamesense = 20
+        star.save()
+        with_star = Team.objects.get(id=team.id).overall
+        Player.objects.bulk_update([Player(id=star.id, active=False)], ['active'])
+        self.assertOverallsCurrent(team)
+        self.assertLess(team.overall, with_star)
+
+    def test_save_move_refreshes_both_teams(self):
+        origin, target = make_team('Origin', 15), make_team('Target', 9)
+        player = origin.players.order_by('id').first()
+        player.team = target
+        player.save()
+        self.assertOverallsCurrent(origin, target)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TeamsPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_payload_is_cached_and_revalidated(self):
+        make_team('Alpha', 14)
+        response = self.client.get(reverse('teams_api'))
+        etag = response['ETag']
+        self.assertEqual([team['name'] for team in response.json()['teams']], ['Alpha'])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse('teams_api'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+    def test_edits_change_the_version(self):
+        team = make_team('Alpha', 14)
+        etag = self.client.get(reverse('teams_api'))['ETag']
+
+        player = team.players.order_by('id').first()
+        player.name = 'Renamed'
+        player.save()
+        response = self.client.get(reverse('teams_api'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Renamed', [player['name'] for player in response.json()['teams'][0]['players']])
+
+        # bulk_update não dispara sinais, mas também troca a versão
+        etag = response['ETag']
+        Player.objects.bulk_update([Player(id=player.id, aim=20)], ['aim'])
+        self.assertNotEqual(self.client.get(reverse('teams_api'))['ETag'], etag)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MatchPageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+        cls.match = make_match(cls.team_a, cls.team_b)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('match_result', args=[self.match.id])
+
+    def test_page_renders_in_fixed_queries_then_comes_from_cache(self):
+        with self.assertNumQueries(3):
+            first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.content, first.content)
+        self.assertIn('max-age=300', cached['Cache-Control'])
+
+    def test_team_edit_invalidates_page(self):
+        self.client.get(self.url)
+        self.team_a.name = 'Renamed'
+        self.team_a.save()
+        self.assertContains(self.client.get(self.url), 'Renamed')
+
+    def test_bulk_player_edit_invalidates_page(self):
+        self.client.get(self.url)
+        player = self.team_b.players.order_by('id').first()
+        Player.objects.bulk_update([Player(id=player.id, name='Bulk Renamed')], ['name'])
+        self.assertContains(self.client.get(self.url), 'Bulk Renamed')
+
+    def test_map_and_match_edits_invalidate_page(self):
+        self.client.get(self.url)
+        self.match.map = Map.objects.create(name='Lotus')
+        self.match.save()
+        self.assertContains(self.client.get(self.url), 'Lotus')
+        Map.objects.filter(id=self.match.map_id).update(name='Split')
+        Map.objects.get(id=self.match.map_id).save()
+        self.assertContains(self.client.get(self.url), 'Split')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESULTS_API_TOKEN='secret')
+class ResultsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a = make_team('Alpha', 14)
+        cls.team_b = make_team('Bravo', 12)
+
+    def post(self, payload):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(
+            reverse('results_api'), body, content_type='application/json', HTTP_AUTHORIZATION='Bearer secret',
+        )
+
+    def entry(self, **overrides):
+        entry = {
+            'team_a': self.team_a.id, 'team_b': self.team_b.id, 'format': 'BO1',
+            'maps': [{'map_name': 'Ascent', 'score_a': 13, 'score_b': 9}],
+        }
+        entry.update(overrides)
+        return entry
+
+    def test_accepts_valid_series(self):
+        response = self.post({'matches': [self.entry()]})
+        self.assertEqual(response.status_code, 201)
+        match = Match.objects.get(id=response.json()['matches'][0])
+        self.assertEqual((match.score_a, match.score_b), (1, 0))
+
+    def test_rejects_malformed_payloads(self):
+        malformed = {
+            'invalid json': '{"matches": [',
+            'not an object': [[1, 2]],
+            'missing teams': {'maps': [{'score_a': 13, 'score_b': 9}]},
+            'bad format': self.entry(format='BO7'),
+            'no maps': self.entry(maps=[]),
+            'unfinished map': self.entry(maps=[{'score_a': 12, 'score_b': 10}]),
+            'overtime margin': self.entry(maps=[{'score_a': 15, 'score_b': 12}]),
+            'string score': self.entry(maps=[{'score_a': 'x', 'score_b': 9}]),
+            'unfinished series': self.entry(format='BO3'),
+            'rounds vs score': self.entry(maps=[{
+                'score_a': 13, 'score_b': 9, 'rounds': [{'round': 1, 'winner': 'A'}],
+            }]),
+            'bad round winner': self.entry(maps=[{
+                'score_a': 13, 'score_b': 0, 'rounds': [{'winner': 'C'}] * 13,
+            }]),
+            'repeated player': self.entry(maps=[{
+                'score_a': 13, 'score_b': 9, 'players': [{'player': 1, 'kills': 3}, {'player': 1, 'kills': 4}],
+            }]),
+            'negative stat': self.entry(maps=[{
+                'score_a': 13, 'score_b': 9, 'players': [{'player': 1, 'kills': -1}],
+            }]),
+        }
+        for case, payload in malformed.items():
+            with self.subTest(case):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400, response.content)
+                self.assertIn('error', response.json())
+        self.assertFalse(Match.objects.exists())
+        self.assertFalse(MatchMap.objects.exists())
+
+    def test_bad_entry_rolls_back_batch(self):
+        response = self.post({'matches': [self.entry(), self.entry(format='BO7')]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('matches[1]', response.json()['error'])
+        self.assertFalse(Match.objects.exists())
+
+    def test_requires_token(self):
+        body = json.dumps({'matches': [self.entry()]})
+        response = self.client.post(reverse('results_api'), body, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        with override_settings(RESULTS_API_TOKEN=''):
+            self.assertEqual(self.post({'matches': [self.entry()]}).status_code, 403)
+        self.assertFalse(Match.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BrowserResultSaveTests(TestCase):
+    """Gravação pelo navegador (simulation.js): CSRF, só a partida da URL, uma vez."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+        cls.match = Match.objects.create(team_a=cls.team_a, team_b=cls.team_b, format='BO1', map_name='Ascent')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(enforce_csrf_checks=True)
+        self.url = reverse('match_result_save', args=[self.match.id])
+        self.body = json.dumps({'format': 'BO1', 'maps': [{'map_name': 'Ascent', 'score_a': 9, 'score_b': 13}]})
+
+    def post(self, body=None, **headers):
+        return self.client.post(self.url, body or self.body, content_type='application/json', **headers)
+
+    def csrf_token(self):
+        """Token do cookie que a página da partida (mesmo em cache) entrega."""
+        self.client.get(reverse('match_result', args=[self.match.id]))
+        return self.client.cookies['csrftoken'].value
+
+    def test_requires_csrf(self):
+        self.assertEqual(self.post().status_code, 403)
+        self.match.refresh_from_db()
+        self.assertFalse(self.match.is_finished)
+
+    def test_saves_once_with_csrf_token(self):
+        token = self.csrf_token()
+        response = self.post(HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 201)
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.winner_id, self.team_b.id)
+        self.assertEqual(self.post(HTTP_X_CSRFTOKEN=token).status_code, 400)
+
+    def test_only_completes_the_match_in_the_url(self):
+        token = self.csrf_token()
+        other = Match.objects.create(team_a=self.team_a, team_b=self.team_b, format='BO1', map_name='Ascent')
+        body = json.dumps({'match_id': other.id, 'format': 'BO1', 'maps': [{'score_a': 13, 'score_b': 2}]})
+        self.assertEqual(self.post(body, HTTP_X_CSRFTOKEN=token).status_code, 201)
+        other.refresh_from_db()
+        self.assertFalse(other.is_finished)
+        batch = json.dumps({'matches': [{'format': 'BO1', 'maps': [{'score_a': 13, 'score_b': 2}]}]})
+        other_url = reverse('match_result_save', args=[other.id])
+        response = self.client.post(other_url, batch, content_type='application/json', HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StatTablesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+
+    def store(self, **kwargs):
+        lineups = [list(team.players.order_by('id')) for team in (self.team_a, self.team_b)]
+        return simulate_and_store(self.team_a, self.team_b, *lineups, series_format='BO3', n=6, seed=1, **kwargs)
+
+    def test_rounds_and_stats_match_map_scores(self):
+        with patch('game.results.BULK_CHUNK_SIZE', 7):
+            match_ids = self.store()
+        self.assertEqual(len(match_ids), 6)
+        for match_map in MatchMap.objects.filter(match_id__in=match_ids):
+            rounds = list(RoundResult.objects.filter(match_id=match_map.match_id, map_number=match_map.number))
+            self.assertEqual([r.round for r in rounds], list(range(1, match_map.score_a + match_map.score_b + 1)))
+            self.assertEqual((rounds[-1].score_a, rounds[-1].score_b), (match_map.score_a, match_map.score_b))
+            self.assertEqual(sum(r.winner == 'A' for r in rounds), match_map.score_a)
+
+            stats = PlayerMatchStat.objects.filter(match_id=match_map.match_id, map_number=match_map.number)
+            self.assertEqual(stats.count(), 10)
+            totals = {
+                team_id: (sum(s.kills for s in stats if s.team_id == team_id),
+                          sum(s.deaths for s in stats if s.team_id == team_id))
+                for team_id in (self.team_a.id, self.team_b.id)
+            }
+            self.assertEqual(totals[self.team_a.id][0], totals[self.team_b.id][1])
+        for match in Match.objects.filter(id__in=match_ids):
+            self.assertEqual(match.maps.count(), match.score_a + match.score_b)
+            self.assertEqual(max(match.score_a, match.score_b), 2)
+
+    def test_replay_only_stores_just_the_seed(self):
+        match_ids = self.store(replay_only=True)
+        self.assertEqual(Match.objects.filter(id__in=match_ids, seed__isnull=False).count(), 6)
+        self.assertFalse(RoundResult.objects.exists())
+        self.assertFalse(PlayerMatchStat.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PopulateTeamsTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.stats = os.path.join(self.tmp, 'stats.json')
+        with open(self.stats, 'w') as f:
+            json.dump({'zekken': {'aim': 18, 'gamesense': 16, 'support': 12, 'clutch': 14, 'mental': 15}}, f)
+
+    def populate(self, *args):
+        call_command('populate_all_teams', *args, stdout=StringIO())
+
+    def test_rerun_keeps_edited_attributes(self):
+        self.populate('--stats', self.stats)
+        self.assertEqual(Player.objects.get(name='N4RRATE').aim, 10)
+        Player.objects.filter(name__in=['N4RRATE', 'zekken']).update(aim=19, rating=77)
+
+        self.populate('--stats', self.stats)
+        edited = Player.objects.get(name='N4RRATE')
+        self.assertEqual((edited.aim, edited.rating), (19, 77))
+        # Quem está na fonte de stats volta aos valores dela
+        self.assertEqual(Player.objects.get(name='zekken').aim, 18)
+
+    def test_missing_stats_file_keeps_existing_players(self):
+        self.populate('--stats', self.stats)
+        Player.objects.filter(name='zekken').update(gamesense=3)
+        with override_settings(BASE_DIR=self.tmp):
+            self.populate()
+        zekken = Player.objects.get(name='zekken')
+        self.assertEqual((zekken.aim, zekken.gamesense), (18, 3))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ImportAttributesTests(TestCase):
+    def setUp(self):
+        self.team = make_team('Alpha', 10)
+        self.players = list(self.team.players.order_by('id'))
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write_csv(self, text):
+        path = os.path.join(self.tmp, 'attributes.csv')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def import_attributes(self, path, *args):
+        out = StringIO()
+        call_command('import_attributes', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv_updates_valid_rows_and_reports_errors(self):
+        first, second, third = (player.name for player in self.players[:3])
+        path = self.write_csv(
+            'name,aim,clutch\n'
+            f'{first},15,\n'
+            f'{second},21,abc\n'
+            f'{third},12.5,9\n'
+            'Ghost,12,12\n'
+        )
+        errors = os.path.join(self.tmp, 'errors.csv')
+        out = self.import_attributes(path, '--chunk-size', '2', '--errors', errors)
+
+        self.assertIn('4 linhas lidas, 1 jogadores atualizados, 3 erros', out)
+        updated = Player.objects.get(name=first)
+        self.assertEqual((updated.aim, updated.clutch), (15, 10))
+        self.assertEqual(Player.objects.get(name=second).aim, 10)
+        with open(errors) as f:
+            rows = list(csv.reader(f))[1:]
+        self.assertEqual([row[0] for row in rows], ['3', '4', '5'])
+        self.assertIn("aim='21'", rows[0][2])
+        self.assertIn("clutch='abc'", rows[0][2])
+        self.assertEqual(rows[2][2], 'player not found')
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_csv(f'id,mental\n{self.players[0].id},18\n')
+        out = self.import_attributes(path, '--dry-run')
+        self.assertIn('1 jogadores validados (dry-run)', out)
+        self.assertEqual(Player.objects.get(pk=self.players[0].pk).mental, 10)
+
+    def test_xlsx_by_id_refreshes_overall(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(['ID', 'Aim', 'Gamesense'])
+        for player in self.players:
+            workbook.active.append([player.id, 20, 20])
+        path = os.path.join(self.tmp, 'attributes.xlsx')
+        workbook.save(path)
+        overall = Team.objects.get(pk=self.team.pk).overall
+
+        self.import_attributes(path)
+        self.assertEqual(Player.objects.filter(team=self.team, aim=20, gamesense=20).count(), 5)
+        self.assertGreater(Team.objects.get(pk=self.team.pk).overall, overall)
+
+
+class DedupeMediaTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_same_content_is_stored_once(self):
+        storage = ContentAddressedStorage(location=self.root)
+        first = storage.save('teams/a.PNG', ContentFile(b'logo'))
+        second = storage.save('teams/b.png', ContentFile(b'logo'))
+        self.assertEqual(first, second)
+        self.assertEqual(first, content_name('teams/a.png', hashlib.sha256(b'logo').hexdigest()))
+        self.assertEqual(os.listdir(os.path.join(self.root, 'teams')), [os.path.basename(first)])
+
+    def test_scan_skips_generated_dirs(self):
+        self.write('teams/logo.png', b'logo')
+        self.write('variants/teams/logo-64.webp', b'variant')
+        self.write('atlas/logos.png', b'atlas')
+        self.write('atlas/logos.css', b'.logo {}')
+        self.assertEqual(set(scan_media(self.root)), {'teams/logo.png'})
+
+    def test_command_leaves_generated_and_unreferenced_media(self):
+        logo = self.write('teams/logo.png', b'logo')
+        untouched = {
+            name: self.write(name, name.encode())
+            for name in ('variants/teams/logo-64.webp', 'atlas/logos.png', 'atlas/manifest.json', 'players/orphan.png')
+        }
+        team = Team.objects.create(name='Alpha', short_name='ALP', logo='teams/logo.png')
+
+        call_command('dedupe_media', '--delete', stdout=StringIO())
+
+        team.refresh_from_db()
+        self.assertEqual(team.logo.name, content_name('teams/logo.png', hashlib.sha256(b'logo').hexdigest()))
+        self.assertTrue(os.path.exists(os.path.join(self.root, team.logo.name)))
+        self.assertFalse(os.path.exists(logo))
+        for name, path in untouched.items():
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), name.encode(), name)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ImageVariantsTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_upload_builds_variants_after_commit(self):
+        team = Team(name='Alpha', short_name='ALP', logo=make_png('red'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            team.save()
+        self.assertFalse(images.has_variants(team.logo.name))
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        self.assertTrue(images.has_variants(team.logo.name))
+        self.assertTrue(images.srcset(team.logo))
+
+    def test_only_a_new_upload_schedules_variants(self):
+        team = Team.objects.create(name='Alpha', short_name='ALP', logo=make_png('red'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            team.short_name = 'ALF'
+            team.save()
+            Team.objects.get(pk=team.pk).save()
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            team.logo = make_png('blue')
+            team.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(images.has_variants(team.logo.name))
+
+
+class LogoAtlasTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, 'teams'))
+
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), 'wb') as f:
+            f.write(content)
+        return name
+
+    def test_atlas_is_rebuilt_only_when_a_logo_changes(self):
+        logos = [
+            (1, self.write('teams/red.png', make_png('red').read())),
+            (2, self.write('teams/blue.png', make_png('blue', (80, 40)).read())),
+            (3, self.write('teams/broken.png', b'not an image')),
+            (4, 'teams/missing.png'),
+        ]
+        manifest, built = build_atlas(logos, root=self.root)
+        self.assertTrue(built)
+        self.assertEqual(set(manifest['teams']), {'1', '2'})
+        self.assertEqual(load_manifest(self.root), manifest)
+        self.assertTrue(os.path.exists(os.path.join(self.root, manifest['file'])))
+
+        self.assertEqual(build_atlas(logos, root=self.root), (manifest, False))
+
+        self.write('teams/blue.png', make_png('green').read())
+        rebuilt, built = build_atlas(logos, root=self.root)
+        self.assertTrue(built)
+        self.assertNotEqual(rebuilt['key'], manifest['key'])
+
+    def test_sprite_teams_needs_the_current_logo(self):
+        manifest = {'logos': {'1': 'teams/a.png', '2': 'teams/b.png'}}
+        teams = [Team(id=1, logo='teams/a.png'), Team(id=2, logo='teams/new.png'), Team(id=3)]
+        self.assertEqual(sprite_teams(manifest, teams), {'1'})
+        self.assertEqual(sprite_teams(None, teams), set())
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_sqlite_by_default_with_persistent_connections(self):
+        database = load_settings()['DATABASES']['default']
+        self.assertEqual(database['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    def test_database_url_and_pools(self):
+        url = 'postgres://valsim:secret@db:5432/valsim'
+        database = load_settings(DATABASE_URL=url, DB_CONN_MAX_AGE='0')['DATABASES']['default']
+        self.assertEqual((database['ENGINE'], database['NAME'], database['HOST']),
+                         ('django.db.backends.postgresql', 'valsim', 'db'))
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+
+        database = load_settings(DATABASE_URL=url, DB_POOL='pgbouncer')['DATABASES']['default']
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+
+        database = load_settings(DATABASE_URL=url, DB_POOL='psycopg')['DATABASES']['default']
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 2, 'max_size': 10})
+
+
+class CacheSettingsTests(SimpleTestCase):
+    def backend(self, **env):
+        return load_settings(**env)['CACHES']['default']
+
+    def test_locmem_without_a_cache_url(self):
+        self.assertEqual(self.backend()['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+    def test_redis_from_cache_url_or_redis_url(self):
+        for name in ('CACHE_URL', 'REDIS_URL'):
+            cache_settings = self.backend(**{name: 'redis://cache:6379/1'})
+            self.assertEqual(cache_settings['BACKEND'], 'django.core.cache.backends.redis.RedisCache')
+            self.assertEqual(cache_settings['LOCATION'], 'redis://cache:6379/1')
+
+    def test_file_backend_is_opt_in(self):
+        cache_settings = self.backend(CACHE_BACKEND='file', REDIS_URL='redis://cache:6379/1')
+        self.assertEqual(cache_settings['BACKEND'], 'django.core.cache.backends.filebased.FileBasedCache')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESULTS_API_TOKEN='secret')
+class ReadOnlyDatabaseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+
+    def post_result(self):
+        entry = {'team_a': self.team_a.id, 'team_b': self.team_b.id, 'format': 'BO1',
+                 'maps': [{'map_name': 'Ascent', 'score_a': 13, 'score_b': 9}]}
+        return self.client.post(reverse('results_api'), json.dumps(entry), content_type='application/json',
+                                HTTP_AUTHORIZATION='Bearer secret')
+
+    def test_sqlite_is_writable_by_default_and_read_only_is_opt_in(self):
+        self.assertEqual(load_settings(VERCEL='1')['SQLITE_MODE'], 'off')
+        self.assertFalse(load_settings(VERCEL='1')['READ_ONLY_DATABASE'])
+        readonly = load_settings(VERCEL='1', SQLITE_MODE='readonly')
+        self.assertTrue(readonly['READ_ONLY_DATABASE'])
+        self.assertIn('immutable=1', readonly['DATABASES']['default']['NAME'])
+
+    @override_settings(READ_ONLY_DATABASE=True)
+    def test_write_views_answer_503_when_read_only(self):
+        response = self.post_result()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('read-only', response.json()['error'])
+
+        session = self.client.session
+        session['match_setup'] = {'team_a_id': str(self.team_a.id), 'team_b_id': str(self.team_b.id), 'format': 'BO1'}
+        session.save()
+        response = self.client.get(reverse('simulate_match'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('read-only', response.content.decode())
+        self.assertFalse(Match.objects.exists())
+
+    def test_read_only_file_answers_503(self):
+        error = OperationalError('attempt to write a readonly database')
+        with patch('game.results.ingest_matches', side_effect=error):
+            response = self.post_result()
+        self.assertEqual(response.status_code, 503)
+        with patch('game.results.ingest_matches', side_effect=OperationalError('disk I/O error')):
+            with self.assertRaises(OperationalError):
+                self.post_result()
+
+
+class ColdStartTests(SimpleTestCase):
+    def loaded_modules(self, **env):
+        script = (
+            'import django, json, sys; django.setup(); import game.urls, valsim.urls; '
+            'print(json.dumps(sorted(sys.modules)))'
+        )
+        environ = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'valsim.settings', **env}
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True,
+            check=True,
+        ).stdout
+        return set(json.loads(output))
+
+    def test_views_do_not_import_numpy(self):
+        modules = self.loaded_modules(VALSIM_LEAN='1')
+        self.assertIn('game.views', modules)
+        self.assertNotIn('numpy', modules)
+        self.assertNotIn('django.contrib.admin', modules)
+
+    def test_admin_and_auth_load_outside_lean_mode(self):
+        modules = self.loaded_modules(VALSIM_LEAN='0')
+        self.assertIn('django.contrib.admin', modules)
+        self.assertIn('django.contrib.auth', modules)
+        self.assertNotIn('numpy', modules)
+
+
+class BenchmarkReportTests(SimpleTestCase):
+    def report(self, results, baseline, max_regression=None):
+        out = StringIO()
+        failures = BenchmarkCommand(stdout=out).report(
+            results, {'baseline': baseline, 'max_regression': max_regression},
+        )
+        return failures, out.getvalue()
+
+    def test_query_budget_is_enforced_without_a_baseline(self):
+        results = {'home': {'p50_ms': 1.0, 'p95_ms': 2.0, 'queries': 2, 'peak_kb': 1.0}}
+        failures, out = self.report(results, '/nonexistent/baseline.json', max_regression=10)
+        self.assertEqual(failures, ['home: 2 queries (budget 0)'])
+        self.assertIn('--save-baseline', out)
+
+    def test_regression_against_the_local_baseline(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, 'baseline.json')
+        with open(path, 'w') as f:
+            json.dump({'engine_maps_1': {'p50_ms': 1.0}}, f)
+        results = {'engine_maps_1': {'p50_ms': 1.5, 'p95_ms': 2.0, 'queries': None, 'peak_kb': 1.0}}
+        self.assertEqual(self.report(results, path)[0], [])
+        failures, _ = self.report(results, path, max_regression=20)
+        self.assertEqual(len(failures), 1)
+        self.assertIn('+50%', failures[0])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SERVER_TIMING=True, SERVER_TIMING_SAMPLE_RATE=1.0,
+                   SERVER_TIMING_TOKEN='timing')
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SLOW_REQUESTS.clear()
+        self.addCleanup(SLOW_REQUESTS.clear)
+        self.addCleanup(setattr, SLOW_REQUESTS, 'sample_rate', SLOW_REQUESTS.sample_rate)
+        make_team('Alpha', 14)
+
+    def test_header_counts_queries(self):
+        response = self.client.get(reverse('quick_match_setup'))
+        timing = response['Server-Timing']
+        self.assertIn('db;desc="3 queries"', timing)
+        self.assertIn('tpl;desc="templates"', timing)
+        self.assertIn('view;desc="total"', timing)
+
+    def test_debug_endpoint_groups_sampled_requests(self):
+        for _ in range(2):
+            self.client.get(reverse('quick_match_setup'))
+        self.assertEqual(self.client.get(reverse('timing_debug')).status_code, 401)
+
+        response = self.client.get(reverse('timing_debug'), HTTP_AUTHORIZATION='Bearer timing')
+        groups = {group['url_name']: group for group in response.json()['by_url_name']}
+        self.assertEqual(list(groups), ['quick_match_setup'])
+        self.assertEqual(groups['quick_match_setup']['requests'], 2)
+        self.assertEqual(groups['quick_match_setup']['max_queries'], 3)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('home')))
+        self.assertEqual(self.client.get(reverse('timing_debug')).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RESULTS_API_TOKEN='secret')
+class SeededMatchPageTests(TestCase):
+    """Partida com seed: nada é simulado na criação e a página não traz o resultado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_match(self):
+        session = self.client.session
+        session['match_setup'] = {'team_a_id': str(self.team_a.id), 'team_b_id': str(self.team_b.id), 'format': 'BO3'}
+        session.save()
+        self.client.get(reverse('simulate_match'))
+        return Match.objects.get()
+
+    def test_match_is_created_unplayed(self):
+        match = self.create_match()
+        self.assertIsNotNone(match.seed)
+        self.assertIsNone(match.winner_id)
+        self.assertEqual((match.score_a, match.score_b), (0, 0))
+
+    def test_page_sends_only_names_roles_and_urls(self):
+        match = self.create_match()
+        match_data = self.client.get(reverse('match_result', args=[match.id])).context['match_data']
+        for key in ('replay', 'winner'):
+            self.assertNotIn(key, match_data)
+        self.assertEqual(match_data['session_url'], reverse('match_session', args=[match.id]))
+        self.assertIsNone(match_data['live_url'])  # Test client é WSGI
+        for side in ('team_a', 'team_b'):
+            for player in match_data[side]['players']:
+                self.assertEqual(set(player), {'id', 'name', 'role', 'photo'})
+
+    def test_page_without_seed_keeps_attributes_for_the_browser(self):
+        match = Match.objects.create(team_a=self.team_a, team_b=self.team_b, format='BO1', map_name='Ascent')
+        match_data = self.client.get(reverse('match_result', args=[match.id])).context['match_data']
+        self.assertIsNone(match_data['session_url'])
+        self.assertEqual(match_data['team_a']['players'][0]['stats']['aim'], 14)
+
+    def test_end_of_series_stores_the_server_result(self):
+        match = self.create_match()
+        url = reverse('match_result_save', args=[match.id])
+        # O corpo (o que o navegador diz ter visto) é ignorado
+        body = json.dumps({'format': 'BO3', 'maps': [{'map_name': 'Ascent', 'score_a': 0, 'score_b': 13}]})
+        response = self.client.post(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        replay = match_replay(match)
+        match.refresh_from_db()
+        self.assertEqual((match.score_a, match.score_b), (replay['score_a'], replay['score_b']))
+        self.assertEqual(match.winner_id, self.team_a.id if replay['winner'] == 'A' else self.team_b.id)
+        self.assertEqual(self.client.post(url, body, content_type='application/json').status_code, 400)
+
+    def test_results_api_rejects_seeded_matches(self):
+        match = self.create_match()
+        entry = {'match_id': match.id, 'format': 'BO3',
+                 'maps': [{'map_name': 'Ascent', 'score_a': 13, 'score_b': 0}] * 2}
+        response = self.client.post(reverse('results_api'), json.dumps(entry), content_type='application/json',
+                                    HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('simulated on the server', response.json()['error'])
+
+
+class MatchSessionTests(SimpleTestCase):
+    def test_session_follows_replay(self):
+        """A sessão "Next Round", round a round, reproduz o replay da mesma seed."""
+        snapshot = make_snapshot()
+        for seed in (1, 7, 99):
+            replay = simulate_replay(seed, snapshot, 'BO3')
+            session = MatchSession.start(seed, snapshot, 'BO3')
+            events = []
+            while not session.finished:
+                events.append(session.next_round())
+
+            for game in replay['maps']:
+                rounds = [event for event in events if event['m'] == game['number']]
+                self.assertEqual(
+                    [(event['w'], event['c']) for event in rounds],
+                    [(entry['winner'], entry['condition']) for entry in game['rounds']],
+                )
+                self.assertEqual(rounds[-1]['s'], [game['score_a'], game['score_b']])
+                for index, side in enumerate(('team_a', 'team_b')):
+                    self.assertEqual(
+                        [sum(event['k'][index][slot] for event in rounds) for slot in range(len(ROLES))],
+                        [player['kills'] for player in game['players'][side]],
+                    )
+            self.assertEqual(events[-1]['series'], [replay['score_a'], replay['score_b']])
+
+    def test_session_survives_blob_roundtrip(self):
+        snapshot = make_snapshot()
+        live = MatchSession.start(5, snapshot, 'BO1')
+        stored = MatchSession.start(5, snapshot, 'BO1')
+        while not live.finished:
+            event = stored.next_round()
+            stored = MatchSession.from_blob(stored.to_blob())
+            self.assertEqual(live.next_round(), event)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MatchSessionApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_a, cls.team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+        cls.match = make_match(cls.team_a, cls.team_b)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('match_session', args=[self.match.id])
+
+    def test_sessions_are_per_browser(self):
+        first, second = Client(), Client()
+        self.assertEqual(first.post(f'{self.url}next/').json()['r'], 1)
+        self.assertEqual(first.post(f'{self.url}next/').json()['r'], 2)
+        self.assertEqual(second.post(f'{self.url}next/').json()['r'], 1)
+        self.assertEqual(first.get(self.url).json()['r'], 2)
+
+        self.assertEqual(second.delete(self.url).status_code, 204)
+        self.assertEqual(second.get(self.url).status_code, 404)
+        self.assertEqual(first.get(self.url).json()['r'], 2)
+
+    def test_overlapping_step_is_rejected(self):
+        self.client.post(f'{self.url}next/')
+        key = SESSION_KEY.format(match_id=self.match.id, viewer=_session_viewer(self.client.get(self.url).wsgi_request))
+        cache.add(f'{key}:lock', 1)
+        response = self.client.post(f'{self.url}next/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(self.url).json()['r'], 1)
+
+    def test_non_atomic_cache_refuses_sessions(self):
+        """Cache em arquivo: o add não é atômico, então não há sessões nem partidas com seed."""
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            self.assertFalse(sessions_available())
+            with self.assertRaises(SessionsUnavailable):
+                advance_session(self.match.id, 'viewer', lambda: self.fail('session started'))
+            self.assertEqual(self.client.post(f'{self.url}next/').status_code, 503)
+            self.assertEqual(self.client.get(self.url).status_code, 503)
+
+            match_data = self.client.get(reverse('match_result', args=[self.match.id])).context['match_data']
+            self.assertIsNone(match_data['session_url'])
+
+            session = self.client.session
+            session['match_setup'] = {'team_a_id': str(self.team_a.id), 'team_b_id': str(self.team_b.id),
+                                      'format': 'BO1'}
+            session.save()
+            self.client.get(reverse('simulate_match'))
+            self.assertIsNone(Match.objects.latest('id').seed)
+
+
+def parse_sse(payloads):
+    """[(evento, id, dados)] de um stream SSE em bytes."""
+    events = []
+    for block in b''.join(payloads).decode().strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], fields.get('id'), json.loads(fields['data'])))
+    return events
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LiveStreamTests(TestCase):
+    def test_events_follow_the_replay(self):
+        snapshot = make_snapshot()
+        replay = simulate_replay(7, snapshot, 'BO3')
+        events = list(series_events(7, snapshot, 'BO3'))
+
+        self.assertEqual(events[0][2]['lineups']['a'], [1, 2, 3, 4, 5])
+        maps = [data for _, name, data in events if name == 'map']
+        self.assertEqual([(m['s'][0], m['s'][1]) for m in maps],
+                         [(m['score_a'], m['score_b']) for m in replay['maps']])
+        rounds = [data for _, name, data in events if name == 'round' and data['m'] == 1]
+        self.assertEqual([(r['w'], r['c']) for r in rounds],
+                         [(r['winner'], r['condition']) for r in replay['maps'][0]['rounds']])
+        self.assertEqual(events[-1][2], {'s': [replay['score_a'], replay['score_b']], 'w': replay['winner']})
+
+    def test_stream_resumes_after_last_event_id(self):
+        match = make_match(make_team('Alpha', 14), make_team('Bravo', 12))
+        url = reverse('live_match_stream', args=[match.id]) + '?interval=0'
+        response = self.client.get(url, HTTP_LAST_EVENT_ID='1.5')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = parse_sse(response.streaming_content)
+
+        self.assertEqual(events[0][0], 'start')
+        self.assertEqual(events[1][:2], ('round', '1.6'))
+        self.assertEqual(events[-1][0], 'end')
+
+    def test_match_without_seed_has_no_stream(self):
+        team_a, team_b = make_team('Alpha', 14), make_team('Bravo', 12)
+        match = Match.objects.create(team_a=team_a, team_b=team_b, format='BO1', map_name='Ascent')
+        self.assertEqual(self.client.get(reverse('live_match_stream', args=[match.id])).status_code, 404)
+
+
+class WatchPartyTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (('MAP_BREAK', 0), ('LINGER', 0)):
+            patcher = patch(f'game.broadcast.{name}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(CHANNELS.clear)
+
+    def run_party(self, consume):
+        snapshot = make_snapshot()
+
+        async def party():
+            channel = get_channel(('match', 1), lambda: series_events(5, snapshot, 'BO1'), interval=0)
+            self.assertIs(get_channel(('match', 1), lambda: self.fail('simulated twice')), channel)
+            return channel, await consume(channel)
+
+        return asyncio.run(party())
+
+    def test_viewers_share_one_simulation(self):
+        async def consume(channel):
+            return await asyncio.gather(*(collect(channel.stream()) for _ in range(3)))
+
+        channel, streams = self.run_party(consume)
+        self.assertEqual(streams[0], streams[1])
+        self.assertEqual(streams[0], streams[2])
+        events = parse_sse(streams[0])
+        self.assertEqual(events[0][0], 'snapshot')
+        self.assertEqual(events[-1][0], 'end')
+        self.assertTrue(channel.state['done'])
+
+    def test_late_viewer_starts_from_snapshot_and_slow_viewer_is_dropped(self):
+        async def consume(channel):
+            channel.buffer_size = 4
+            slow = channel.subscribe()
+            channel.buffer_size = 64
+            fast = collect(channel.stream())
+            await asyncio.sleep(0)
+            late = channel.stream()
+            return await fast, await collect(late), slow
+
+        channel, (fast, late, slow) = self.run_party(consume)
+        snapshot = parse_sse(late[:1])[0]
+        self.assertEqual(snapshot[0], 'snapshot')
+        self.assertGreater(snapshot[2]['r'], 0)
+        self.assertEqual(parse_sse(fast)[-1][0], 'end')
+        self.assertEqual(channel.dropped, 1)
+        self.assertNotIn(slow, channel.subscribers)
+
+
+async def collect(stream):
+    return [payload async for payload in stream]
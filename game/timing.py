@@ -0,0 +1,137 @@
+"""
+Métricas por request para o header Server-Timing (ver game/middleware.py).
+
+Enquanto um request instrumentado está em andamento, REQUEST_METRICS aponta para
+o RequestMetrics dele: o wrapper de SQL, o render de templates e span() somam
+ali. Fora disso (ou com SERVER_TIMING desligado) tudo vira no-op.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REQUEST_METRICS = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_ms', 'template_ms', 'spans')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.spans = {}
+
+    def add_span(self, name, ms):
+        self.spans[name] = self.spans.get(name, 0.0) + ms
+
+
+def sql_timer(execute, sql, params, many, context):
+    """execute_wrapper do Django: conta e cronometra as queries do request atual."""
+    metrics = REQUEST_METRICS.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+@contextmanager
+def span(name):
+    """Mede um trecho do request (aparece como uma entrada própria no Server-Timing)."""
+    metrics = REQUEST_METRICS.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_span(name, (time.perf_counter() - start) * 1000)
+
+
+_template_render_patched = False
+
+
+def instrument_templates():
+    """Cronometra Template.render do backend do Django (só chamado com SERVER_TIMING ligado)."""
+    global _template_render_patched
+    if _template_render_patched:
+        return
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        metrics = REQUEST_METRICS.get()
+        if metrics is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            metrics.template_ms += (time.perf_counter() - start) * 1000
+
+    Template.render = render
+    _template_render_patched = True
+
+
+class SlowRequestLog:
+    """Os max_entries requests mais lentos (amostrados) deste processo."""
+
+    def __init__(self, max_entries=200, sample_rate=0.0):
+        self.max_entries = max_entries
+        self.sample_rate = sample_rate
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def maybe_record(self, entry):
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return
+        item = (entry['total_ms'], next(self._counter), entry)
+        with self._lock:
+            if len(self._heap) < self.max_entries:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def entries(self):
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._heap, key=lambda item: item[0], reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+    def by_url_name(self, top=5):
+        """Agrupa por nome da URL, do grupo com maior tempo total para o menor."""
+        groups = {}
+        for entry in self.entries():
+            groups.setdefault(entry['url_name'] or entry['path'], []).append(entry)
+        summary = []
+        for name, entries in groups.items():
+            totals = [entry['total_ms'] for entry in entries]
+            summary.append({
+                'url_name': name,
+                'requests': len(entries),
+                'avg_ms': round(sum(totals) / len(totals), 2),
+                'max_ms': round(max(totals), 2),
+                'avg_queries': round(sum(entry['queries'] for entry in entries) / len(entries), 1),
+                'max_queries': max(entry['queries'] for entry in entries),
+                'avg_db_ms': round(sum(entry['db_ms'] for entry in entries) / len(entries), 2),
+                'avg_template_ms': round(sum(entry['template_ms'] for entry in entries) / len(entries), 2),
+                'slowest': entries[:top],
+            })
+        summary.sort(key=lambda group: group['avg_ms'] * group['requests'], reverse=True)
+        return summary
+
+
+SLOW_REQUESTS = SlowRequestLog()
@@ -9,4 +9,13 @@ urlpatterns = [
     path('simulation-choice/', views.simulation_choice, name='simulation_choice'),
     path('simulate-match/', views.simulate_match, name='simulate_match'),
     path('match-result/<int:match_id>/', views.match_result, name='match_result'),
+    path('match-result/<int:match_id>/live/', views.live_match_stream, name='live_match_stream'),
+    path('match-result/<int:match_id>/watch/', views.watch_party_stream, name='watch_party_stream'),
+    path('api/odds/', views.odds_api, name='odds_api'),
+    path('api/teams/', views.teams_api, name='teams_api'),
+    path('api/matches/results/', views.results_api, name='results_api'),
+    path('api/matches/<int:match_id>/result/', views.match_result_save, name='match_result_save'),
+    path('api/matches/<int:match_id>/session/', views.match_session_api, name='match_session'),
+    path('api/matches/<int:match_id>/session/next/', views.match_session_next, name='match_session_next'),
+    path('debug/timing/', views.timing_debug, name='timing_debug'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
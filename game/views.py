@@ -1,6 +1,51 @@
-from django.shortcuts import render, redirect
-from django.shortcuts import render, redirect
-from .models import Team, Match, Map
+import json
+import os
+import secrets
+import uuid
+from functools import wraps
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.views.decorators.http import condition, require_http_methods, require_POST
+from .models import Team, Match, Map, Player
+from .teams_payload import etag, get_payload
+from .timing import SLOW_REQUESTS, span
+
+# Os módulos do motor (engine, odds, head_to_head, replay, live, broadcast,
+# match_session, results) carregam o numpy: ficam dentro das views que os usam,
+# e o cold start (ver profile_startup) só paga o numpy quando alguém simula.
+
+READ_ONLY_MESSAGE = 'The database is read-only on this deployment, so matches cannot be saved'
+
+def _read_only_response(request):
+    if request.path.startswith('/api/'):
+        return JsonResponse({'error': READ_ONLY_MESSAGE}, status=503)
+    return HttpResponse(READ_ONLY_MESSAGE, status=503, content_type='text/plain; charset=utf-8')
+
+def writes_database(view):
+    """
+    Views que gravam no banco: 503 com uma mensagem clara quando ele é só leitura,
+    seja por configuração (READ_ONLY_DATABASE) ou porque o arquivo não é gravável.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if settings.READ_ONLY_DATABASE:
+            return _read_only_response(request)
+        try:
+            return view(request, *args, **kwargs)
+        except DatabaseError as e:
+            if 'readonly' not in str(e) and 'read-only' not in str(e):
+                raise
+            return _read_only_response(request)
+    return wrapper
 
 def home(request):
     return render(request, 'game/home.html')
@@ -18,46 +63,45 @@ def quick_match_setup(request):
         # Redirect directly to simulation
         return redirect('simulate_match')
 
-    teams = Team.objects.all()  # Already ordered by region due to Meta.ordering
     maps = Map.objects.all()
-    
-    # Agrupar times por região
-    from collections import defaultdict
-    teams_by_region = defaultdict(list)
-    for team in teams:
-        teams_by_region[team.region].append(team)
-    
-    import json
-    teams_data = []
-    for team in teams:
-        players = team.players.all()
-        
-        teams_data.append({
-            "id": team.id,
-            "name": team.name,
-            "logo": team.logo.url if team.logo else None,
-            "overall": team.calculate_team_overall(),  # Usa método dinâmico do Team
-            "players": [
-                {
-                    "name": player.name,
-                    "role": player.role,
-                    "rating": player.calculate_overall(),  # Usa método dinâmico
-                    "photo": player.photo.url if player.photo else None
-                } for player in players
-            ]
-        })
-    
+
+    # Times e jogadores vêm do payload em cache (ver game/teams_payload.py)
+    _, payload = get_payload()
+
+    head_to_head = None
+    # Sem a matriz gerada, nem carrega o numpy (cold start do deploy serverless)
+    if os.path.exists(settings.HEAD_TO_HEAD_PATH):
+        from .head_to_head import matrix_payload
+        head_to_head = matrix_payload()
+
     return render(request, 'game/quick_match_setup.html', {
-        'teams': teams,
-        'teams_by_region': dict(teams_by_region),
+        'teams_by_region': payload['teams_by_region'],
+        'logo_atlas_css': payload['logo_atlas_css'],
         'maps': maps,
-        'teams_data_json': json.dumps(teams_data)
+        'head_to_head_json': json.dumps(head_to_head)
     })
 
+def _teams_etag(request):
+    return etag()
+
+@condition(etag_func=_teams_etag)
+def teams_api(request):
+    """
+    JSON com times e jogadores do Quick Match.
+    Responde 304 quando o If-None-Match bate com a versão atual do payload.
+    """
+    _, payload = get_payload()
+
+    response = HttpResponse(payload['json'], content_type='application/json')
+    # Sempre revalida: a versão muda assim que um time/jogador é editado
+    patch_cache_control(response, no_cache=True)
+    return response
+
 def simulation_choice(request):
     # This view might be deprecated if we skip it, but keeping it for now or redirecting
     return redirect('quick_match_setup')
 
+@writes_database
 def simulate_match(request):
     match_setup = request.session.get('match_setup')
     
@@ -77,11 +121,19 @@ def simulate_match(request):
     # Get simulation type from session (preferred) or POST (fallback)
     simulation_type = match_setup.get('simulation_type') or request.POST.get('simulation_type')
     
+    # numpy: motor e odds só quando uma partida é criada
+    from .engine import WINS_NEEDED
+    from .engine.constants import LINEUP_SIZE
+    from .match_session import sessions_available
+    from .odds import lineup_prefetch, starting_lineup
+
     # Get teams and map
     try:
-        team_a = Team.objects.get(id=team_a_id)
-        team_b = Team.objects.get(id=team_b_id)
-    except (Team.DoesNotExist, ValueError):
+        # Os dois times e elencos em 2 queries
+        team_ids = [int(team_a_id), int(team_b_id)]
+        teams = Team.objects.prefetch_related(lineup_prefetch()).in_bulk(team_ids)
+        team_a, team_b = teams[team_ids[0]], teams[team_ids[1]]
+    except (KeyError, ValueError):
         # Clear invalid session data and redirect back
         if 'match_setup' in request.session:
             del request.session['match_setup']
@@ -94,23 +146,39 @@ def simulate_match(request):
         # TODO: For BO3/BO5, we might want to store all selected maps in a M2M relation or JSON field later.
         first_map_id = map_ids_str.split(',')[0] if map_ids_str else None
         
-        selected_map = Map.objects.get(id=first_map_id)
-        map_name = selected_map.name
+        selected_map = Map.objects.get(id=first_map_id) if first_map_id else None
+        map_name = selected_map.name if selected_map else "Unknown"
     except (Map.DoesNotExist, ValueError, IndexError):
         selected_map = None
         map_name = "Unknown"
     
-    # Create match without simulating scores (JavaScript will handle the simulation)
-    match = Match.objects.create(
-        team_a=team_a,
-        team_b=team_b,
-        score_a=0,
-        score_b=0,
-        winner=None,  # Winner will be determined by JavaScript simulation
-        format=match_setup['format'],
-        map_name=map_name,
-        map=selected_map
-    )
+    series_format = match_setup['format']
+    lineup_a, lineup_b = starting_lineup(team_a), starting_lineup(team_b)
+    # Partida reproduzível: guarda só seed + versão do motor + titulares, sem
+    # simular nada aqui; os rounds saem pelo SSE ou pela sessão (ver game/replay.py).
+    # Sem sessões (cache sem add atômico), o navegador simula a partida.
+    if len(lineup_a) == len(lineup_b) == LINEUP_SIZE and series_format in WINS_NEEDED and sessions_available():
+        from .replay import pending_match_fields
+        match = Match.objects.create(
+            team_a=team_a,
+            team_b=team_b,
+            format=series_format,
+            map_name=map_name,
+            map=selected_map,
+            **pending_match_fields(lineup_a, lineup_b)
+        )
+    else:
+        # Create match without simulating scores (JavaScript will handle the simulation)
+        match = Match.objects.create(
+            team_a=team_a,
+            team_b=team_b,
+            score_a=0,
+            score_b=0,
+            winner=None,  # Winner will be determined by JavaScript simulation
+            format=series_format,
+            map_name=map_name,
+            map=selected_map
+        )
     
     # Clear session data
     del request.session['match_setup']
@@ -121,15 +189,95 @@ def simulate_match(request):
     else:
         return redirect('match_result', match_id=match.id)
 
+# Páginas de partidas finalizadas ficam em cache (HTML completo). Só o servidor
+# (ASGI/WSGI) muda o HTML, pelos links de transmissão: entra na chave. A geração
+# muda quando times, jogadores, mapas ou campeonatos mudam (nomes, logos, elencos
+# aparecem na página), o que descarta todas as páginas de uma vez.
+MATCH_PAGE_KEY = 'match_result:{generation}:{match_id}:{server}'
+MATCH_PAGE_GENERATION_KEY = 'match_result:generation'
+MATCH_PAGE_SERVERS = ('asgi', 'wsgi')
+MATCH_PAGE_TIMEOUT = 60 * 60 * 24
+# Navegador/CDN não são invalidados: guardam a página só por pouco tempo
+MATCH_PAGE_MAX_AGE = 300
+
+def _match_page_generation():
+    return cache.get_or_set(MATCH_PAGE_GENERATION_KEY, lambda: uuid.uuid4().hex[:12], timeout=None)
+
+def invalidate_match_pages(match_ids):
+    """Remove as páginas em cache das partidas (as duas variantes de servidor)."""
+    generation = _match_page_generation()
+    cache.delete_many([
+        MATCH_PAGE_KEY.format(generation=generation, match_id=match_id, server=server)
+        for match_id in match_ids for server in MATCH_PAGE_SERVERS
+    ])
+
+def invalidate_all_match_pages():
+    """Troca a geração: todas as páginas em cache ficam para trás (e expiram sozinhas)."""
+    cache.set(MATCH_PAGE_GENERATION_KEY, uuid.uuid4().hex[:12], timeout=None)
+
+def _is_asgi(request):
+    """Request servido pelo valsim/asgi.py (só aí os streams SSE saem round a round)."""
+    return isinstance(request, ASGIRequest)
+
+@ensure_csrf_cookie  # Também na página em cache: simulation.js manda o token ao gravar a série
 def match_result(request, match_id):
-    match = Match.objects.get(id=match_id)
+    asgi = _is_asgi(request)
+    cache_key = MATCH_PAGE_KEY.format(
+        generation=_match_page_generation(), match_id=match_id, server='asgi' if asgi else 'wsgi',
+    )
+    content = cache.get(cache_key)
+    if content is not None:
+        response = HttpResponse(content)
+        patch_cache_control(response, public=True, max_age=MATCH_PAGE_MAX_AGE)
+        return response
+
+    roster = Player.objects.filter(active=True).order_by('id')
+    match = get_object_or_404(
+        Match.objects.select_related('team_a', 'team_b', 'winner', 'map', 'championship').prefetch_related(
+            Prefetch('team_a__players', queryset=roster),
+            Prefetch('team_b__players', queryset=roster),
+        ),
+        id=match_id,
+    )
     
-    import json
-    import random
+    # numpy, como o resto do motor
+    from .match_session import sessions_available
+    from .replay import is_replayable
+
+    seeded = is_replayable(match)
+    rosters = {
+        side: [
+            {
+                "id": player.id,
+                "name": player.name,
+                "role": player.get_role_display(),
+                "photo": player.photo.url if player.photo else None,
+                "overall": player.overall,
+                "stats": {
+                    "aim": player.aim,
+                    "gamesense": player.gamesense,
+                    "support": player.support,
+                    "clutch": player.clutch
+                },
+            } for player in team.players.all()
+        ]
+        for side, team in (('team_a', match.team_a), ('team_b', match.team_b))
+    }
+    # Partida com seed: o navegador só recebe nomes e roles; placar, vencedor e
+    # rounds chegam pelo SSE ou pela sessão. Sem seed, simulation.js simula a
+    # série no navegador e precisa dos atributos.
+    client_fields = ('id', 'name', 'role', 'photo') if seeded else ('id', 'name', 'role', 'photo', 'overall', 'stats')
 
     match_data = {
+        "id": match.id,
+        "finished": match.is_finished,
+        "results_url": reverse('match_result_save', args=[match.id]),  # simulation.js avisa o fim da série (CSRF)
         "format": match.format,  # Add format to match_data for frontend
-        "winner": match.winner.short_name if match.winner else None,
+        # SSE (game/live.py) só sob ASGI; no WSGI os rounds vêm da sessão
+        "live_url": reverse('live_match_stream', args=[match.id]) if seeded and asgi else None,
+        "watch_url": reverse('watch_party_stream', args=[match.id]) if seeded and asgi else None,  # ?party na página
+        # Next Round no servidor; sem sessões (cache sem add atômico) a partida não tem seed
+        "session_url": reverse('match_session', args=[match.id]) if seeded and sessions_available() else None,
         "map": {
             "name": match.map.name if match.map else match.map_name,
             "minimap": match.map.minimap.url if match.map and match.map.minimap else None
@@ -138,52 +286,300 @@ def match_result(request, match_id):
             "name": match.championship.name if match.championship else "Quick Match",
             "logo": match.championship.logo.url if match.championship and match.championship.logo else None
         },
-        "team_a": {
-            "name": match.team_a.name,
-            "short_name": match.team_a.short_name,
-            "color_primary": match.team_a.color_primary,
-            "color_secondary": match.team_a.color_secondary,
-            "logo": match.team_a.logo.url if match.team_a.logo else None,
-            "players": [
-                {
-                    "name": player.name,
-                    "role": player.get_role_display(),
-                    "photo": player.photo.url if player.photo else None,
-                    "stats": {
-                        "aim": player.aim,
-                        "gamesense": player.gamesense,
-                        "support": player.support,
-                        "clutch": player.clutch
-                    },
-                    "overall": player.calculate_overall()
-                } for player in match.team_a.players.all()
-            ]
-        },
-        "team_b": {
-            "name": match.team_b.name,
-            "short_name": match.team_b.short_name,
-            "color_primary": match.team_b.color_primary,
-            "color_secondary": match.team_b.color_secondary,
-            "logo": match.team_b.logo.url if match.team_b.logo else None,
-            "players": [
-                {
-                    "name": player.name,
-                    "role": player.get_role_display(),
-                    "photo": player.photo.url if player.photo else None,
-                    "stats": {
-                        "aim": player.aim,
-                        "gamesense": player.gamesense,
-                        "support": player.support,
-                        "clutch": player.clutch
-                    },
-                    "overall": player.calculate_overall()
-                } for player in match.team_b.players.all()
-            ]
-        }
     }
-    
-    return render(request, 'game/match_result.html', {
+    for side, team in (('team_a', match.team_a), ('team_b', match.team_b)):
+        match_data[side] = {
+            "name": team.name,
+            "short_name": team.short_name,
+            "color_primary": team.color_primary,
+            "color_secondary": team.color_secondary,
+            "logo": team.logo.url if team.logo else None,
+            "players": [{field: player[field] for field in client_fields} for player in rosters[side]],
+        }
+
+    response = render(request, 'game/match_result.html', {
         'match': match,
         'match_data': match_data,
+        'rosters': rosters,  # Cards dos jogadores (OVR), renderizados no servidor
         'match_data_json': json.dumps(match_data)
     })
+    if match.is_finished:
+        cache.set(cache_key, response.content, timeout=MATCH_PAGE_TIMEOUT)
+        patch_cache_control(response, public=True, max_age=MATCH_PAGE_MAX_AGE)
+    return response
+
+async def live_match_stream(request, match_id):
+    """
+    Partida simulada no servidor e transmitida round a round (Server-Sent Events;
+    formato em game/live.py). Só para partidas com seed.
+    GET /match-result/<id>/live/?map=1&round=1&interval=200 (ms entre rounds)
+    Servida pelo valsim/asgi.py, cada espectador é uma corrotina. No WSGI o
+    stream é síncrono e segura um worker por espectador; por isso match_result
+    só oferece live_url sob ASGI.
+    """
+    # numpy: o stream simula a série
+    from .live import MAX_INTERVAL, ROUND_INTERVAL, parse_event_id, stream_series, stream_series_sync
+
+    match = await _seeded_match(match_id)
+    if match is None:
+        return JsonResponse({'error': 'Match has no server-side simulation'}, status=404)
+
+    try:
+        start = (int(request.GET.get('map', 1)), int(request.GET.get('round', 1)))
+        interval_ms = int(request.GET.get('interval', round(ROUND_INTERVAL * 1000)))
+    except ValueError:
+        return JsonResponse({'error': 'map, round and interval must be integers'}, status=400)
+    # Reconexão automática do EventSource: continua depois do último evento recebido
+    last = parse_event_id(request.headers.get('Last-Event-ID'))
+    if last:
+        start = (last[0], last[1] + 1)
+    interval = min(max(interval_ms, 0) / 1000, MAX_INTERVAL)
+
+    stream = stream_series if _is_asgi(request) else stream_series_sync
+    return _event_stream(stream(match.seed, match.roster_snapshot, match.format, start, interval))
+
+async def watch_party_stream(request, match_id):
+    """
+    Transmissão compartilhada da partida (game/broadcast.py): todos os
+    espectadores seguem a mesma simulação, começando pelo snapshot atual.
+    GET /match-result/<id>/watch/
+    Só sob ASGI: no WSGI cada request tem o próprio event loop (um canal por
+    espectador, sem fan-out) e o stream só sairia no fim da série.
+    """
+    # numpy: o canal simula a série
+    from .broadcast import get_channel
+    from .live import series_events
+
+    if not _is_asgi(request):
+        return JsonResponse({'error': 'Watch parties require the ASGI server (valsim/asgi.py)'}, status=501)
+    match = await _seeded_match(match_id)
+    if match is None:
+        return JsonResponse({'error': 'Match has no server-side simulation'}, status=404)
+
+    channel = get_channel(
+        ('match', match.id), lambda: series_events(match.seed, match.roster_snapshot, match.format),
+    )
+    return _event_stream(channel.stream())
+
+# Campos que a simulação no servidor precisa (sem carregar times nem elencos)
+SEEDED_FIELDS = ('seed', 'engine_version', 'roster_snapshot', 'format')
+
+async def _seeded_match(match_id):
+    """Só os campos da simulação; None se a partida não tem seed desta versão do motor."""
+    from .replay import is_replayable  # numpy, como o resto do motor
+
+    try:
+        match = await Match.objects.only(*SEEDED_FIELDS).aget(id=match_id)
+    except Match.DoesNotExist:
+        raise Http404
+    return match if is_replayable(match) else None
+
+def _event_stream(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Proxy nginx não segura os eventos
+    return response
+
+# Cookie assinado que separa as sessões "Next Round" de cada navegador
+VIEWER_COOKIE = 'match_viewer'
+VIEWER_SALT = 'game.match_session'
+
+def _session_viewer(request):
+    """Id do navegador no cookie assinado, ou None (cookie ausente ou adulterado)."""
+    return request.get_signed_cookie(VIEWER_COOKIE, default=None, salt=VIEWER_SALT)
+
+SESSIONS_UNAVAILABLE_MESSAGE = 'Match sessions need a cache backend with atomic add (Redis, memcached or locmem)'
+
+def _sessions_unavailable_response():
+    return JsonResponse({'error': SESSIONS_UNAVAILABLE_MESSAGE}, status=503)
+
+@csrf_exempt
+@require_http_methods(['GET', 'DELETE'])
+def match_session_api(request, match_id):
+    """
+    Sessão "Next Round" da partida no servidor (game/match_session.py), deste navegador.
+    GET /api/matches/<id>/session/ devolve o estado para retomar (404 sem sessão);
+    DELETE descarta a sessão (botão Reset).
+    """
+    # numpy: importa o motor (game/engine)
+    from .match_session import load_session, reset_session, sessions_available
+
+    if not sessions_available():
+        return _sessions_unavailable_response()
+    viewer = _session_viewer(request)
+    if request.method == 'DELETE':
+        if viewer is not None:
+            reset_session(match_id, viewer)
+        return HttpResponse(status=204)
+    session = load_session(match_id, viewer) if viewer is not None else None
+    if session is None:
+        return JsonResponse({'error': 'No session'}, status=404)
+    return JsonResponse(session.snapshot())
+
+@csrf_exempt
+@require_POST
+def match_session_next(request, match_id):
+    """
+    Joga o próximo round da sessão: 4 operações no cache (trava, leitura,
+    gravação, destrava); a partida só é lida do banco quando a sessão começa.
+    Sem cookie de viewer, a resposta cria um. 503 se o cache não trava de forma
+    atômica (match_session.sessions_available).
+    POST /api/matches/<id>/session/next/
+    """
+    # numpy: as sessões simulam o motor
+    from .match_session import (
+        SESSION_TIMEOUT, MatchSession, SessionBusy, SessionOver, SessionsUnavailable, advance_session,
+    )
+    from .replay import is_replayable
+
+    def start():
+        match = get_object_or_404(Match.objects.only(*SEEDED_FIELDS), id=match_id)
+        if not is_replayable(match):
+            raise Http404('Match has no server-side simulation')
+        return MatchSession.start(match.seed, match.roster_snapshot, match.format)
+
+    viewer = _session_viewer(request)
+    new_viewer = viewer is None
+    if new_viewer:
+        viewer = secrets.token_urlsafe(16)
+    try:
+        event = advance_session(match_id, viewer, start)
+    except SessionOver:
+        return JsonResponse({'error': 'Series is over'}, status=409)
+    except SessionBusy:
+        return JsonResponse({'error': 'Round already in progress'}, status=409)
+    except SessionsUnavailable:
+        return _sessions_unavailable_response()
+    response = JsonResponse(event)
+    if new_viewer:
+        response.set_signed_cookie(
+            VIEWER_COOKIE, viewer, salt=VIEWER_SALT, max_age=SESSION_TIMEOUT, httponly=True, samesite='Lax',
+        )
+    return response
+
+def odds_api(request):
+    """
+    Odds de um confronto via Monte Carlo no motor server-side.
+    GET /api/odds/?team_a=<id>&team_b=<id>&format=BO3&n=2000
+    """
+    # numpy: as odds rodam o motor
+    from .engine import WINS_NEEDED
+    from .odds import DEFAULT_SIMULATIONS, MAX_SIMULATIONS, lineup_prefetch, match_odds, starting_lineup
+
+    series_format = request.GET.get('format', 'BO1').upper()
+    if series_format not in WINS_NEEDED:
+        return JsonResponse({'error': f'Invalid format: {series_format}'}, status=400)
+
+    try:
+        team_a_id = int(request.GET.get('team_a', ''))
+        team_b_id = int(request.GET.get('team_b', ''))
+        n = int(request.GET.get('n', DEFAULT_SIMULATIONS))
+    except ValueError:
+        return JsonResponse({'error': 'team_a, team_b and n must be integers'}, status=400)
+    n = max(1, min(n, MAX_SIMULATIONS))
+
+    teams = Team.objects.prefetch_related(lineup_prefetch()).in_bulk([team_a_id, team_b_id])
+    if team_a_id not in teams or team_b_id not in teams:
+        return JsonResponse({'error': 'Team not found'}, status=404)
+    team_a, team_b = teams[team_a_id], teams[team_b_id]
+
+    try:
+        odds = match_odds(starting_lineup(team_a), starting_lineup(team_b), series_format, n)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'team_a': {'id': team_a.id, 'name': team_a.name},
+        'team_b': {'id': team_b.id, 'name': team_b.name},
+        'format': series_format,
+        **odds,
+    })
+
+def _ingest(request, entries_of):
+    """Lê o JSON do corpo, entries_of(corpo) -> lista de partidas, grava. Retorna (ids, None) ou (None, erro)."""
+    from .results import IngestError, ingest_matches  # numpy: importa o motor (game/engine)
+
+    try:
+        body = json.loads(request.body)
+    except ValueError:
+        return None, JsonResponse({'error': 'Invalid JSON'}, status=400)
+    try:
+        return ingest_matches(entries_of(body)), None
+    except IngestError as e:
+        return None, JsonResponse({'error': str(e)}, status=400)
+
+@csrf_exempt
+@require_POST
+@writes_database
+def results_api(request):
+    """
+    Ingestão por máquina: grava séries finalizadas em lote (uma transação por requisição).
+    POST /api/matches/results/ com {"matches": [...]} ou uma única partida;
+    formato em game/results.py. Exige "Authorization: Bearer <RESULTS_API_TOKEN>";
+    sem token configurado a API fica desligada. O navegador grava por match_result_save.
+    """
+    token = getattr(settings, 'RESULTS_API_TOKEN', '')
+    if not token:
+        return JsonResponse({'error': 'Results API is disabled (RESULTS_API_TOKEN is not set)'}, status=403)
+    if request.headers.get('Authorization') != f'Bearer {token}':
+        return JsonResponse({'error': 'Invalid token'}, status=401)
+
+    match_ids, error = _ingest(
+        request, lambda body: body.get('matches') if isinstance(body, dict) and 'matches' in body else [body],
+    )
+    return error or JsonResponse({'matches': match_ids}, status=201)
+
+@require_POST
+@writes_database
+def match_result_save(request, match_id):
+    """
+    Fim da série na página (simulation.js), protegido por CSRF, só para a partida
+    da URL e só se ela ainda não tem resultado. Partida com seed grava o resultado
+    do replay do servidor; sem seed, grava o corpo (formato de game/results.py).
+    POST /api/matches/<id>/result/
+    """
+    from .replay import is_replayable  # numpy, como o resto do motor
+    from .results import IngestError, finish_seeded_match
+
+    match = get_object_or_404(Match, id=match_id)
+    if is_replayable(match):
+        # Série simulada no servidor: o resultado sai do seed, não do corpo
+        try:
+            return JsonResponse({'match': finish_seeded_match(match)}, status=201)
+        except IngestError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    def entries_of(body):
+        if not isinstance(body, dict):
+            return [body]
+        return [dict(body, match_id=match_id)]
+
+    match_ids, error = _ingest(request, entries_of)
+    return error or JsonResponse({'match': match_ids[0]}, status=201)
+
+
+def timing_debug(request):
+    """
+    Requests mais lentos (amostrados pelo ServerTimingMiddleware), agrupados por
+    nome de URL. Só existe com settings.SERVER_TIMING; exige
+    "Authorization: Bearer <SERVER_TIMING_TOKEN>" quando o token está definido e,
+    sem token, só responde com DEBUG ligado.
+    """
+    if not getattr(settings, 'SERVER_TIMING', False):
+        raise Http404
+    token = getattr(settings, 'SERVER_TIMING_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return JsonResponse({'error': 'Invalid token'}, status=401)
+    elif not settings.DEBUG:
+        raise Http404
+
+    try:
+        top = max(1, int(request.GET.get('top', 5)))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid top'}, status=400)
+    return JsonResponse({
+        'sample_rate': SLOW_REQUESTS.sample_rate,
+        'logged': len(SLOW_REQUESTS.entries()),
+        'by_url_name': SLOW_REQUESTS.by_url_name(top=top),
+    })
@@ -93,6 +93,13 @@ function initializeMatch(data) {
     updatePlayerStatsUI();
     updateMapImage(); // <--- NEW FUNCTION CALL
 
+    // Watch party link (?party): follow the shared server-side broadcast
+    if (matchData.watch_url && new URLSearchParams(window.location.search).has('party')) {
+        watchLiveMatch(true);
+        return;
+    }
+    if (matchData.session_url) resumeSession();
+
     // Check Simulation Mode
     if (mode === 'quick') {
         setTimeout(() => { simulateInstantMatch(); }, 100);
@@ -108,8 +115,8 @@ function initializePlayer(p) {
     const mentalStat = p.stats.mental || 10;
 
     // CAPTURE THE CORRECT OVERALL FROM DB
-    // Check p.overall first, then p.rating, then fallback to 50
-    const dbOverall = p.overall || p.rating || 50;
+    // Seeded matches only send names and roles: the card keeps the server-rendered OVR
+    const dbOverall = p.overall || p.rating || null;
 
     return {
         ...p,
@@ -178,8 +185,11 @@ function simulateNextRound() {
     let winningTeam, losingTeam, winnerKey, winCondition;
     const spikePlanted = Math.random() > 0.5;
 
+    // Only matches without a seed are simulated here; seeded ones come from the server
+    const teamAWins = Math.random() < winChanceA;
+
     // RNG Winner Determination
-    if (Math.random() < winChanceA) {
+    if (teamAWins) {
         winningTeam = playerStats.teamA;
         losingTeam = playerStats.teamB;
         winnerKey = 'A';
@@ -336,6 +346,12 @@ function simulateInstantMatch() {
     if (btnNext) btnNext.classList.add('hidden');
     if (btnSim) btnSim.classList.add('hidden');
 
+    // Seeded matches: rounds come from the server session, back to back
+    if (matchData && matchData.session_url) {
+        playSessionRounds(0);
+        return;
+    }
+
     let safetyBreak = 0;
     let matchEnded = false;
 
@@ -351,6 +367,16 @@ function simulateInstantMatch() {
 
 function simulateFullMatch() {
     console.log("ValSim: simulateFullMatch called"); // DEBUG LOG
+    // Seeded matches are simulated on the server and streamed round by round
+    if (matchData && matchData.live_url && typeof EventSource !== 'undefined') {
+        watchLiveMatch();
+        return;
+    }
+    // Without a stream (WSGI), the same rounds come from the session one request at a time
+    if (matchData && matchData.session_url) {
+        playSessionRounds(200);
+        return;
+    }
     const interval = setInterval(() => {
         if (checkMatchEndStateOnly() || document.getElementById('match-over-modal').classList.contains('hidden') === false) {
             clearInterval(interval);
@@ -360,6 +386,178 @@ function simulateFullMatch() {
     }, 200); // 200ms per round for visual effect
 }
 
+// ==================== LIVE MATCH (SERVER-SENT EVENTS) ====================
+// Rounds come from game/live.py; the browser only renders them
+let liveSource = null;
+let liveLineups = null;
+let liveMap = null;
+
+// party: follow the shared broadcast (game/broadcast.py) instead of a private stream
+function watchLiveMatch(party = false) {
+    if (liveSource) return;
+    const btnNext = document.getElementById('next-round-btn');
+    const btnSim = document.getElementById('simulate-all-btn');
+    if (btnNext) btnNext.classList.add('hidden');
+    if (btnSim) btnSim.classList.add('hidden');
+
+    if (party) {
+        // Late joiners start from a snapshot; a dropped (slow) viewer reconnects to a fresh one
+        liveSource = new EventSource(matchData.watch_url);
+        liveSource.addEventListener('snapshot', e => applyLiveSnapshot(JSON.parse(e.data)));
+    } else {
+        // Resume from the current map/round (manual "Next Round" follows the same replay)
+        liveSource = new EventSource(`${matchData.live_url}?map=${seriesHistory.length + 1}&round=${currentRound}`);
+        liveSource.addEventListener('start', e => { liveLineups = JSON.parse(e.data).lineups; });
+        // One map per connection: the next one starts from the "Next Map" flow
+        liveSource.addEventListener('map', stopLiveMatch);
+    }
+    liveSource.addEventListener('round', e => applyLiveRound(JSON.parse(e.data)));
+    liveSource.addEventListener('end', stopLiveMatch);
+}
+
+// Broadcast snapshot or a resumed server session (game/match_session.py)
+function applyLiveSnapshot(state) {
+    liveLineups = state.lineups;
+    if (liveMap === state.m) return; // Reconnected mid-map: rounds keep coming
+    liveMap = state.m;
+    seriesScore = { A: state.series[0], B: state.series[1] };
+    updateSeriesUI();
+
+    [...playerStats.teamA, ...playerStats.teamB].forEach(p => resetPlayerStats(p));
+    [0, 1].forEach(side => {
+        for (let slot = 0; slot < 5; slot++) {
+            const player = livePlayer(side, slot);
+            if (!player) continue;
+            player.kills = state.k[side][slot];
+            player.deaths = state.d[side][slot];
+        }
+    });
+    [scoreA, scoreB] = state.s;
+    currentRound = state.r + 1;
+    isOvertime = state.r >= 24;
+    roundHistory = state.rounds.map(([winner, condition], i) => ({ round: i + 1, winner, condition }));
+    updateScoreUI();
+    updatePlayerStatsUI();
+
+    if (state.done) {
+        stopLiveMatch();
+        const btnNext = document.getElementById('next-round-btn');
+        const btnSim = document.getElementById('simulate-all-btn');
+        if (btnNext) btnNext.classList.add('hidden');
+        if (btnSim) btnSim.classList.add('hidden');
+    }
+}
+
+function stopLiveMatch() {
+    if (liveSource) liveSource.close();
+    liveSource = null;
+}
+
+function livePlayer(side, slot) {
+    const id = liveLineups ? liveLineups[side === 0 ? 'a' : 'b'][slot] : null;
+    const team = side === 0 ? playerStats.teamA : playerStats.teamB;
+    return team.find(p => p.id === id) || null;
+}
+
+function applyLiveRound(event) {
+    // Broadcast (or a session resumed between maps) moves on to the next map by itself,
+    // unless "Next Map" was already clicked
+    if (liveMap !== null && event.m !== liveMap && (scoreA || scoreB)) {
+        startNextMap();
+        const btnNext = document.getElementById('next-round-btn');
+        const btnSim = document.getElementById('simulate-all-btn');
+        if (liveSource && btnNext) btnNext.classList.add('hidden');
+        if (liveSource && btnSim) btnSim.classList.add('hidden');
+    }
+    liveMap = event.m;
+    checkOvertimeStatus();
+    currentRound = event.r;
+
+    [...playerStats.teamA, ...playerStats.teamB].forEach(p => {
+        p.isDead = false;
+        p.roundKills = 0;
+    });
+    [0, 1].forEach(side => {
+        for (let slot = 0; slot < 5; slot++) {
+            const player = livePlayer(side, slot);
+            if (!player) continue;
+            player.kills += event.k[side][slot];
+            player.roundKills = event.k[side][slot];
+            player.deaths += event.d[side][slot];
+            player.isDead = event.d[side][slot] > 0;
+        }
+    });
+    [...playerStats.teamA, ...playerStats.teamB].forEach(p => {
+        p.survived = !p.isDead;
+    });
+
+    [scoreA, scoreB] = event.s;
+    updateScoreUI();
+    updatePlayerStatsUI();
+    roundHistory.push({
+        round: event.r,
+        winner: event.w,
+        condition: event.c,
+        score: `${scoreA}-${scoreB}`
+    });
+
+    if (!checkMatchEnd()) {
+        currentRound++;
+    }
+}
+
+// ==================== SERVER SESSION ("NEXT ROUND") ====================
+// Seeded matches advance one round per request (game/match_session.py) and survive reloads
+
+let sessionStepPending = false;
+
+function nextRound() {
+    if (matchData && matchData.session_url) {
+        // One step in flight at a time; the server also rejects overlapping steps
+        if (sessionStepPending) return;
+        sessionStepPending = true;
+        fetch(`${matchData.session_url}next/`, { method: 'POST' })
+            .then(response => response.ok ? response.json() : null)
+            .then(event => { if (event) applyLiveRound(event); })
+            .finally(() => { sessionStepPending = false; });
+    } else {
+        simulateNextRound();
+    }
+}
+
+// Step the session until the current map ends (the "Next Map" flow starts the next one)
+function playSessionRounds(delay) {
+    const modal = document.getElementById('match-over-modal');
+    const step = () => {
+        if (!modal.classList.contains('hidden')) return;
+        sessionStepPending = true;
+        fetch(`${matchData.session_url}next/`, { method: 'POST' })
+            .then(response => response.ok ? response.json() : null)
+            .then(event => {
+                sessionStepPending = false;
+                if (!event) return;
+                applyLiveRound(event);
+                setTimeout(step, delay);
+            })
+            .catch(() => { sessionStepPending = false; });
+    };
+    if (!sessionStepPending) step();
+}
+
+function resumeSession() {
+    fetch(matchData.session_url)
+        .then(response => response.ok ? response.json() : null)
+        .then(state => { if (state) applyLiveSnapshot(state); });
+}
+
+function resetMatch() {
+    if (matchData && matchData.session_url) {
+        fetch(matchData.session_url, { method: 'DELETE' }).finally(() => location.reload());
+    } else {
+        location.reload();
+    }
+}
+
 function checkMatchEndStateOnly() {
     if (!isOvertime) {
         if (scoreA >= 13 || scoreB >= 13) return true;
@@ -476,7 +674,6 @@ function endMatch(winner, winnerScore, loserScore) {
     // 5. Show Modal
     document.getElementById('match-over-modal').classList.remove('hidden');
 
-    // 6. Stats Management
     // Save Snapshot
     seriesHistory.push({
         mapIndex: seriesHistory.length + 1,
@@ -485,12 +682,16 @@ function endMatch(winner, winnerScore, loserScore) {
         scoreB: Math.max(scoreA, scoreB) === scoreB ? scoreA : scoreB, // Logic needs to be careful here
         scoreA_real: scoreA,
         scoreB_real: scoreB,
+        mapName: (mapPool[currentMapIndex] || {}).name,
+        rounds: roundHistory.map(r => ({ round: r.round, winner: r.winner, condition: r.condition })),
         playerStats: {
             teamA: JSON.parse(JSON.stringify(playerStats.teamA)),
             teamB: JSON.parse(JSON.stringify(playerStats.teamB))
         }
     });
 
+    if (isSeriesOver) saveSeriesResult();
+
     // Render Stats
     if (isSeriesOver) {
         renderSeriesTabs();
@@ -511,6 +712,36 @@ function endMatch(winner, winnerScore, loserScore) {
     updatePlayerStatsUI();
 }
 
+function getCookie(name) {
+    const match = document.cookie.match(new RegExp(`(?:^|; )${name}=([^;]*)`));
+    return match ? decodeURIComponent(match[1]) : '';
+}
+
+// Persist the finished series (one POST per series; see game/results.py)
+function saveSeriesResult() {
+    if (!matchData || !matchData.results_url || matchData.finished) return;
+    matchData.finished = true;
+
+    const toStats = p => ({ player: p.id, kills: p.kills, deaths: p.deaths, assists: p.assists, fk: p.fk, fd: p.fd });
+    const payload = {
+        match_id: matchData.id,
+        format: seriesFormat,
+        maps: seriesHistory.map(map => ({
+            map_name: map.mapName,
+            score_a: map.scoreA_real,
+            score_b: map.scoreB_real,
+            rounds: map.rounds,
+            players: [...map.playerStats.teamA, ...map.playerStats.teamB].filter(p => p.id).map(toStats)
+        }))
+    };
+
+    fetch(matchData.results_url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+        body: JSON.stringify(payload)
+    }).catch(err => console.warn('ValSim: could not save match result', err));
+}
+
 // Helper: Render Series Tabs
 function renderSeriesTabs() {
     const container = document.getElementById('series-tabs');
@@ -884,25 +1115,18 @@ function updatePlayerCardUI(card, p, index, creditsArray) {
         // PRIORITY: Use the value directly from the database/initialization
         let finalOvr = p.overall;
 
-        // Fallback: Only calculate if p.overall is invalid/missing
-        if (!finalOvr) {
-            let avg = 0;
-            if (p.attributes) {
-                avg = (p.attributes.aim + p.attributes.gamesense + p.attributes.support) / 3;
-            } else if (p.stats) {
-                avg = (p.stats.aim + p.stats.gamesense + p.stats.support) / 3;
-            } else {
-                avg = 50;
-            }
+        // Fallback: Only calculate if p.overall is invalid/missing (and the attributes were sent)
+        if (!finalOvr && p.stats && p.stats.aim) {
+            let avg = (p.attributes.aim + p.attributes.gamesense + p.attributes.support) / 3;
             // Auto-detect scale logic (Only used in fallback)
             if (avg <= 20) avg = avg * 5;
             finalOvr = Math.min(99, Math.round(avg));
         }
 
-        ovrDisplay.textContent = finalOvr;
+        if (finalOvr) ovrDisplay.textContent = finalOvr;
 
         // Update Color
-        if (typeof getOverallColor === 'function') {
+        if (finalOvr && typeof getOverallColor === 'function') {
             ovrDisplay.className = 'font-black text-lg text-white leading-none player-ovr-value ' + getOverallColor(finalOvr);
         }
     }
@@ -3,6 +3,12 @@ ASGI config for valsim project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Sob ASGI a transmissão ao vivo (game.views.live_match_stream) roda como
+corrotina: cada espectador custa uma tarefa no event loop, não uma thread.
+A watch party (game.views.watch_party_stream) e os links de transmissão da
+página de resultado só existem sob ASGI.
+Ex.: uvicorn valsim.asgi:application --workers 1
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """